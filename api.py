@@ -0,0 +1,507 @@
+import sqlite3
+
+from flask import Blueprint, request, jsonify
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import IntegerConverter
+
+from insured_person import InsuredPerson
+from policy import InsurancePolicy
+from persons import Persons
+
+from interface_to_db import DatabaseInterface
+from importer import PERSON_FIELDS, POLICY_FIELDS
+from http_cache import ConditionalGet
+
+API_PREFIX = '/api/v1'
+
+# Maximální počet záznamů na stránce seznamu a v jedné dávce
+MAX_LIMIT = 1000
+MAX_BATCH = 5000
+
+# Největší ID, které SQLite uloží do sloupce INTEGER (větší číslo sqlite3 odmítne s OverflowError)
+MAX_ID = 2 ** 63 - 1
+
+# Pole odpovědí (parametr fields vybírá jen některá, id se vrací vždy)
+PERSON_JSON_FIELDS = ('id',) + PERSON_FIELDS
+POLICY_JSON_FIELDS = ('id',) + POLICY_FIELDS + ('persons',)
+
+
+class IdConverter(IntegerConverter):
+    """Převodník <id:...> pro ID v cestě: celé číslo jako <int:...>, ale jen do MAX_ID (jinak 404)."""
+
+    def __init__(self, url_map, **kwargs):
+        super().__init__(url_map, max=MAX_ID, **kwargs)
+
+
+class ApiError(Exception):
+    """
+    Chyba žádosti API, odpoví se JSON {"error": message, "errors": [...]}.
+
+    Attributes:
+        status (int): Stavový kód HTTP.
+        message (str): Text chyby.
+        errors (list[dict]): Chyby jednotlivých záznamů dávky (index, messages) nebo None.
+    """
+
+    def __init__(self, status, message, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.errors = errors
+
+
+class ApiInterface:
+    """
+    Verzované JSON REST API (/api/v1) pro pojištěnce, pojištění a jejich vztahy.
+
+    Seznamy se stránkují kurzorem (identifikátor posledního záznamu předchozí stránky),
+    parametr fields vybírá vrácená pole. Dávkové koncové body zapisují všechny záznamy
+    v jedné transakci (DatabaseInterface.unit_of_work): dávka se buď uloží celá, nebo vůbec.
+    Kolekce pojištěnců v paměti se po zápisu aktualizuje stejně jako ve FlaskInterface.
+    Čtení podporuje podmíněné žádosti (ETag, viz http_cache.ConditionalGet).
+
+    Attributes:
+        my_db (DatabaseInterface): Rozhraní do databáze.
+        insured (Persons): kolekce pojištěných.
+        blueprint (Blueprint): Trasy API pro registraci v aplikaci Flask.
+    """
+
+    def __init__(self, my_db: DatabaseInterface, persons: Persons) -> None:
+        """
+        Konstruktér třídy. Propojuje trasy API se svými metodami.
+
+        Args:
+            my_db (DatabaseInterface): Rozhraní do databáze.
+            persons (Persons): kolekce pojištěných.
+        """
+        self.my_db = my_db
+        self.insured = persons
+
+        # Čtení odpovídá 304, pokud se data od ETag klienta nezměnila
+        conditional = ConditionalGet(my_db)
+        all_data = ('persons', 'policies', 'links')
+
+        bp = Blueprint('api', __name__, url_prefix=API_PREFIX)
+        bp.record_once(lambda state: state.app.url_map.converters.setdefault('id', IdConverter))
+        bp.add_url_rule('/persons', view_func=conditional(self.list_persons, 'persons'), methods=['GET'])
+        bp.add_url_rule('/persons', view_func=self.create_person, methods=['POST'])
+        bp.add_url_rule('/persons/batch', view_func=self.create_persons, methods=['POST'])
+        bp.add_url_rule('/persons/batch', view_func=self.update_persons, methods=['PATCH'])
+        bp.add_url_rule('/persons/<id:person_id>', view_func=conditional(self.get_person, 'persons'), methods=['GET'])
+        bp.add_url_rule('/persons/<id:person_id>', view_func=self.update_person, methods=['PUT', 'PATCH'])
+        bp.add_url_rule('/persons/<id:person_id>', view_func=self.delete_person, methods=['DELETE'])
+        bp.add_url_rule('/persons/<id:person_id>/policies', view_func=conditional(self.person_policies, *all_data), methods=['GET'])
+        bp.add_url_rule('/persons/<id:person_id>/policies/<id:policy_id>', view_func=self.link, methods=['PUT'])
+        bp.add_url_rule('/persons/<id:person_id>/policies/<id:policy_id>', view_func=self.unlink, methods=['DELETE'])
+        bp.add_url_rule('/policies', view_func=conditional(self.list_policies, 'policies', 'links'), methods=['GET'])
+        bp.add_url_rule('/policies', view_func=self.create_policy, methods=['POST'])
+        bp.add_url_rule('/policies/batch', view_func=self.create_policies, methods=['POST'])
+        bp.add_url_rule('/policies/batch', view_func=self.update_policies, methods=['PATCH'])
+        bp.add_url_rule('/policies/<id:policy_id>', view_func=conditional(self.get_policy, 'policies', 'links'), methods=['GET'])
+        bp.add_url_rule('/policies/<id:policy_id>', view_func=self.update_policy, methods=['PUT', 'PATCH'])
+        bp.add_url_rule('/policies/<id:policy_id>', view_func=self.delete_policy, methods=['DELETE'])
+        bp.add_url_rule('/policies/<id:policy_id>/persons', view_func=conditional(self.policy_persons, 'policies', 'links'), methods=['GET'])
+        bp.add_url_rule('/links/batch', view_func=self.link_batch, methods=['POST'])
+        bp.add_url_rule('/links/batch', view_func=self.unlink_batch, methods=['DELETE'])
+        bp.register_error_handler(ApiError, self._api_error)
+        bp.register_error_handler(HTTPException, self._http_error)
+        self.blueprint = bp
+
+    # Pomocné metody
+
+    @staticmethod
+    def _api_error(error):
+        body = {'error': error.message}
+        if error.errors is not None:
+            body['errors'] = error.errors
+        return jsonify(body), error.status
+
+    @staticmethod
+    def _http_error(error):
+        return jsonify({'error': error.description}), error.code
+
+    @staticmethod
+    def _fields(allowed):
+        """Pole vybraná parametrem fields (None = všechna)."""
+        text = request.args.get('fields', '').strip()
+        if not text:
+            return None
+        fields = [field.strip() for field in text.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ApiError(400, f"Neznámá pole: {', '.join(unknown)}")
+        return ['id'] + [field for field in fields if field != 'id']
+
+    @staticmethod
+    def _select(item, fields):
+        if fields is None:
+            return item
+        return {field: item[field] for field in fields}
+
+    @staticmethod
+    def _person_json(person_id, person):
+        return {'id': person_id, **{field: getattr(person, field) for field in PERSON_FIELDS}}
+
+    @staticmethod
+    def _policy_json(policy_id, policy, persons=None):
+        return {
+            'id': policy_id,
+            'title': policy.title,
+            'insured_amount': str(policy.insured_amount),
+            'insured_object': policy.insured_object,
+            'start_date': policy.start_date_text,
+            'end_date': policy.end_date_text,
+            'persons': persons,
+        }
+
+    @staticmethod
+    def _page_args():
+        """Parametry stránkování limit a cursor."""
+        limit = request.args.get('limit', '100')
+        if not limit.isdecimal() or not 1 <= int(limit) <= MAX_LIMIT:
+            raise ApiError(400, f"Parametr limit musí být 1 až {MAX_LIMIT}")
+        limit = int(limit)
+        cursor = request.args.get('cursor', '')
+        if cursor and (not cursor.isdecimal() or int(cursor) > MAX_ID):
+            raise ApiError(400, "Neplatný kurzor")
+        return limit, int(cursor) if cursor else None
+
+    @staticmethod
+    def _body():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ApiError(400, "Tělo žádosti musí být objekt JSON")
+        return data
+
+    def _batch_items(self):
+        items = self._body().get('items')
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "Tělo žádosti musí obsahovat neprázdné pole items")
+        if len(items) > MAX_BATCH:
+            raise ApiError(413, f"Dávka může obsahovat nejvýše {MAX_BATCH} záznamů")
+        return items
+
+    @staticmethod
+    def _values(data, fields, base=None, numbers=()):
+        """
+        Hodnoty atributů ze záznamu JSON, chybějící se doplní z base (úprava části atributů).
+
+        Returns:
+            tuple: Hodnoty v pořadí fields, seznam chyb.
+        """
+        errors = []
+        if not isinstance(data, dict):
+            return None, ["Záznam musí být objekt JSON"]
+        unknown = [key for key in data if key not in fields and key != 'id']
+        if unknown:
+            errors.append(f"Neznámá pole: {', '.join(unknown)}")
+        values = []
+        for field in fields:
+            if field in data:
+                value = data[field]
+                if not isinstance(value, str) and not (field in numbers and isinstance(value, (int, float))
+                                                       and not isinstance(value, bool)):
+                    errors.append(f"Pole {field} musí být text")
+            elif base is not None:
+                value = getattr(base, field)
+            else:
+                value = None
+                errors.append(f"Chybí pole {field}")
+            values.append(value)
+        return values, errors
+
+    def _validated(self, items, fields, item_class, bases=None, numbers=()):
+        """
+        Vytvoří a ověří objekty item_class ze záznamů dávky (kontrola po sloupcích, viz check_columns).
+
+        Raises:
+            ApiError: 422 se seznamem chyb, pokud je některý záznam neplatný.
+
+        Returns:
+            list: Objekty item_class ve stejném pořadí jako items.
+        """
+        errors = []
+        objects = []
+        for index, data in enumerate(items):
+            values, messages = self._values(data, fields, bases[index] if bases else None, numbers)
+            if messages:
+                errors.append({'index': index, 'messages': messages})
+                objects.append(None)
+            else:
+                objects.append(item_class(*values))
+
+        valid = [item for item in objects if item is not None]
+        columns = {field: [getattr(item, field) for item in valid] for field in fields}
+        codes = iter(item_class.check_columns(columns, all_errors=True))
+        for index, item in enumerate(objects):
+            if item is None:
+                continue
+            item_codes = next(codes)
+            if item_codes:
+                errors.append({'index': index, 'messages': [item_class.error_message(code) for code in item_codes]})
+
+        if errors:
+            errors.sort(key=lambda error: error['index'])
+            raise ApiError(422, "Neplatná data", errors)
+        return objects
+
+    @staticmethod
+    def _ids(items, key='id'):
+        ids = []
+        for index, data in enumerate(items):
+            value = data.get(key) if isinstance(data, dict) else None
+            if not isinstance(value, int) or isinstance(value, bool) or not -MAX_ID - 1 <= value <= MAX_ID:
+                raise ApiError(422, "Neplatná data", [{'index': index, 'messages': [f"Chybí celé číslo {key}"]}])
+            ids.append(value)
+        return ids
+
+    @staticmethod
+    def _repeated(keys):
+        """Indexy klíčů, které se v seznamu už vyskytly dříve."""
+        seen = set()
+        repeated = []
+        for index, key in enumerate(keys):
+            if key in seen:
+                repeated.append(index)
+            seen.add(key)
+        return repeated
+
+    def _mirror_person(self, person_id, person):
+        """Aktualizuje pojištěnce v kolekci v paměti (pojištění zůstanou zachována)."""
+        current = self.insured[person_id] if person_id in self.insured else None
+        if current is not None:
+            for policy_id, policy in current.policies:
+                person.policies[policy_id] = policy
+        self.insured[person_id] = person
+
+    # Pojištěnci
+
+    def list_persons(self):
+        """Seznam pojištěnců stránkovaný kurzorem."""
+        fields = self._fields(PERSON_JSON_FIELDS)
+        limit, after_id = self._page_args()
+        persons, total = self.my_db.get_insured_persons_page(1, limit + 1, after_id if after_id is not None else 0)
+        items = [self._select(self._person_json(person_id, person), fields) for person_id, person in persons.items()]
+        next_cursor = str(items[limit - 1]['id']) if len(items) > limit else None
+        return jsonify({'items': items[:limit], 'next_cursor': next_cursor, 'total': total})
+
+    def get_person(self, person_id):
+        person = self.my_db.find_insured_person_by_id(person_id)
+        if person is None:
+            raise ApiError(404, f"Pojištěnec ID: {person_id} nenalezen")
+        return jsonify(self._select(self._person_json(person_id, person), self._fields(PERSON_JSON_FIELDS)))
+
+    def create_person(self):
+        person = self._validated([self._body()], PERSON_FIELDS, InsuredPerson)[0]
+        if self.my_db.is_person_exists(person) > 0:
+            raise ApiError(409, f"Tento pojištěnec již existuje: {person.first_name} {person.last_name}")
+        person_id = self.my_db.add_insured_person_to_db(person)
+        self.insured[person_id] = person
+        return jsonify(self._person_json(person_id, person)), 201
+
+    def update_person(self, person_id):
+        current = self.my_db.find_insured_person_by_id(person_id)
+        if current is None:
+            raise ApiError(404, f"Pojištěnec ID: {person_id} nenalezen")
+        base = current if request.method == 'PATCH' else None
+        person = self._validated([self._body()], PERSON_FIELDS, InsuredPerson, [base])[0]
+        self.my_db.update_insured_person_in_db(person_id, person)
+        self._mirror_person(person_id, person)
+        return jsonify(self._person_json(person_id, person))
+
+    def delete_person(self, person_id):
+        if self.my_db.find_insured_person_by_id(person_id) is None:
+            raise ApiError(404, f"Pojištěnec ID: {person_id} nenalezen")
+        self.my_db.delete_insured_person_from_db(person_id)
+        if person_id in self.insured:
+            del self.insured[person_id]
+        return '', 204
+
+    def create_persons(self):
+        """Dávkové vytvoření pojištěnců v jedné transakci."""
+        persons = self._validated(self._batch_items(), PERSON_FIELDS, InsuredPerson)
+        keys = [(person.first_name, person.last_name, person.email) for person in persons]
+        errors = [{'index': index, 'messages': ["Pojištěnec je v dávce vícekrát"]} for index in self._repeated(keys)]
+
+        with self.my_db.unit_of_work():
+            existing = self.my_db.existing_insured_persons(persons)
+            errors += [{'index': index, 'messages': [f"Tento pojištěnec již existuje: {key[0]} {key[1]}"]}
+                       for index, key in enumerate(keys) if key in existing]
+            if errors:
+                raise ApiError(409, "Duplicitní pojištěnci", sorted(errors, key=lambda error: error['index']))
+            person_ids = self.my_db.add_insured_persons_to_db(persons)
+
+        for person_id, person in zip(person_ids, persons):
+            self.insured[person_id] = person
+        return jsonify({'ids': person_ids}), 201
+
+    def update_persons(self):
+        """Dávková úprava pojištěnců (jen uvedená pole) v jedné transakci."""
+        items = self._batch_items()
+        person_ids = self._ids(items)
+
+        with self.my_db.unit_of_work():
+            bases = [self.my_db.find_insured_person_by_id(person_id) for person_id in person_ids]
+            missing = [{'index': index, 'messages': [f"Pojištěnec ID: {person_id} nenalezen"]}
+                       for index, (person_id, base) in enumerate(zip(person_ids, bases)) if base is None]
+            if missing:
+                raise ApiError(404, "Pojištěnci nenalezeni", missing)
+            persons = self._validated(items, PERSON_FIELDS, InsuredPerson, bases)
+            for person_id, person in zip(person_ids, persons):
+                self.my_db.update_insured_person_in_db(person_id, person)
+
+        for person_id, person in zip(person_ids, persons):
+            self._mirror_person(person_id, person)
+        return jsonify({'ids': person_ids})
+
+    def person_policies(self, person_id):
+        """Pojištění sjednaná pojištěncem."""
+        if self.my_db.find_insured_person_by_id(person_id) is None:
+            raise ApiError(404, f"Pojištěnec ID: {person_id} nenalezen")
+        fields = self._fields(POLICY_JSON_FIELDS)
+        policies = self.my_db.find_insurance_policies_by_person_id(person_id)
+        return jsonify({'items': [self._select(self._policy_json(policy_id, policy), fields)
+                                  for policy_id, policy in policies.items()]})
+
+    # Pojištění
+
+    def list_policies(self):
+        """Seznam pojištění stránkovaný kurzorem (s počtem pojištěnců)."""
+        fields = self._fields(POLICY_JSON_FIELDS)
+        limit, after_id = self._page_args()
+        policies, total = self.my_db.get_insurance_policies_page(1, limit + 1, after_id if after_id is not None else 0)
+        items = [self._select(self._policy_json(policy_id, policy, persons), fields)
+                 for policy_id, (policy, persons) in policies.items()]
+        next_cursor = str(items[limit - 1]['id']) if len(items) > limit else None
+        return jsonify({'items': items[:limit], 'next_cursor': next_cursor, 'total': total})
+
+    def get_policy(self, policy_id):
+        policy = self.my_db.find_insurance_policy_by_id(policy_id)
+        if policy is None:
+            raise ApiError(404, f"Pojištění ID: {policy_id} nenalezeno")
+        fields = self._fields(POLICY_JSON_FIELDS)
+        persons = None
+        if fields is None or 'persons' in fields:
+            persons = len(self.my_db.find_person_ids_by_policy_id(policy_id))
+        return jsonify(self._select(self._policy_json(policy_id, policy, persons), fields))
+
+    def create_policy(self):
+        policy = self._validated([self._body()], POLICY_FIELDS, InsurancePolicy, numbers=('insured_amount',))[0]
+        if self.my_db.is_policy_title_exist(policy.title):
+            raise ApiError(409, f"Tento Jméno již existuje: {policy.title}")
+        policy_id = self.my_db.add_insurance_policy_to_db(policy)
+        return jsonify(self._policy_json(policy_id, policy, 0)), 201
+
+    def update_policy(self, policy_id):
+        current = self.my_db.find_insurance_policy_by_id(policy_id)
+        if current is None:
+            raise ApiError(404, f"Pojištění ID: {policy_id} nenalezeno")
+        base = current if request.method == 'PATCH' else None
+        policy = self._validated([self._body()], POLICY_FIELDS, InsurancePolicy, [base], ('insured_amount',))[0]
+        if not self.my_db.is_policy_title_unique(policy.title, policy_id):
+            raise ApiError(409, f"Tento Jméno již existuje: {policy.title}")
+        self.insured.replace_policy(policy_id, policy)
+        self.my_db.update_insurance_policy_in_db(policy_id, policy)
+        return jsonify(self._policy_json(policy_id, policy))
+
+    def delete_policy(self, policy_id):
+        if self.my_db.find_insurance_policy_by_id(policy_id) is None:
+            raise ApiError(404, f"Pojištění ID: {policy_id} nenalezeno")
+        self.my_db.delete_insurance_policy_from_db(policy_id)
+        self.insured.delete_policy(policy_id)
+        return '', 204
+
+    def create_policies(self):
+        """Dávkové vytvoření pojištění v jedné transakci."""
+        policies = self._validated(self._batch_items(), POLICY_FIELDS, InsurancePolicy, numbers=('insured_amount',))
+        titles = [policy.title for policy in policies]
+        errors = [{'index': index, 'messages': ["Název je v dávce vícekrát"]} for index in self._repeated(titles)]
+
+        with self.my_db.unit_of_work():
+            existing = self.my_db.existing_policy_titles(titles)
+            errors += [{'index': index, 'messages': [f"Tento Jméno již existuje: {title}"]}
+                       for index, title in enumerate(titles) if title in existing]
+            if errors:
+                raise ApiError(409, "Duplicitní pojištění", sorted(errors, key=lambda error: error['index']))
+            policy_ids = self.my_db.add_insurance_policies_to_db(policies)
+        return jsonify({'ids': policy_ids}), 201
+
+    def update_policies(self):
+        """Dávková úprava pojištění (jen uvedená pole) v jedné transakci."""
+        items = self._batch_items()
+        policy_ids = self._ids(items)
+
+        with self.my_db.unit_of_work():
+            bases = [self.my_db.find_insurance_policy_by_id(policy_id) for policy_id in policy_ids]
+            missing = [{'index': index, 'messages': [f"Pojištění ID: {policy_id} nenalezeno"]}
+                       for index, (policy_id, base) in enumerate(zip(policy_ids, bases)) if base is None]
+            if missing:
+                raise ApiError(404, "Pojištění nenalezena", missing)
+            policies = self._validated(items, POLICY_FIELDS, InsurancePolicy, bases, ('insured_amount',))
+            errors = [{'index': index, 'messages': [f"Tento Jméno již existuje: {policy.title}"]}
+                      for index, (policy_id, policy) in enumerate(zip(policy_ids, policies))
+                      if not self.my_db.is_policy_title_unique(policy.title, policy_id)]
+            if errors:
+                raise ApiError(409, "Duplicitní pojištění", errors)
+            for policy_id, policy in zip(policy_ids, policies):
+                self.my_db.update_insurance_policy_in_db(policy_id, policy)
+
+        for policy_id, policy in zip(policy_ids, policies):
+            self.insured.replace_policy(policy_id, policy)
+        return jsonify({'ids': policy_ids})
+
+    def policy_persons(self, policy_id):
+        """Identifikátory pojištěnců, kteří mají pojištění sjednané."""
+        if self.my_db.find_insurance_policy_by_id(policy_id) is None:
+            raise ApiError(404, f"Pojištění ID: {policy_id} nenalezeno")
+        return jsonify({'ids': self.my_db.find_person_ids_by_policy_id(policy_id)})
+
+    # Vztahy
+
+    def _links(self):
+        items = self._batch_items()
+        return list(zip(self._ids(items, 'person_id'), self._ids(items, 'policy_id')))
+
+    def _write_links(self, links, add):
+        """Zapíše nebo odstraní vztahy v jedné transakci a aktualizuje kolekci v paměti."""
+        try:
+            with self.my_db.unit_of_work():
+                if add:
+                    count = self.my_db.add_person_policies_to_db(links)
+                else:
+                    count = self.my_db.delete_person_policies_from_db(links)
+        except sqlite3.IntegrityError:
+            raise ApiError(404, "Pojištěnec nebo pojištění neexistuje")
+
+        policies = {}
+        for person_id, policy_id in links:
+            if person_id not in self.insured:
+                continue
+            person_policies = self.insured[person_id].policies
+            if not add:
+                if policy_id in person_policies:
+                    del person_policies[policy_id]
+                continue
+            if policy_id not in policies:
+                policies[policy_id] = self.my_db.find_insurance_policy_by_id(policy_id)
+            if policies[policy_id] is not None:
+                person_policies[policy_id] = policies[policy_id]
+        return count
+
+    def link(self, person_id, policy_id):
+        """Spojí pojištění s pojištěncem (opakované spojení nic nezmění)."""
+        self._write_links([(person_id, policy_id)], True)
+        return '', 204
+
+    def unlink(self, person_id, policy_id):
+        if not self._write_links([(person_id, policy_id)], False):
+            raise ApiError(404, f"Pojištěnec ID: {person_id} nemá pojištění ID: {policy_id}")
+        return '', 204
+
+    def link_batch(self):
+        """Dávkové spojení pojištění s pojištěnci v jedné transakci."""
+        return jsonify({'linked': self._write_links(self._links(), True)})
+
+    def unlink_batch(self):
+        """Dávkové odpojení pojištění od pojištěnců v jedné transakci."""
+        return jsonify({'unlinked': self._write_links(self._links(), False)})
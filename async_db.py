@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from interface_to_db import DatabaseInterface
+
+
+class AsyncDatabaseInterface:
+    """
+    Asynchronní varianta rozhraní do databáze pro asynchronní pohledy.
+
+    Každá metoda DatabaseInterface je dostupná jako korutina, která volání provede ve vyhrazeném
+    omezeném fondu vláken (ThreadPoolExecutor). Nezávislé dotazy jednoho pohledu tak mohou běžet
+    souběžně, např. asyncio.gather(async_db.find_insured_person_by_id(id),
+    async_db.get_all_unused_insurance_policies()); sqlite3 při provádění dotazu uvolňuje GIL.
+
+    Počet vláken je ve výchozím stavu stejný jako velikost fondu spojení, vlákna tedy na spojení nečekají.
+    Při max_workers=0 se volání provádějí přímo ve vlákně žádosti jedno po druhém (původní chování).
+
+    Transakce DatabaseInterface.unit_of_work() platí jen v jednom vlákně; zápisy, které mají
+    tvořit jednu transakci, se spouští jako jedna funkce metodou run().
+
+    Attributes:
+        my_db (DatabaseInterface): Synchronní rozhraní do databáze.
+        max_workers (int): Maximální počet vláken fondu.
+    """
+
+    def __init__(self, my_db: DatabaseInterface, max_workers=None):
+        """
+        Konstruktor třídy AsyncDatabaseInterface.
+
+        Args:
+            my_db (DatabaseInterface): Synchronní rozhraní do databáze.
+            max_workers (int): Maximální počet vláken fondu (výchozí velikost fondu spojení, 0 = bez fondu).
+        """
+        self.my_db = my_db
+        self.max_workers = my_db.pool_stats()['max_size'] if max_workers is None else max_workers
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        """Fond vláken tohoto procesu (vlákna rodičovského procesu po rozvětvení neexistují)."""
+        if self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='database')
+            self._pid = os.getpid()
+        return self._executor
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Provede funkci ve fondu vláken a počká na výsledek.
+
+        Args:
+            function (callable): Funkce, např. metoda DatabaseInterface nebo funkce s unit_of_work().
+
+        Returns:
+            Výsledek funkce.
+        """
+        if self.max_workers == 0:
+            return function(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        # Kontext (např. měření žádosti, viz metrics.py) se přenáší do vlákna fondu jako v asyncio.to_thread
+        call = functools.partial(contextvars.copy_context().run, function, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def __getattr__(self, name):
+        method = getattr(self.my_db, name)
+        if name.startswith('_') or not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+
+        return call
+
+    def close(self):
+        """Ukončí fond vláken (rozpracovaná volání se dokončí)."""
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
+        self._pid = None
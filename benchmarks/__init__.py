@@ -0,0 +1 @@
+"""Měření výkonu aplikace PojištěníApp. Skripty se spouští z kořene projektu: python -m benchmarks.<název>"""
@@ -0,0 +1,92 @@
+"""
+Měření JSON API: zápis pojištěnců, pojištění a vztahů po jednom záznamu v porovnání s dávkovými koncovými body.
+
+Žádosti se posílají přes testovacího klienta Flask (bez sítě), měří se počet žádostí
+a celková doba. Na síti se k době po jednom záznamu přičte ještě režie každé žádosti.
+
+Použití:
+    python -m benchmarks.bench_api_batch --persons 5000 --policies 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from interface_to_db import DatabaseInterface
+from flask_interface import FlaskInterface, app
+
+from api import API_PREFIX, MAX_BATCH
+
+
+def person_json(number, prefix):
+    return {'first_name': 'Jan', 'last_name': 'Novák', 'email': f'{prefix}{number}@example.cz', 'phone': '777123456',
+            'street': 'Hlavní 1', 'city': 'Praha', 'postal_code': '11000'}
+
+
+def policy_json(number, prefix):
+    return {'title': f'{prefix} {number}', 'insured_amount': 100000, 'insured_object': 'Majetek',
+            'start_date': '2024-01-01T00:00', 'end_date': '2025-01-01T00:00'}
+
+
+def chunks(items, size=MAX_BATCH):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def single(client, persons, policies):
+    """Zápis po jednom záznamu, vrátí počet žádostí."""
+    person_ids = [client.post(f'{API_PREFIX}/persons', json=person_json(number, 'jeden')).json['id']
+                  for number in range(persons)]
+    policy_ids = [client.post(f'{API_PREFIX}/policies', json=policy_json(number, 'Jeden')).json['id']
+                  for number in range(policies)]
+    for index, person_id in enumerate(person_ids):
+        client.put(f'{API_PREFIX}/persons/{person_id}/policies/{policy_ids[index % policies]}')
+    return len(person_ids) * 2 + len(policy_ids)
+
+
+def batch(client, persons, policies):
+    """Zápis dávkami, vrátí počet žádostí."""
+    requests = 0
+    person_ids = []
+    for items in chunks([person_json(number, 'davka') for number in range(persons)]):
+        person_ids += client.post(f'{API_PREFIX}/persons/batch', json={'items': items}).json['ids']
+        requests += 1
+    policy_ids = []
+    for items in chunks([policy_json(number, 'Dávka') for number in range(policies)]):
+        policy_ids += client.post(f'{API_PREFIX}/policies/batch', json={'items': items}).json['ids']
+        requests += 1
+    links = [{'person_id': person_id, 'policy_id': policy_ids[index % policies]}
+             for index, person_id in enumerate(person_ids)]
+    for items in chunks(links):
+        client.post(f'{API_PREFIX}/links/batch', json={'items': items})
+        requests += 1
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=5000)
+    parser.add_argument('--policies', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        my_db = DatabaseInterface(os.path.join(tmp, 'bench.db'), storage_profile='wal')
+        my_db.create_tables()
+        FlaskInterface(my_db, my_db.load_persons())
+        client = app.test_client()
+
+        results = {}
+        for name, function in (('po jednom', single), ('dávkově', batch)):
+            start = time.perf_counter()
+            requests = function(client, args.persons, args.policies)
+            results[name] = (requests, time.perf_counter() - start)
+        my_db.close()
+
+    print(f'pojištěnců: {args.persons}, pojištění: {args.policies}, vztahů: {args.persons}')
+    for name, (requests, elapsed) in results.items():
+        print(f'{name:10} {requests:7} žádostí, {elapsed:7.2f} s')
+    print(f"méně žádostí: {results['po jednom'][0] / results['dávkově'][0]:.0f}x, "
+          f"zrychlení: {results['po jednom'][1] / results['dávkově'][1]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Měření latence stránek s více nezávislými dotazy (pojištěnec, přidání pojištění, vyhledávání)
+při souběžných klientech: dotazy postupně ve vlákně žádosti (DB_EXECUTOR_WORKERS=0)
+v porovnání se souběžnými dotazy ve fondu vláken (AsyncDatabaseInterface).
+
+Aplikace běží ve vícevláknovém serveru werkzeug v tomto procesu, cache je vypnutá,
+aby se měřily dotazy do databáze.
+
+Použití:
+    python -m benchmarks.bench_async_views --persons 200000 --policies 5000 --clients 8
+"""
+import argparse
+import http.client
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from wsgi import create_app
+
+from benchmarks.generate import generate_database
+
+PAGES = {
+    'pojištěnec': lambda rng, persons: f'/person/{rng.randint(1, persons)}',
+    'přidání pojištění': lambda rng, persons: f'/add_person_policy/{rng.randint(1, persons)}',
+    'vyhledávání': lambda rng, persons: f'/search?q={rng.choice(["nov", "dvo", "praha", "brno", "7771"])}',
+}
+
+
+def client(port, page, persons, requests, seed, latencies):
+    rng = random.Random(seed)
+    for _ in range(requests):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        start = time.perf_counter()
+        connection.request('GET', PAGES[page](rng, persons))
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        connection.close()
+        if response.status != 200:
+            raise RuntimeError(f'{page}: {response.status}')
+
+
+def measure(db_name, executor_workers, args, port):
+    """Spustí server a změří latence všech stránek; vrátí {stránka: (p50, p95)} v ms."""
+    app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0, 'POOL_SIZE': args.pool_size,
+                      'DB_EXECUTOR_WORKERS': executor_workers})
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    results = {}
+    try:
+        for page in PAGES:
+            latencies = []
+            clients = [threading.Thread(target=client, args=(port, page, args.persons, args.requests, seed, latencies))
+                       for seed in range(args.clients)]
+            for thread_client in clients:
+                thread_client.start()
+            for thread_client in clients:
+                thread_client.join()
+            latencies.sort()
+            results[page] = (statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.95)] * 1000)
+    finally:
+        server.shutdown()
+        app.extensions['insurance'].async_db.close()
+        app.extensions['insurance'].my_db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=200000)
+    parser.add_argument('--policies', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=8, help='počet souběžných klientů')
+    parser.add_argument('--requests', type=int, default=50, help='počet žádostí jednoho klienta na stránku')
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+    # Výpis každé žádosti serverem by zkresloval měření
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies)
+
+        sequential = measure(db_name, 0, args, args.port)
+        concurrent = measure(db_name, None, args, args.port + 1)
+
+    print(f'jader: {os.cpu_count()}, pojištěnců: {args.persons}, pojištění: {args.policies}, klientů: {args.clients}')
+    print(f"{'stránka':20} {'postupně p50/p95':>20} {'souběžně p50/p95':>20}")
+    for page in PAGES:
+        print(f'{page:20} {sequential[page][0]:9.1f} /{sequential[page][1]:7.1f} ms '
+              f'{concurrent[page][0]:9.1f} /{concurrent[page][1]:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
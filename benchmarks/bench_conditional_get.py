@@ -0,0 +1,57 @@
+"""
+Měření opakovaného načítání stránek (dashboard): plná odpověď 200 v porovnání s podmíněnou žádostí (304).
+
+Žádosti se posílají přes testovacího klienta Flask; podmíněná žádost posílá If-None-Match
+s ETag z předchozí odpovědi.
+
+Použití:
+    python -m benchmarks.bench_conditional_get --persons 100000 --requests 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from interface_to_db import DatabaseInterface
+from flask_interface import FlaskInterface, app
+
+from benchmarks.generate import generate_database
+
+URLS = ('/persons?page=100', '/policies?page=10', '/person/1000', '/api/v1/persons?limit=100', '/stats.json')
+
+
+def measure(client, url, requests, headers):
+    statuses = set()
+    start = time.perf_counter()
+    for _ in range(requests):
+        statuses.add(client.get(url, headers=headers).status_code)
+    return (time.perf_counter() - start) / requests, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=100000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies)
+        my_db = DatabaseInterface(db_name, storage_profile='wal')
+        my_db.create_tables()
+        FlaskInterface(my_db, my_db.load_persons_lazy())
+        client = app.test_client()
+
+        print(f'pojištěnců: {args.persons}, žádostí na stránku: {args.requests}')
+        for url in URLS:
+            etag = client.get(url).headers['ETag']
+            full, full_statuses = measure(client, url, args.requests, {})
+            conditional, conditional_statuses = measure(client, url, args.requests, {'If-None-Match': etag})
+            print(f'{url:28} 200: {full * 1000:7.3f} ms {sorted(full_statuses)}, '
+                  f'304: {conditional * 1000:7.3f} ms {sorted(conditional_statuses)}, {full / conditional:5.1f}x')
+        my_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Měření souběhu čtení a zápisu pro jednotlivé profily úložiště (database.STORAGE_PROFILES).
+
+Jedno vlákno neustále ukládá pojištění, ostatní vlákna čtou stránky seznamu pojištění.
+Vypisuje počet zápisů a latenci čtení pro každý profil.
+
+Použití:
+    python -m benchmarks.bench_contention --seconds 5 --readers 4
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from database import STORAGE_PROFILES
+from interface_to_db import DatabaseInterface
+from policy import InsurancePolicy
+
+from benchmarks.generate import generate_database
+
+
+def run_profile(db_name, profile, seconds, readers):
+    """
+    Spustí zapisovatele a čtenáře nad databází s daným profilem.
+
+    Returns:
+        tuple: Počet zápisů, seznam latencí čtení v sekundách.
+    """
+    my_db = DatabaseInterface(db_name, pool_size=readers + 1, storage_profile=profile)
+    stop = threading.Event()
+    latencies = []
+    writes = [0]
+
+    def writer():
+        while not stop.is_set():
+            policy = InsurancePolicy(f'Zápis {writes[0]}', 1000, 'Majetek', '2024-01-01T00:00', '2025-01-01T00:00')
+            policy_id = my_db.add_insurance_policy_to_db(policy)
+            my_db.update_insurance_policy_in_db(policy_id, policy)
+            writes[0] += 1
+
+    def reader():
+        page = 1
+        while not stop.is_set():
+            start = time.perf_counter()
+            my_db.get_insurance_policies_page(page, 3)
+            latencies.append(time.perf_counter() - start)
+            page = page % 100 + 1
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    my_db.close()
+    return writes[0], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=10000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    for profile in STORAGE_PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, 'bench.db')
+            generate_database(db_name, args.persons, args.policies)
+            writes, latencies = run_profile(db_name, profile, args.seconds, args.readers)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+        median = statistics.median(latencies) if latencies else 0.0
+        print(f'{profile:8} zápisů/s: {writes / args.seconds:8.0f}  čtení/s: {len(latencies) / args.seconds:8.0f}  '
+              f'medián čtení: {median * 1000:.2f} ms  p99 čtení: {p99 * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Měření doby do první obsloužené žádosti pro načítání pojištěnců 'eager' a 'lazy' (viz wsgi.DEFAULT_CONFIG['PERSONS_LOADING']).
+
+Každý režim běží v samostatném procesu (aplikace Flask se v procesu vytváří jen jednou).
+Měří se doba od otevření databáze po odpověď na první žádost (stránka pojištěnce),
+zvlášť načtení kolekce a obsloužení žádostí.
+
+Použití:
+    python -m benchmarks.bench_first_request --persons 200000 --policies 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_mode(db_name, mode, max_loaded, person_id):
+    """
+    Spustí aplikaci v daném režimu a obslouží první žádosti (volá se v samostatném procesu).
+
+    Returns:
+        dict: Doby načtení kolekce, první a druhé žádosti v sekundách.
+    """
+    start = time.perf_counter()
+    from interface_to_db import DatabaseInterface
+    from flask_interface import FlaskInterface, app
+
+    my_db = DatabaseInterface(db_name, storage_profile='wal')
+    my_db.create_tables()
+    if mode == 'lazy':
+        persons = my_db.load_persons_lazy(max_loaded)
+    else:
+        persons = my_db.load_persons()
+    FlaskInterface(my_db, persons)
+    loaded = time.perf_counter()
+
+    client = app.test_client()
+    response = client.get(f'/person/{person_id}')
+    first = time.perf_counter()
+    client.get(f'/add_person_policy/{person_id}')
+    second = time.perf_counter()
+    my_db.close()
+
+    if response.status_code != 200:
+        raise RuntimeError(f'GET /person/{person_id}: {response.status_code}')
+    return {
+        'load': loaded - start,
+        'first_request': first - start,
+        'first_request_only': first - loaded,
+        'second_request_only': second - first,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=50000)
+    parser.add_argument('--policies', type=int, default=500)
+    parser.add_argument('--links', type=int, default=3, help='maximální počet pojištění na pojištěnce')
+    parser.add_argument('--max-loaded', type=int, default=10000, help='režim lazy: pojištěnců v paměti')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, db_name = args.child
+        print(json.dumps(run_mode(db_name, mode, args.max_loaded, args.persons // 2)))
+        return
+
+    from benchmarks.generate import generate_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies, args.links)
+
+        results = {}
+        for mode in ('eager', 'lazy'):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_first_request', '--persons', str(args.persons),
+                 '--max-loaded', str(args.max_loaded), '--child', mode, db_name],
+                check=True, capture_output=True, text=True).stdout
+            results[mode] = json.loads(output.splitlines()[-1])
+
+    print(f'pojištěnců: {args.persons}')
+    for mode, result in results.items():
+        print(f'{mode:5}: načtení {result["load"]:.3f} s, první žádost za {result["first_request"]:.3f} s '
+              f'(žádost {result["first_request_only"] * 1000:.1f} ms, další {result["second_request_only"] * 1000:.1f} ms)')
+    print(f'zrychlení startu: {results["eager"]["first_request"] / results["lazy"]["first_request"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
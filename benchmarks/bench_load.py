@@ -0,0 +1,114 @@
+"""
+Zátěžový test provozního serveru (serve.py): propustnost (žádosti/s) podle počtu pracovních procesů.
+
+Pro každý počet procesů spustí server nad vygenerovanou databází a z několika klientských
+procesů posílá po dobu --duration sekund žádosti na čtecí trasy (pojištěnec, stránka pojištění,
+našeptávač, stránka pojištěnce v API). Na stroji s jedním jádrem se propustnost s počtem procesů
+nezvýší, škálování ukazuje až stroj s více jádry (klienti běží na stejném stroji a část jader spotřebují).
+
+Použití:
+    python -m benchmarks.bench_load --workers 1 2 4 8 --clients 16 --duration 10
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generate import generate_database
+
+
+def client(port, persons, duration, seed, results):
+    """Klient: posílá žádosti, dokud nevyprší doba; výsledek (úspěšné, chybné) vloží do fronty results."""
+    rng = random.Random(seed)
+    paths = (
+        lambda: f'/api/v1/persons/{rng.randint(1, persons)}',
+        lambda: f'/person/{rng.randint(1, persons)}',
+        lambda: f'/api/v1/policies?limit=20&cursor={rng.randint(0, 100)}',
+        lambda: '/search.json?q=nov',
+    )
+    ok = failed = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            connection.request('GET', rng.choice(paths)())
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                ok += 1
+            else:
+                failed += 1
+        except OSError:
+            failed += 1
+        finally:
+            connection.close()
+    results.put((ok, failed))
+
+
+def wait_until_ready(port, timeout=60):
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/v1/persons?limit=1')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server na portu {port} nenaběhl.')
+
+
+def run(db_name, workers, threads, port, clients, persons, duration):
+    """Spustí server s daným počtem procesů a vrátí (žádosti/s, chybné žádosti)."""
+    server = subprocess.Popen([sys.executable, 'serve.py', '--db', db_name, '--bind', f'127.0.0.1:{port}',
+                               '--workers', str(workers), '--threads', str(threads)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=client, args=(port, persons, duration, seed, results))
+                     for seed in range(clients)]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait()
+    return sum(ok for ok, _ in totals) / duration, sum(failed for _, failed in totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=100000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16, help='počet klientských procesů')
+    parser.add_argument('--duration', type=float, default=10.0, help='doba měření v sekundách')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies)
+
+        print(f'jader: {os.cpu_count()}, pojištěnců: {args.persons}, klientů: {args.clients}, '
+              f'vláken v procesu: {args.threads}')
+        baseline = None
+        for workers in args.workers:
+            throughput, failed = run(db_name, workers, args.threads, args.port, args.clients,
+                                     args.persons, args.duration)
+            baseline = baseline or throughput
+            print(f'procesů: {workers:3}  {throughput:9.1f} žádostí/s  ({throughput / baseline:.2f}x), '
+                  f'chybných: {failed}')
+
+
+if __name__ == '__main__':
+    main()
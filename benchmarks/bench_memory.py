@@ -0,0 +1,56 @@
+"""
+Měření paměťové náročnosti kolekce Persons (bajtů na pojištěnce).
+
+Vytvoří kolekci pojištěnců s pojištěními sdílenými podle ID a změří
+přírůstek alokované paměti pomocí tracemalloc.
+
+Použití:
+    python -m benchmarks.bench_memory --sizes 100000 1000000
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from insured_person import InsuredPerson
+from persons import Persons
+from policy import InsurancePolicy
+
+from benchmarks.generate import FIRST_NAMES, LAST_NAMES, CITIES, STREETS
+
+
+def build_persons(size, policies, links_per_person, seed=1):
+    """Vytvoří kolekci size pojištěnců, každý s nejvýše links_per_person sdílenými pojištěními."""
+    rnd = random.Random(seed)
+    all_policies = [InsurancePolicy(f'Pojištění {i}', 1000 * i, 'Majetek', '2024-01-01T00:00', '2025-01-01T00:00')
+                    for i in range(1, policies + 1)]
+    persons = Persons()
+    for person_id in range(1, size + 1):
+        person = InsuredPerson(rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES), f'osoba{person_id}@example.cz',
+                               f'{rnd.randint(600000000, 799999999)}', f'{rnd.choice(STREETS)} {rnd.randint(1, 200)}',
+                               rnd.choice(CITIES), f'{rnd.randint(10000, 79999)}')
+        for policy_id in rnd.sample(range(1, policies + 1), rnd.randint(0, links_per_person)):
+            person.policies[policy_id] = all_policies[policy_id - 1]
+        persons[person_id] = person
+    return persons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--links', type=int, default=3, help='maximální počet pojištění na pojištěnce')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        gc.collect()
+        tracemalloc.start()
+        persons = build_persons(size, args.policies, args.links)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'pojištěnců: {size:>9}  celkem: {current / 1048576:8.1f} MB  na pojištěnce: {current / size:6.0f} B')
+        del persons
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Měření režie měření dotazů a žádostí (metrics.py): stejné stránky s METRICS zapnutým a vypnutým.
+
+Žádosti se posílají přes testovacího klienta Flask, cache je vypnutá, aby každá žádost
+dělala dotazy do databáze. Na konci vypíše, kde stránky tráví čas (Server-Timing).
+
+Použití:
+    python -m benchmarks.bench_metrics --persons 100000 --requests 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from wsgi import create_app
+
+from benchmarks.generate import generate_database
+
+URLS = ('/person/1000', '/policies?page=10', '/api/v1/persons?limit=100', '/search.json?q=nov', '/stats.json')
+
+
+def measure(client, url, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url}: {response.status_code}')
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=100000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies)
+        config = {'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0}
+        clients = {metrics: create_app({**config, 'METRICS': metrics}).test_client() for metrics in (False, True)}
+
+        print(f'pojištěnců: {args.persons}, žádostí na stránku: {args.requests}')
+        for url in URLS:
+            # Střídavě, aby obě varianty měřily za stejných podmínek
+            times = {metrics: 0.0 for metrics in clients}
+            for _ in range(2):
+                for metrics, client in clients.items():
+                    times[metrics] += measure(client, url, args.requests // 2)
+            off, on = times[False] / 2, times[True] / 2
+            print(f'{url:28} bez měření: {off * 1000:7.3f} ms, s měřením: {on * 1000:7.3f} ms, '
+                  f'režie: {(on - off) * 1e6:6.1f} µs ({(on / off - 1) * 100:+.1f} %)')
+
+        print('\nServer-Timing:')
+        for url in URLS:
+            print(f'{url:28} {clients[True].get(url).headers["Server-Timing"]}')
+
+
+if __name__ == '__main__':
+    main()
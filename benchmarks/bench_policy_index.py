@@ -0,0 +1,61 @@
+"""
+Měření Persons.replace_policy a Persons.delete_policy s indexem pojištění -> pojištěnci
+v porovnání s průchodem všemi pojištěnci. Na závěr ověří konzistenci indexu.
+
+Použití:
+    python -m benchmarks.bench_policy_index --persons 1000000 --operations 20
+"""
+import argparse
+import sys
+import time
+
+from policy import InsurancePolicy
+
+from benchmarks.bench_memory import build_persons
+
+
+def replace_policy_scan(persons, policy_id, policy):
+    """Původní replace_policy: průchod všemi pojištěnci."""
+    for id, person in persons:
+        if policy_id in person.policies:
+            person.policies[policy_id] = policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=1000000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--operations', type=int, default=20)
+    args = parser.parse_args()
+
+    persons = build_persons(args.persons, args.policies, 3)
+    policy = InsurancePolicy('Nové pojištění', 1000, 'Majetek', '2024-01-01T00:00', '2025-01-01T00:00')
+    policy_ids = range(1, args.operations + 1)
+
+    start = time.perf_counter()
+    for policy_id in policy_ids:
+        replace_policy_scan(persons, policy_id, policy)
+    scan_time = (time.perf_counter() - start) / args.operations
+
+    start = time.perf_counter()
+    for policy_id in policy_ids:
+        persons.replace_policy(policy_id, policy)
+    replace_time = (time.perf_counter() - start) / args.operations
+
+    start = time.perf_counter()
+    for policy_id in policy_ids:
+        persons.delete_policy(policy_id)
+    delete_time = (time.perf_counter() - start) / args.operations
+
+    print(f'pojištěnců: {len(persons)}')
+    print(f'replace_policy průchodem: {scan_time * 1000:9.3f} ms')
+    print(f'replace_policy s indexem: {replace_time * 1000:9.3f} ms')
+    print(f'delete_policy s indexem:  {delete_time * 1000:9.3f} ms')
+
+    consistent = persons.check_policy_index()
+    print(f"index pojištění: {'OK' if consistent else 'CHYBA'}")
+    return 0 if consistent else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
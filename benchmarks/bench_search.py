@@ -0,0 +1,88 @@
+"""
+Měření latence fulltextového vyhledávání (FTS5) v porovnání s hledáním přes LIKE.
+
+Pro každý druh dotazu (předpona příjmení, e-mail, telefon, město, název pojištění, našeptávač)
+změří medián a 95. percentil doby odpovědi DatabaseInterface.search_insured_persons,
+search_insurance_policies a search_suggestions.
+
+Použití:
+    python -m benchmarks.bench_search --persons 1000000 --policies 1000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from interface_to_db import DatabaseInterface
+
+from benchmarks.generate import generate_database
+
+# Druh dotazu -> (hledané texty, metoda DatabaseInterface, sloupce pro LIKE)
+QUERIES = {
+    'předpona příjmení': (('Nov', 'Dvoř', 'proch', 'cern'), 'search_insured_persons', ('last_name',)),
+    'e-mail': (('osoba12345@example.cz', 'osoba7@', 'osoba99'), 'search_insured_persons', ('email',)),
+    'telefon': (('777', '6123', '7001'), 'search_insured_persons', ('phone',)),
+    'město': (('Praha', 'budejovice', 'hradec kral'), 'search_insured_persons', ('city',)),
+    'název pojištění': (('Pojištění 42', 'pojisteni 1'), 'search_insurance_policies', ('title',)),
+}
+SUGGEST_TEXTS = ('no', 'nov', 'nova', 'pra', 'osoba1')
+
+
+def percentiles(times):
+    """Medián a 95. percentil v milisekundách."""
+    times = sorted(times)
+    return statistics.median(times) * 1000, times[min(int(len(times) * 0.95), len(times) - 1)] * 1000
+
+
+def measure(function, texts, repeat):
+    times = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            function(text)
+            times.append(time.perf_counter() - start)
+    return percentiles(times)
+
+
+def like_search(my_db, table, columns, text, per_page=10):
+    """Hledání přes LIKE '%text%' (průchod celou tabulkou) pro srovnání."""
+    condition = ' OR '.join(f'{column} LIKE :text' for column in columns)
+    with my_db._database() as db:
+        rows = db.cursor.execute(f'SELECT * FROM {table} WHERE {condition} ORDER BY id LIMIT :limit',
+                                 {'text': f'%{text}%', 'limit': per_page}).fetchall()
+        total = db.cursor.execute(f'SELECT count(*) FROM {table} WHERE {condition}', {'text': f'%{text}%'}).fetchone()[0]
+    return rows, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=1000000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        generate_database(db_name, args.persons, args.policies, 2)
+        print(f'pojištěnců: {args.persons}, pojištění: {args.policies} (vytvoření {time.perf_counter() - start:.1f} s)')
+
+        my_db = DatabaseInterface(db_name, storage_profile='wal')
+        my_db.create_tables()
+        try:
+            print(f"{'dotaz':20} {'FTS p50':>10} {'FTS p95':>10} {'LIKE p50':>10} {'LIKE p95':>10}")
+            for name, (texts, method, columns) in QUERIES.items():
+                table = 'InsuredPersons' if method == 'search_insured_persons' else 'InsurancePolicies'
+                fts = measure(getattr(my_db, method), texts, args.repeat)
+                like = measure(lambda text: like_search(my_db, table, columns, text), texts, args.repeat)
+                print(f'{name:20} {fts[0]:8.2f}ms {fts[1]:8.2f}ms {like[0]:8.2f}ms {like[1]:8.2f}ms')
+
+            suggest = measure(lambda text: my_db.search_suggestions(text, 8), SUGGEST_TEXTS, args.repeat)
+            print(f"{'našeptávač':20} {suggest[0]:8.2f}ms {suggest[1]:8.2f}ms")
+        finally:
+            my_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Porovnání kolekce Persons (objekt na pojištěnce a vztah) a sloupcového snímku SnapshotPersons.
+
+Pro obě kolekce změří dobu načtení z databáze, přírůstek alokované paměti (tracemalloc, načtení
+se pro měření paměti opakuje zvlášť) a dobu přístupu: náhodné pojištěnce podle ID, kontrolu
+přítomnosti, průchod všemi pojištěnci a pojištěnce s daným pojištěním. Na závěr ověří,
+že snímek vrací stejné údaje jako Persons.
+
+Použití:
+    python -m benchmarks.bench_snapshot --persons 1000000 --policies 1000 --links 3
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from interface_to_db import DatabaseInterface
+
+from benchmarks.generate import LINK_DISTRIBUTIONS, generate_database
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def allocated(function):
+    """Přírůstek alokované paměti po volání funkce (výsledek se drží, dokud se nezměří) a špička v bajtech."""
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def person_fields(person):
+    return ((person.first_name, person.last_name, person.email, person.phone, person.street, person.city,
+             person.postal_code),
+            [(policy_id, policy.title, policy.insured_amount, policy.insured_object, policy.start_date,
+              policy.end_date) for policy_id, policy in person.policies])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=200000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--links', type=int, default=3, help='maximální počet pojištění na pojištěnce')
+    parser.add_argument('--distribution', choices=LINK_DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--lookups', type=int, default=20000, help='počet náhodných přístupů podle ID')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        counts = generate_database(db_name, args.persons, args.policies, args.links, distribution=args.distribution)
+        print(f"pojištěnců: {counts['persons']}, pojištění: {counts['policies']}, vztahů: {counts['links']}")
+        my_db = DatabaseInterface(db_name)
+        loaders = {'Persons': my_db.load_persons, 'SnapshotPersons': my_db.load_persons_snapshot}
+
+        rnd = random.Random(1)
+        lookup_ids = [rnd.randint(1, counts['persons']) for _ in range(args.lookups)]
+        policy_ids = [rnd.randint(1, counts['policies']) for _ in range(10)]
+        collections = {}
+        for name, load in loaders.items():
+            memory, peak = allocated(load)
+            load_time, persons = measure(load)
+            collections[name] = persons
+            lookup_time, _ = measure(lambda: [persons[_id] for _id in lookup_ids])
+            contains_time, _ = measure(lambda: [_id in persons for _id in lookup_ids])
+            iterate_time, _ = measure(lambda: sum(1 for _ in persons))
+            holders_time, _ = measure(lambda: [persons.holders(policy_id) for policy_id in policy_ids])
+            print(f'\n{name}')
+            print(f'  načtení:             {load_time:8.2f} s')
+            print(f'  paměť:               {memory / 1048576:8.1f} MB ({memory / len(persons):.0f} B na pojištěnce), '
+                  f'špička při načtení {peak / 1048576:.1f} MB')
+            print(f"  summary():           {persons.summary()['estimated_bytes'] / 1048576:8.1f} MB")
+            print(f'  pojištěnec podle ID: {lookup_time / args.lookups * 1e6:8.2f} µs')
+            print(f'  kontrola přítomnosti:{contains_time / args.lookups * 1e6:8.2f} µs')
+            print(f'  průchod všemi:       {iterate_time:8.2f} s')
+            print(f'  holders():           {holders_time / len(policy_ids) * 1000:8.2f} ms')
+
+        persons, snapshot = collections['Persons'], collections['SnapshotPersons']
+        mismatches = sum(person_fields(persons[_id]) != person_fields(snapshot[_id]) for _id in lookup_ids)
+        mismatches += sum(persons.holders(policy_id) != snapshot.holders(policy_id) for policy_id in policy_ids)
+        print(f'\nshoda se Persons: {"ano" if not mismatches else f"NE ({mismatches} rozdílů)"}')
+        my_db.close()
+
+
+if __name__ == '__main__':
+    main()
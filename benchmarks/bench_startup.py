@@ -0,0 +1,66 @@
+"""
+Měření doby načtení pojištěnců při startu aplikace (DatabaseInterface.load_persons).
+
+Porovnává původní načítání s jedním dotazem na pojištění pro každého pojištěnce
+a hromadné načtení pevným počtem dotazů.
+
+Použití:
+    python -m benchmarks.bench_startup --persons 200000 --policies 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database import DatabaseInsurances
+from interface_to_db import DatabaseInterface
+from insured_person import InsuredPerson
+from persons import Persons
+from policies import Policies
+from policy import InsurancePolicy
+
+from benchmarks.generate import generate_database
+
+
+def load_persons_per_person(db_name):
+    """Původní načítání: jeden dotaz na pojištění pro každého pojištěnce."""
+    db = DatabaseInsurances(db_name)
+    persons = Persons()
+    for row in db.fetch_all_insured_persons():
+        person_id, first_name, last_name, email, phone, street, city, postal_code = row
+        person = InsuredPerson(first_name, last_name, email, phone, street, city, postal_code)
+        policies = Policies()
+        for policy_id, title, insured_amount, insured_object, start_date, end_date in db.fetch_insurance_policies_by_person(person_id):
+            policies[policy_id] = InsurancePolicy(title, insured_amount, insured_object, start_date, end_date)
+        person.policies = policies
+        persons[person_id] = person
+    return persons
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=20000)
+    parser.add_argument('--policies', type=int, default=500)
+    parser.add_argument('--links', type=int, default=3, help='maximální počet pojištění na pojištěnce')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        generate_database(db_name, args.persons, args.policies, args.links)
+
+        per_person_time, _ = measure(load_persons_per_person, db_name)
+        bulk_time, persons = measure(DatabaseInterface(db_name).load_persons)
+
+    print(f'pojištěnců: {len(persons)}')
+    print(f'dotaz na pojištěnce: {per_person_time:.3f} s')
+    print(f'hromadné načtení:    {bulk_time:.3f} s ({per_person_time / bulk_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Měření propustnosti zápisů: potvrzení po každém příkazu vs. DatabaseInterface.unit_of_work().
+
+Použití:
+    python -m benchmarks.bench_unit_of_work --inserts 10000 --profile wal
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database import STORAGE_PROFILES
+from interface_to_db import DatabaseInterface
+from insured_person import InsuredPerson
+
+
+def insert_persons(my_db, count):
+    for i in range(count):
+        my_db.add_insured_person_to_db(
+            InsuredPerson('Jan', 'Novák', f'osoba{i}@example.cz', '777123456', 'Hlavní 1', 'Praha', '11000'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inserts', type=int, default=10000)
+    parser.add_argument('--profile', choices=STORAGE_PROFILES.keys(), default='wal')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        my_db = DatabaseInterface(os.path.join(tmp, 'single.db'), storage_profile=args.profile)
+        my_db.create_tables()
+        start = time.perf_counter()
+        insert_persons(my_db, args.inserts)
+        single_time = time.perf_counter() - start
+        my_db.close()
+
+        my_db = DatabaseInterface(os.path.join(tmp, 'batch.db'), storage_profile=args.profile)
+        my_db.create_tables()
+        start = time.perf_counter()
+        with my_db.unit_of_work():
+            insert_persons(my_db, args.inserts)
+        batch_time = time.perf_counter() - start
+        my_db.close()
+
+    print(f'profil: {args.profile}, záznamů: {args.inserts}')
+    print(f'potvrzení po příkazu: {args.inserts / single_time:10.0f} záznamů/s')
+    print(f'unit_of_work:         {args.inserts / batch_time:10.0f} záznamů/s ({single_time / batch_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
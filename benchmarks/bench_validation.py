@@ -0,0 +1,89 @@
+"""
+Měření propustnosti kontroly pojištěnců (utils.Check).
+
+Porovnává původní kontrolu (regulární výrazy jako řetězce, telefon až třemi výrazy),
+kontrolu po objektech (Person.check_valid_data) a kontrolu celých sloupců (Person.check_columns).
+
+Použití:
+    python -m benchmarks.bench_validation --rows 1000000
+"""
+import argparse
+import random
+import re
+import time
+
+from insured_person import InsuredPerson
+from importer import PERSON_FIELDS
+
+from benchmarks.generate import FIRST_NAMES, LAST_NAMES, CITIES, STREETS
+
+
+def legacy_check(first_name, last_name, email, phone, street, city, postal_code):
+    """Původní kontrola pojištěnce (re.match s řetězcem při každém volání)."""
+    if len(first_name.strip()) == 0:
+        return "first_name"
+    if len(last_name.strip()) == 0:
+        return "last_name"
+    if not re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+.[a-zA-Z]{2,}$", email):
+        return "email"
+    if not (re.match(r"^\d+$", phone) or re.match(r"^\d+(-\d+)*$", phone)
+            or re.match(r"^(\d+)\s?\d+(-\d+)*$", phone)):
+        return "phone"
+    if len(street.strip()) == 0:
+        return "street"
+    if len(city.strip()) == 0:
+        return "city"
+    if not re.match(r"^[A-Za-z\d][A-Za-z\d\s-]*$", postal_code):
+        return "postal_code"
+    return None
+
+
+def generate_rows(count, invalid_ratio=0.05, seed=1):
+    """Vytvoří řádky pojištěnců, přibližně invalid_ratio z nich je neplatných."""
+    rng = random.Random(seed)
+    phones = ('777123456', '777-123-456', '420 777123456', '(420)777', '')
+    rows = []
+    for number in range(count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        email = f'klient.{number}@example.cz'
+        phone = phones[rng.randrange(3)]
+        postal_code = f'{rng.randrange(10000, 80000)}'
+        if rng.random() < invalid_ratio:
+            email, phone, postal_code = 'bez zavináče', phones[rng.randrange(3, 5)], '-'
+        rows.append((first_name, last_name, email, phone, f'{rng.choice(STREETS)} {number % 200 + 1}',
+                     rng.choice(CITIES), postal_code))
+    return rows
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows)
+    persons = [InsuredPerson(*row) for row in rows]
+    columns = {field: [row[index] for row in rows] for index, field in enumerate(PERSON_FIELDS)}
+
+    legacy_time, legacy = measure(lambda: [legacy_check(*row) for row in rows])
+    objects_time, _ = measure(lambda: [person.check_valid_data() for person in persons])
+    batch_time, codes = measure(InsuredPerson.check_columns, columns)
+    all_time, _ = measure(InsuredPerson.check_columns, columns, True)
+
+    if codes != legacy:
+        raise RuntimeError('Kontrola po sloupcích se liší od původní kontroly.')
+
+    print(f'řádků: {args.rows}, neplatných: {sum(code is not None for code in codes)}')
+    for name, elapsed in (('původní kontrola', legacy_time), ('check_valid_data', objects_time),
+                          ('check_columns', batch_time), ('check_columns (všechny chyby)', all_time)):
+        print(f'{name:30} {elapsed:.3f} s, {args.rows / elapsed / 1e6:.2f} M řádků/s ({legacy_time / elapsed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
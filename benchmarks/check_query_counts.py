@@ -0,0 +1,98 @@
+"""
+Kontrola počtu dotazů do databáze na trasách aplikace a v hromadných metodách DatabaseInterface.
+
+Každá trasa má nejvyšší povolený počet dotazů (při vypnuté cache), který nezávisí na počtu
+řádků v databázi. Pokud stránka začne posílat dotazy pro každý řádek (N+1), kontrola selže
+s přehledem dotazů a místem volání (viz query_detector.py).
+Při chybě vrací nenulový návratový kód, lze ho tedy spouštět v CI.
+
+Použití:
+    python -m benchmarks.check_query_counts
+"""
+import os
+import sys
+import tempfile
+
+from wsgi import create_app
+from query_detector import assert_max_queries
+
+from benchmarks.generate import generate_database
+
+API_PREFIX = '/api/v1'
+
+# Cesta a nejvyšší počet dotazů
+ROUTE_BUDGETS = [
+    ('/persons?page=2', 2),
+    ('/policies?page=2', 2),
+    ('/policies?active_on=2020-06-01&amount_min=1000', 2),
+    ('/person/5', 3),
+    ('/add_person_policy/5', 2),
+    ('/edit_person/5/persons/1', 1),
+    ('/edit_policy/5/policies/1', 1),
+    ('/search?q=nov', 4),
+    ('/search?q=nov&kind=policies', 4),
+    ('/search.json?q=nov', 2),
+    ('/stats', 5),
+    ('/stats.json', 5),
+    # Export čte dávky po 1000 řádcích (1000 pojištěnců = plná dávka a prázdná dávka)
+    ('/export/persons/csv', 2),
+    (f'{API_PREFIX}/persons?limit=100', 2),
+    (f'{API_PREFIX}/persons/5', 2),
+    (f'{API_PREFIX}/policies?limit=100', 2),
+    (f'{API_PREFIX}/persons/5/policies', 3),
+    (f'{API_PREFIX}/policies/5/persons', 3),
+    # Servisní stránka načte pojištěnce stránky hromadně (LazyPersons.preload)
+    ('/show_persons?page=1&per_page=20', 2),
+    # S filtrem with_policies se pojištěnci procházejí v dávkách po 100 (dva dotazy na dávku)
+    ('/show_persons?page=2&per_page=20&with_policies=1', 4),
+]
+
+
+def person_json(number):
+    return {'first_name': 'Jan', 'last_name': 'Novák', 'email': f'kontrola{number}@example.cz', 'phone': '777123456',
+            'street': 'Hlavní 1', 'city': 'Praha', 'postal_code': '11000'}
+
+
+def check(name, function):
+    """Provede kontrolu a vypíše výsledek; vrátí True, pokud selhala."""
+    try:
+        response = function()
+        if response is not None and response.status_code >= 400:
+            raise AssertionError(f'Status {response.status_code}')
+    except AssertionError as error:
+        print(f'CHYBA {name}\n      ' + str(error).replace('\n', '\n      '))
+        return True
+    print(f'OK    {name}')
+    return False
+
+
+def main():
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'counts.db')
+        generate_database(db_name, 1000, 100)
+        app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0, 'QUERY_DETECTOR': True})
+        client = app.test_client()
+        my_db = app.extensions['insurance'].my_db
+        detector = my_db.query_detector
+
+        for path, max_queries in ROUTE_BUDGETS:
+            failed |= check(f'{path} (<= {max_queries})', lambda: assert_max_queries(client, path, max_queries))
+
+        # Zápisy dávkou: počet dotazů nezávisí na velikosti dávky
+        items = [person_json(number) for number in range(200)]
+        failed |= check(f'POST {API_PREFIX}/persons/batch (<= 4)',
+                        lambda: assert_max_queries(client, f'{API_PREFIX}/persons/batch', 4, method='POST',
+                                                   json={'items': items}))
+
+        # Načtení všech pojištěnců do paměti: tři průchody bez ohledu na počet pojištěnců
+        def load_persons():
+            with detector.max_queries(3, 'DatabaseInterface.load_persons'):
+                my_db.load_persons()
+        failed |= check('DatabaseInterface.load_persons (<= 3)', load_persons)
+        my_db.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
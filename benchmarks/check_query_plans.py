@@ -0,0 +1,101 @@
+"""
+Kontrola plánů dotazů (EXPLAIN QUERY PLAN) pro často volané metody DatabaseInsurances.
+
+Zachytí SQL, které metody skutečně posílají do SQLite, a ověří, že žádný z dotazů
+neprochází celou tabulku bez indexu (kromě tabulek povolených u dané metody).
+Stejnou kontrolu provádí test tests/test_database.py (python -m pytest); skript vypíše
+plány dotazů i pro ruční zkoumání a při chybě vrací nenulový návratový kód.
+
+Použití:
+    python -m benchmarks.check_query_plans
+"""
+import os
+import re
+import sys
+import tempfile
+
+from database import DatabaseInsurances
+
+from benchmarks.generate import generate_database
+
+
+# Metoda, argumenty (slovník na konci = pojmenované argumenty), tabulky, které smí metoda procházet celé
+HOT_QUERIES = [
+    ('fetch_insured_person', (5,), ()),
+    ('insured_person_exist', ('Jan', 'Novák', 'osoba5@example.cz'), ()),
+    ('find_insurance_policy_by_name', ('Pojištění 5',), ()),
+    ('find_insurance_policy_id_by_name', ('Pojištění 5',), ()),
+    ('fetch_insurance_policies_by_person', (5,), ()),
+    ('fetch_insurance_policy_by_id', (5,), ()),
+    ('fetch_person_ids_by_policy', (5,), ()),
+    # Bez kurzoru se začátek stránky hledá posunem po primárním klíči
+    ('fetch_insured_persons_page', (2, 3), ('InsuredPersons',)),
+    ('fetch_insured_persons_page', (2, 3, 3), ()),
+    ('fetch_insurance_policies_page', (2, 3), ('InsurancePolicies',)),
+    ('fetch_insurance_policies_page', (2, 3, 3), ()),
+    # Dávky exportu stránkované podle primárního klíče
+    ('fetch_insured_persons_after', (500, 100), ()),
+    ('fetch_insurance_policies_after', (50, 100), ()),
+    ('fetch_person_insurance_policies_after', ((500, 3), 100), ()),
+    # Hromadné načtení pojištěnců stránky (LazyPersons.preload)
+    ('fetch_insured_persons_by_ids', ([5, 50, 500],), ()),
+    ('fetch_insurance_policies_by_persons', ([5, 50, 500],), ()),
+    # Seznam nesjednaných pojištění nutně prochází všechna pojištění
+    ('fetch_all_unused_insurance_policies', (), ('InsurancePolicies',)),
+    # Filtry pojištění podle platnosti a částky (pojmenované argumenty)
+    ('fetch_insurance_policies_filtered', (1, 3, {'active_on': '2020-06-01T00:00'}), ()),
+    ('fetch_insurance_policies_filtered', (1, 3, {'end_from': '2025-06-01T00:00', 'end_to': '2025-12-31T23:59'}), ()),
+    ('fetch_insurance_policies_filtered', (1, 3, {'start_to': '2020-06-01T23:59', 'end_from': '2020-06-01T00:00'}), ()),
+    ('fetch_insurance_policies_filtered', (1, 3, {'amount_min': 1000, 'amount_max': 5000}), ()),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?: AS \w+)?$')
+
+
+def query_plan_violations(db, method, args, allowed_scans):
+    """
+    Spustí metodu a vrátí seznam dotazů, které procházejí tabulku bez indexu.
+
+    Returns:
+        list[tuple]: Dvojice (SQL dotazu, řádek plánu).
+    """
+    keywords = args[-1] if args and isinstance(args[-1], dict) else {}
+    if keywords:
+        args = args[:-1]
+    statements = []
+    db.connection.set_trace_callback(statements.append)
+    try:
+        getattr(db, method)(*args, **keywords)
+    finally:
+        db.connection.set_trace_callback(None)
+
+    tables = {row[0] for row in db.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    violations = []
+    for statement in statements:
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            continue
+        for row in db.connection.execute(f'EXPLAIN QUERY PLAN {statement}'):
+            match = FULL_SCAN.search(row[3])
+            if match and match.group(1) in tables and match.group(1) not in allowed_scans:
+                violations.append((' '.join(statement.split()), row[3]))
+    return violations
+
+
+def main():
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'plans.db')
+        generate_database(db_name, 1000, 100)
+        db = DatabaseInsurances(db_name)
+        for method, args, allowed_scans in HOT_QUERIES:
+            violations = query_plan_violations(db, method, args, allowed_scans)
+            print(f"{'CHYBA' if violations else 'OK':6}{method}{args}")
+            for statement, plan in violations:
+                print(f'      {plan}\n      {statement}')
+            failed = failed or bool(violations)
+        db.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Deterministický generátor portfolia pro měření: pojištěnci s českými jmény a adresami, pojištění
+a jejich vztahy podle zvoleného rozdělení. Data se zapisují přes DatabaseInsurances (hromadné metody),
+se stejným semínkem vznikne vždy stejná databáze.
+
+Použití (samostatně, např. pro ruční zkoušení aplikace):
+    python -m benchmarks.generate insurance.db --persons 100000 --policies 1000 --links 3 --distribution skewed
+"""
+import argparse
+import bisect
+import itertools
+import random
+from datetime import date, timedelta
+
+from database import DatabaseInsurances
+
+
+MALE_FIRST_NAMES = ['Jan', 'Petr', 'Jiří', 'Pavel', 'Tomáš', 'Martin', 'Josef', 'Lukáš', 'Jakub', 'Michal',
+                    'Karel', 'František', 'Václav', 'Ondřej', 'Vojtěch']
+FEMALE_FIRST_NAMES = ['Jana', 'Eva', 'Marie', 'Lucie', 'Kateřina', 'Hana', 'Anna', 'Tereza', 'Lenka', 'Petra',
+                      'Veronika', 'Alena', 'Martina', 'Zuzana', 'Barbora']
+# Příjmení v mužském a ženském tvaru (stejné pořadí)
+LAST_NAMES = ['Novák', 'Svoboda', 'Novotný', 'Dvořák', 'Černý', 'Procházka', 'Kučera', 'Veselý', 'Horák', 'Němec',
+              'Marek', 'Pokorný', 'Král', 'Růžička', 'Beneš', 'Fiala', 'Sedláček', 'Doležal', 'Zeman', 'Kolář']
+FEMALE_LAST_NAMES = ['Nováková', 'Svobodová', 'Novotná', 'Dvořáková', 'Černá', 'Procházková', 'Kučerová', 'Veselá',
+                     'Horáková', 'Němcová', 'Marková', 'Pokorná', 'Králová', 'Růžičková', 'Benešová', 'Fialová',
+                     'Sedláčková', 'Doležalová', 'Zemanová', 'Kolářová']
+FIRST_NAMES = MALE_FIRST_NAMES + FEMALE_FIRST_NAMES
+
+# Město a rozsah jeho poštovních směrovacích čísel
+POSTAL_CODES = {
+    'Praha': (10000, 19999), 'Brno': (60200, 64400), 'Ostrava': (70030, 72529), 'Plzeň': (30100, 32600),
+    'Liberec': (46001, 46015), 'Olomouc': (77900, 77900), 'České Budějovice': (37001, 37011),
+    'Hradec Králové': (50002, 50012), 'Pardubice': (53002, 53012), 'Zlín': (76001, 76005),
+    'Jihlava': (58601, 58601), 'Ústí nad Labem': (40001, 40011), 'Karlovy Vary': (36001, 36017),
+}
+CITIES = list(POSTAL_CODES)
+# Váhy měst (větší města mají víc pojištěnců)
+CITY_WEIGHTS = [30, 12, 8, 6, 3, 3, 3, 3, 3, 2, 2, 2, 2]
+STREETS = ['Hlavní', 'Nádražní', 'Školní', 'Zahradní', 'Krátká', 'Lipová', 'Polní', 'Komenského', 'Husova',
+           'Palackého', 'Masarykova', 'Na Výsluní', 'U Potoka', 'Smetanova', 'Jiráskova', 'Tyršova']
+
+INSURED_OBJECTS = ['Majetek', 'Byt', 'Rodinný dům', 'Automobil', 'Život', 'Úraz', 'Odpovědnost', 'Cestování']
+
+# Rozdělení vztahů pojištěnec -> pojištění:
+#   uniform: každý pojištěnec má 0 až links_per_person pojištění, pojištění vybraná rovnoměrně
+#   fixed:   každý pojištěnec má právě links_per_person pojištění, vybraná rovnoměrně
+#   skewed:  jako uniform, ale pojištění s nižším ID jsou oblíbenější (Zipf, váha 1/ID);
+#            několik pojištění pak sdílí velká část pojištěnců
+LINK_DISTRIBUTIONS = ('uniform', 'fixed', 'skewed')
+
+# Počet řádků zapsaných jedním voláním hromadné metody
+CHUNK_SIZE = 10000
+
+_FIRST_DAY = date(2015, 1, 1)
+
+
+def _person(rnd, number):
+    """Pole jednoho pojištěnce (first_name, last_name, email, phone, street, city, postal_code)."""
+    name = rnd.randrange(len(LAST_NAMES))
+    if rnd.random() < 0.5:
+        first_name, last_name = rnd.choice(MALE_FIRST_NAMES), LAST_NAMES[name]
+    else:
+        first_name, last_name = rnd.choice(FEMALE_FIRST_NAMES), FEMALE_LAST_NAMES[name]
+    city = rnd.choices(CITIES, CITY_WEIGHTS)[0]
+    low, high = POSTAL_CODES[city]
+    return (first_name, last_name, f'osoba{number}@example.cz', f'{rnd.randint(600000000, 799999999)}',
+            f'{rnd.choice(STREETS)} {rnd.randint(1, 200)}', city, f'{rnd.randint(low, high)}')
+
+
+def _policy(rnd, number):
+    """Pole jednoho pojištění (title, insured_amount, insured_object, start_date, end_date)."""
+    start = _FIRST_DAY + timedelta(days=rnd.randrange(365 * 11))
+    end = start + timedelta(days=365 * rnd.randint(1, 10) - 1)
+    return (f'Pojištění {number}', rnd.randint(10, 5000) * 1000, rnd.choice(INSURED_OBJECTS),
+            f'{start.isoformat()}T00:00', f'{end.isoformat()}T00:00')
+
+
+def _links(rnd, person_ids, policy_ids, links_per_person, distribution):
+    """Generátor dvojic (person_id, policy_id) podle rozdělení."""
+    if distribution not in LINK_DISTRIBUTIONS:
+        raise ValueError(f"Unknown link distribution: {distribution}")
+    if not policy_ids:
+        return
+    limit = min(links_per_person, len(policy_ids))
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(policy_ids) + 1)))
+    for person_id in person_ids:
+        count = limit if distribution == 'fixed' else rnd.randint(0, limit)
+        if distribution == 'skewed':
+            chosen = set()
+            while len(chosen) < count:
+                chosen.add(policy_ids[bisect.bisect(cum_weights, rnd.random() * cum_weights[-1])])
+        else:
+            chosen = rnd.sample(policy_ids, count)
+        for policy_id in chosen:
+            yield person_id, policy_id
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def generate_database(db_name, persons, policies, links_per_person=2, seed=1, distribution='uniform'):
+    """
+    Vytvoří databázi s vygenerovanými pojištěnci, pojištěními a jejich vztahy.
+
+    Data se zapisují hromadnými metodami DatabaseInsurances v jedné transakci
+    (spouští se tedy i triggery statistik, vyhledávání a verzí dat).
+
+    Args:
+        db_name (str): Cesta k databázi.
+        persons (int): Počet pojištěnců.
+        policies (int): Počet pojištění.
+        links_per_person (int): Maximální (u 'fixed' přesný) počet pojištění na pojištěnce.
+        seed (int): Semínko generátoru náhodných čísel.
+        distribution (str): Rozdělení vztahů (viz LINK_DISTRIBUTIONS).
+
+    Returns:
+        dict: Počet pojištěnců, pojištění a vztahů.
+    """
+    rnd = random.Random(seed)
+    with DatabaseInsurances(db_name) as db:
+        db.create_tables()
+        with db.transaction():
+            policy_ids = []
+            for chunk in _chunks((_policy(rnd, number) for number in range(1, policies + 1)), CHUNK_SIZE):
+                policy_ids += db.insert_insurance_policies(chunk)
+            person_ids = []
+            for chunk in _chunks((_person(rnd, number) for number in range(1, persons + 1)), CHUNK_SIZE):
+                person_ids += [row[0] for row in db.insert_insured_persons(chunk)]
+            links = 0
+            for chunk in _chunks(_links(rnd, person_ids, policy_ids, links_per_person, distribution), CHUNK_SIZE):
+                links += db.insert_person_insurance_policies(chunk)
+    return {'persons': len(person_ids), 'policies': len(policy_ids), 'links': links}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('db_name', help='cesta k nové databázi')
+    parser.add_argument('--persons', type=int, default=100000)
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--links', type=int, default=2, help='maximální počet pojištění na pojištěnce')
+    parser.add_argument('--distribution', choices=LINK_DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    counts = generate_database(args.db_name, args.persons, args.policies, args.links, args.seed, args.distribution)
+    print(f"pojištěnců: {counts['persons']}, pojištění: {counts['policies']}, vztahů: {counts['links']}")
+
+
+if __name__ == '__main__':
+    main()
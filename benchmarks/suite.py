@@ -0,0 +1,360 @@
+"""
+Sada měření výkonu nad vygenerovaným portfoliem (benchmarks.generate) s výsledky ve formátu JSON.
+
+Skupiny měření:
+    startup      načtení pojištěnců při startu (load_persons, load_persons_lazy, load_persons_snapshot)
+                 a stránkování tabulek
+    routes       každá trasa GET aplikace přes testovacího klienta Flask (kromě tras, které mažou)
+    collections  operace kolekce Persons (přístup, replace_policy, delete_policy, summary)
+    validators   kontroly pojištěnců a pojištění (po objektech i po sloupcích)
+    sql          často volané metody DatabaseInsurances (viz check_query_plans.HOT_QUERIES)
+    writes       zápisové trasy (formuláře, JSON API); mění databázi, proto se měří jako poslední
+
+Každé měření se jednou zahřeje a pak opakuje --repeat krát; ukládá se medián, minimum a maximum v ms.
+S --baseline se výsledky porovnají s uloženým během a zhoršení minima o víc než --tolerance
+(a zároveň o víc než --min-delta-ms) se hlásí jako regrese; návratový kód je pak 1. Porovnává se
+minimum, které méně ovlivňuje zátěž stroje z jiných procesů než medián. Na začátku běhu se navíc
+změří pevná kalibrační úloha (Python a SQLite v paměti); časy základny se před porovnáním přepočtou
+poměrem kalibrací, takže celkově pomalejší nebo vytížený stroj nehlásí regrese všude (--no-calibrate vypne).
+Porovnávat má smysl jen běhy na stejném stroji se stejnými parametry generátoru.
+
+Uložená základna benchmarks/baseline.json je z referenčního stroje s výchozími parametry;
+po zamýšlené změně výkonu se přepíše volbou --output benchmarks/baseline.json.
+
+Použití:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --groups routes sql --persons 200000 --repeat 10
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import count
+
+from database import DatabaseInsurances
+from insured_person import InsuredPerson
+from policy import InsurancePolicy
+from table_utils import Pagination
+from wsgi import create_app
+
+from benchmarks.check_query_plans import HOT_QUERIES
+from benchmarks.generate import LINK_DISTRIBUTIONS, generate_database
+
+GROUPS = ('startup', 'routes', 'collections', 'validators', 'sql', 'writes')
+
+API_PREFIX = '/api/v1'
+
+# Hodnoty parametrů tras (person_id a policy_id se doplní podle velikosti portfolia)
+ROUTE_ARGUMENTS = {'source': 'persons', 'page': 1, 'current_page': 1, 'kind': 'persons', 'file_format': 'csv'}
+# Dotazy tras, které bez parametrů nic nedělají
+ROUTE_QUERIES = {'search': '?q=nov', 'search_json': '?q=nov', 'show_persons': '?page=1&per_page=100',
+                 'api.list_persons': '?limit=100', 'api.list_policies': '?limit=100'}
+
+
+def measure(function, repeat, setup=None, number=1):
+    """
+    Změří funkci.
+
+    Args:
+        function (callable): Měřená funkce (bez parametrů, případně s výsledkem setup).
+        repeat (int): Počet měření.
+        setup (callable): Příprava před každým měřením (neměří se); výsledek se předá funkci.
+        number (int): Počet volání v jednom měření (výsledek je doba jednoho volání).
+
+    Returns:
+        dict: Medián, minimum a maximum v ms a počet měření.
+    """
+    times = []
+    # Jako timeit: garbage collector se během měření vypne, jinak náhodně padá do různých měření
+    gc_enabled = gc.isenabled()
+    try:
+        for run in range(repeat + 1):
+            argument = setup() if setup is not None else None
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(number):
+                function(argument) if setup is not None else function()
+            elapsed = (time.perf_counter() - start) / number * 1000
+            if gc_enabled:
+                gc.enable()
+            # První běh je zahřátí (šablony, cache SQLite, importy)
+            if run:
+                times.append(elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {'median_ms': round(statistics.median(times), 4), 'min_ms': round(min(times), 4),
+            'max_ms': round(max(times), 4), 'runs': repeat}
+
+
+def calibrate(repeat=5):
+    """
+    Změří pevnou úlohu nezávislou na aplikaci (výpočet v Pythonu a dotazy do SQLite v paměti).
+
+    Returns:
+        float: Minimum doby úlohy v ms.
+    """
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    connection.executemany('INSERT INTO t (name) VALUES (?)', ((f'jméno {i}',) for i in range(10000)))
+
+    def task():
+        total = sum(len(str(i)) for i in range(50000))
+        rows = connection.execute('SELECT id, name FROM t WHERE name LIKE ? ORDER BY name', ('%5%',)).fetchall()
+        return total + len(rows)
+
+    try:
+        return measure(task, repeat)['min_ms']
+    finally:
+        connection.close()
+
+
+def _checked(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.request.method} {response.request.path}: {response.status_code}')
+    return response
+
+
+def bench_startup(context, repeat):
+    my_db, persons = context['my_db'], context['persons']
+    results = {
+        'load_persons': measure(my_db.load_persons, repeat),
+        'load_persons_lazy': measure(lambda: my_db.load_persons_lazy(), repeat),
+        'lazy_first_access_1000': measure(lambda lazy: [lazy[person_id] for person_id in range(1, 1001)], repeat,
+                                          setup=lambda: my_db.load_persons_lazy()),
+        'load_persons_snapshot': measure(my_db.load_persons_snapshot, repeat),
+        'snapshot_access_1000': measure(lambda snapshot: [snapshot[person_id] for person_id in range(1, 1001)], repeat,
+                                        setup=my_db.load_persons_snapshot),
+    }
+    for table in ('persons', 'policies'):
+        middle = (persons if table == 'persons' else context['policies']) // 6
+        results[f'calculate_table_pages.{table}'] = measure(
+            lambda: Pagination.calculate_table_pages(my_db, table, 3, middle), repeat)
+    return results
+
+
+def bench_routes(context, repeat):
+    app, client = context['app'], context['client']
+    arguments = {**ROUTE_ARGUMENTS, 'person_id': context['persons'] // 2, 'policy_id': context['policies'] // 2}
+    results = {}
+    with app.test_request_context():
+        from flask import url_for
+        for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+            if 'GET' not in rule.methods or rule.endpoint == 'static' or 'delete' in rule.endpoint:
+                continue
+            path = url_for(rule.endpoint, **{name: arguments[name] for name in rule.arguments})
+            path += ROUTE_QUERIES.get(rule.endpoint, '')
+            results[f'GET {rule.rule}'] = measure(lambda: _checked(client.get(path)).get_data(), repeat, number=10)
+    return results
+
+
+def bench_writes(context, repeat):
+    client, person_id = context['client'], context['persons'] // 2
+    numbers = count(1)
+
+    def person_form():
+        number = next(numbers)
+        return {'first_name': 'Jan', 'last_name': 'Zápis', 'email': f'zapis{number}@example.cz',
+                'phone': '777123456', 'street': 'Hlavní 1', 'city': 'Praha', 'postal_code': '11000'}
+
+    def policy_form():
+        return {'title': f'Zápis {next(numbers)}', 'insured_amount': '100000', 'insured_object': 'Byt',
+                'start_date': '2024-01-01T00:00', 'end_date': '2030-01-01T00:00'}
+
+    def create_person(form):
+        return _checked(client.post(f'{API_PREFIX}/persons', json=form)).json['id']
+
+    return {
+        'POST /new': measure(lambda form: _checked(client.post('/new', data=form)), repeat, setup=person_form),
+        'POST /new2': measure(lambda form: _checked(client.post('/new2', data=form)), repeat, setup=policy_form),
+        'POST /edit_person': measure(
+            lambda form: _checked(client.post(f'/edit_person/{person_id}/persons/1', data=form)), repeat,
+            setup=person_form),
+        'GET /delete_person': measure(lambda new_id: _checked(client.get(f'/delete_person/{new_id}')), repeat,
+                                      setup=lambda: create_person(person_form())),
+        f'POST {API_PREFIX}/persons': measure(create_person, repeat, setup=person_form),
+        f'PATCH {API_PREFIX}/persons': measure(
+            lambda form: _checked(client.patch(f'{API_PREFIX}/persons/{person_id}', json={'email': form['email']})),
+            repeat, setup=person_form),
+        f'POST {API_PREFIX}/persons/batch (100)': measure(
+            lambda items: _checked(client.post(f'{API_PREFIX}/persons/batch', json={'items': items})), repeat,
+            setup=lambda: [person_form() for _ in range(100)]),
+    }
+
+
+def bench_collections(context, repeat):
+    persons = context['my_db'].load_persons()
+    ids = persons.ids()
+    popular = max(range(1, context['policies'] + 1), key=lambda policy_id: len(persons.holders(policy_id)))
+    replacement = InsurancePolicy('Náhrada', 1000, 'Byt', '2024-01-01T00:00', '2030-01-01T00:00')
+    return {
+        'getitem_10000': measure(lambda: [persons[person_id] for person_id in ids[:10000]], repeat),
+        'iterate': measure(lambda: sum(person.policies_count for _, person in persons), repeat),
+        'holders_popular_policy': measure(lambda: persons.holders(popular), repeat),
+        'replace_policy_popular': measure(lambda: persons.replace_policy(popular, replacement), repeat),
+        # Odstranění mění kolekci, každé měření má vlastní čerstvou kolekci
+        'delete_policy_popular': measure(lambda fresh: fresh.delete_policy(popular), repeat,
+                                         setup=lambda: context['my_db'].load_persons()),
+        'summary': measure(persons.summary, repeat),
+        'setitem_10000': measure(
+            lambda fresh: [fresh.__setitem__(person_id, InsuredPerson('Jan', 'Novák', 'a@example.cz', '777123456',
+                                                                      'Hlavní 1', 'Praha', '11000'))
+                           for person_id in range(1, 10001)], repeat, setup=type(persons)),
+    }
+
+
+def bench_validators(context, repeat):
+    with DatabaseInsurances(context['db_name']) as db:
+        # Jen vygenerované záznamy (nezávisle na tom, zda už proběhla měření zápisů)
+        person_rows = [row for row in db.iter_all_insured_persons() if row[0] <= min(context['persons'], 10000)]
+        policy_rows = [row for row in db.iter_all_insurance_policies() if row[0] <= min(context['policies'], 10000)]
+    persons = [InsuredPerson(*row[1:]) for row in person_rows]
+    policies = [InsurancePolicy(*row[1:]) for row in policy_rows]
+    person_columns = {name: [row[index] for row in person_rows] for index, name in
+                      enumerate(('id', 'first_name', 'last_name', 'email', 'phone', 'street', 'city', 'postal_code'))}
+    policy_columns = {name: [row[index] for row in policy_rows] for index, name in
+                      enumerate(('id', 'title', 'insured_amount', 'insured_object', 'start_date', 'end_date'))}
+    return {
+        f'person.check_valid_data ({len(persons)})': measure(
+            lambda: [person.check_valid_data() for person in persons], repeat),
+        f'person.check_columns ({len(persons)})': measure(
+            lambda: InsuredPerson.check_columns(person_columns), repeat),
+        f'policy.check_valid_data ({len(policies)})': measure(
+            lambda: [policy.check_valid_data() for policy in policies], repeat),
+        f'policy.check_columns ({len(policies)})': measure(
+            lambda: InsurancePolicy.check_columns(policy_columns), repeat),
+    }
+
+
+def bench_sql(context, repeat):
+    results = {}
+    with DatabaseInsurances(context['db_name']) as db:
+        for method, args, _ in HOT_QUERIES:
+            keywords = args[-1] if args and isinstance(args[-1], dict) else {}
+            positional = args[:-1] if keywords else args
+            name = f"{method}({', '.join([*map(repr, positional), *(f'{key}={value!r}' for key, value in keywords.items())])})"
+            results[name] = measure(lambda: getattr(db, method)(*positional, **keywords), repeat, number=10)
+        results['search_insured_persons(nov)'] = measure(
+            lambda: db.search_insured_persons('nov*', 10), repeat, number=10)
+        results['fetch_portfolio_stats'] = measure(
+            lambda: db.fetch_portfolio_stats('2025-01-01T00:00'), repeat, number=10)
+    return results
+
+
+BENCHMARKS = {'startup': bench_startup, 'routes': bench_routes, 'collections': bench_collections,
+              'validators': bench_validators, 'sql': bench_sql, 'writes': bench_writes}
+
+
+def compare(results, baseline, tolerance, min_delta_ms, calibrate=True):
+    """
+    Porovná výsledky se základnou.
+
+    Args:
+        calibrate (bool): Přepočítat časy základny poměrem kalibrací obou běhů.
+
+    Returns:
+        list[tuple]: Regrese (název, základna ms, výsledek ms, poměr).
+    """
+    if baseline['meta']['portfolio'] != results['meta']['portfolio']:
+        print(f"Pozor: jiné portfolio než základna ({baseline['meta']['portfolio']}), porovnání je orientační.")
+    scale = 1.0
+    if calibrate and baseline['meta'].get('calibration_ms') and results['meta'].get('calibration_ms'):
+        scale = results['meta']['calibration_ms'] / baseline['meta']['calibration_ms']
+        print(f'kalibrace: základna {baseline["meta"]["calibration_ms"]:.3f} ms, nyní '
+              f'{results["meta"]["calibration_ms"]:.3f} ms, časy základny se násobí {scale:.2f}')
+    regressions = []
+    print(f"\n{'měření':70} {'základna':>10} {'nyní':>10} {'poměr':>7}")
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f'{name[:70]:70} {"-":>10} {result["min_ms"]:10.3f}')
+            continue
+        expected = base['min_ms'] * scale
+        ratio = result['min_ms'] / expected if expected else 1.0
+        regression = ratio > 1 + tolerance and result['min_ms'] - expected > min_delta_ms
+        mark = '  REGRESE' if regression else ''
+        print(f'{name[:70]:70} {expected:10.3f} {result["min_ms"]:10.3f} {ratio:6.2f}x{mark}')
+        if regression:
+            regressions.append((name, expected, result['min_ms'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--persons', type=int, default=20000)
+    parser.add_argument('--policies', type=int, default=500)
+    parser.add_argument('--links', type=int, default=2, help='maximální počet pojištění na pojištěnce')
+    parser.add_argument('--distribution', choices=LINK_DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=5, help='počet měření každé položky')
+    parser.add_argument('--cache-size', type=int, default=0, help='cache aplikace (0 = měřit dotazy do databáze)')
+    parser.add_argument('--output', help='uložit výsledky do souboru JSON')
+    parser.add_argument('--baseline', help='porovnat s výsledky uloženými v souboru JSON')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='povolené zhoršení (0.5 = 50 %%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1, help='menší zhoršení v ms se nehlásí')
+    parser.add_argument('--no-calibrate', dest='calibrate', action='store_false',
+                        help='nepřepočítávat základnu podle rychlosti stroje')
+    args = parser.parse_args()
+
+    calibration_ms = calibrate()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'suite.db')
+        start = time.perf_counter()
+        counts = generate_database(db_name, args.persons, args.policies, args.links, args.seed, args.distribution)
+        print(f"portfolio: {counts}, vygenerováno za {time.perf_counter() - start:.1f} s")
+
+        app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': args.cache_size})
+        context = {'db_name': db_name, 'app': app, 'client': app.test_client(),
+                   'my_db': app.extensions['insurance'].my_db, 'persons': args.persons, 'policies': args.policies}
+        results = {}
+        for group in args.groups:
+            start = time.perf_counter()
+            for name, result in BENCHMARKS[group](context, args.repeat).items():
+                results[f'{group}.{name}'] = result
+            print(f'{group}: {time.perf_counter() - start:.1f} s')
+        context['my_db'].close()
+
+    output = {
+        'meta': {
+            'portfolio': {**counts, 'links_per_person': args.links, 'distribution': args.distribution,
+                          'seed': args.seed},
+            'repeat': args.repeat,
+            'cache_size': args.cache_size,
+            'calibration_ms': calibration_ms,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, ensure_ascii=False, indent=2)
+            file.write('\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(output, json.load(file), args.tolerance, args.min_delta_ms,
+                                  args.calibrate)
+        print(f'\nregresí: {len(regressions)}')
+        return 1 if regressions else 0
+
+    for name, result in results.items():
+        print(f'{name[:70]:70} {result["median_ms"]:10.3f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
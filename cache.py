@@ -0,0 +1,318 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+
+from interface_to_db import DatabaseInterface
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Omezená cache s vyřazováním nejdéle nepoužitých položek (LRU), bezpečná pro více vláken.
+
+    Kromě položek udržuje generace pojmenovaných skupin (např. tabulek). Klíče, které obsahují
+    generaci skupiny, se zneplatní najednou zvýšením generace; staré položky pak vypadnou samy.
+
+    Attributes:
+        max_size (int): Maximální počet položek.
+    """
+
+    def __init__(self, max_size=10000):
+        """Konstruktor třídy LRUCache"""
+        self._max_size = max_size
+        self._items = OrderedDict()
+        self._generations = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Vrátí položku z cache, nebo ji načte funkcí loader a uloží.
+
+        Pokud byla cache během načítání zneplatněna, načtená hodnota se neuloží,
+        aby se do cache nedostala zastaralá data. Hodnota None (nenalezeno) se neukládá.
+
+        Args:
+            key (tuple): Klíč položky.
+            loader (callable): Funkce bez parametrů, která hodnotu načte z databáze.
+
+        Returns:
+            Hodnota položky.
+        """
+        with self._lock:
+            value = self._items.get(key, _MISSING)
+            if value is not _MISSING:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return value
+            self._misses += 1
+            version = self._version
+
+        value = loader()
+
+        if value is not None:
+            with self._lock:
+                if version == self._version:
+                    self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        """Uloží položku do cache (zápis přes cache)."""
+        with self._lock:
+            self._version += 1
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, *keys):
+        """Odstraní položky z cache."""
+        with self._lock:
+            self._version += 1
+            for key in keys:
+                if self._items.pop(key, _MISSING) is not _MISSING:
+                    self._invalidations += 1
+
+    def generation(self, name):
+        """Aktuální generace skupiny name."""
+        with self._lock:
+            return self._generations.get(name, 0)
+
+    def new_generation(self, *names):
+        """Zneplatní všechny položky skupin names zvýšením jejich generace."""
+        with self._lock:
+            self._version += 1
+            for name in names:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                self._invalidations += 1
+
+    def clear(self):
+        """Odstraní všechny položky cache."""
+        with self._lock:
+            self._version += 1
+            self._invalidations += len(self._items)
+            self._items.clear()
+
+    def stats(self):
+        """
+        Statistiky cache.
+
+        Returns:
+            dict: Počet položek, zásahů, výpadků, vyřazení a zneplatnění.
+        """
+        with self._lock:
+            return {
+                'size': len(self._items),
+                'max_size': self._max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+
+class CachedDatabaseInterface(DatabaseInterface):
+    """
+    Rozhraní do databáze s cache pro čtení (read-through) a zápisem přes cache (write-through).
+
+    Čtení pojištěnců, pojištění a stránek tabulek se obsluhuje z LRU cache. Každá změna
+    v databázi zneplatní (nebo přepíše) dotčené položky: jednotlivé záznamy podle ID,
+    stránky a počty tabulek zvýšením generace tabulky.
+
+    Attributes:
+        db_name (str): Cesta k databázi.
+        cache (LRUCache): Cache záznamů.
+    """
+
+    def __init__(self, db_name, cache_size=10000, **kwargs):
+        super().__init__(db_name, **kwargs)
+        self.cache = LRUCache(cache_size)
+        self._seen_versions = None
+
+    def sync_data_versions(self):
+        """
+        Vyprázdní cache, pokud se data v databázi od posledního volání změnila.
+
+        Slouží k souběhu více procesů nad jednou databází (pracovní procesy serveru WSGI,
+        import z příkazové řádky), volá se na začátku každé žádosti. Porovnávají se verze dat
+        (DatabaseInterface.data_versions); vlastní a cizí zápisy rozlišit nelze, cache se tedy
+        vyprázdní po každé změně.
+
+        Returns:
+            bool: True, pokud se data změnila a cache byla vyprázdněna.
+        """
+        versions = {name: version for name, (version, _) in self.data_versions().items()}
+        changed = self._seen_versions is not None and versions != self._seen_versions
+        self._seen_versions = versions
+        if changed:
+            self.cache.clear()
+        return changed
+
+    def cache_stats(self):
+        """
+        Statistiky cache.
+
+        Returns:
+            dict: Počet položek, zásahů, výpadků, vyřazení a zneplatnění.
+        """
+        return self.cache.stats()
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Jako DatabaseInterface.unit_of_work(), změny cache se ale provedou až po potvrzení transakce.
+
+        Dokud transakce trvá, vidí ostatní vlákna v databázi i v cache původní data; zápisy se
+        do cache promítnou (a zneplatní i položky načtené jinými vlákny mezitím) až po potvrzení.
+        Při vrácení transakce zpět se změny cache zahodí.
+        """
+        if getattr(self._local, 'cache_changes', None) is not None:
+            with super().unit_of_work() as my_db:
+                yield my_db
+            return
+        self._local.cache_changes = []
+        try:
+            with super().unit_of_work() as my_db:
+                yield my_db
+            changes = self._local.cache_changes
+        finally:
+            self._local.cache_changes = None
+        for change in changes:
+            change()
+
+    def _cached(self, key, loader):
+        """
+        Čtení přes cache.
+
+        Uvnitř unit_of_work() se čte přímo z databáze: vlákno transakce vidí své nepotvrzené
+        zápisy, které do cache nepatří.
+        """
+        if getattr(self._local, 'cache_changes', None) is not None:
+            return loader()
+        return self.cache.get_or_load(key, loader)
+
+    def _changed(self, *generations, put=None, invalidate=()):
+        """
+        Promítne zápis do cache: zvýší generace skupin, uloží položku put (klíč, hodnota)
+        a odstraní klíče invalidate. Uvnitř unit_of_work() až po potvrzení transakce.
+        """
+        def change():
+            self.cache.new_generation(*generations)
+            if put is not None:
+                self.cache.put(*put)
+            if invalidate:
+                self.cache.invalidate(*invalidate)
+
+        changes = getattr(self._local, 'cache_changes', None)
+        if changes is not None:
+            changes.append(change)
+        else:
+            change()
+
+    # Čtení
+
+    def find_insured_person_by_id(self, person_id):
+        return self._cached(('person', int(person_id)), partial(super().find_insured_person_by_id, person_id))
+
+    def find_insurance_policies_by_person_id(self, person_id):
+        return self._cached(('person_policies', int(person_id)),
+                            partial(super().find_insurance_policies_by_person_id, person_id))
+
+    def find_insurance_policy_by_id(self, id):
+        return self._cached(('policy', int(id)), partial(super().find_insurance_policy_by_id, id))
+
+    def get_insured_persons_page(self, page, per_page, after_id=None):
+        key = ('persons_page', self.cache.generation('persons'), page, per_page, after_id)
+        return self._cached(key, partial(super().get_insured_persons_page, page, per_page, after_id))
+
+    def get_insurance_policies_page(self, page, per_page, after_id=None):
+        key = ('policies_page', self.cache.generation('policies'), page, per_page, after_id)
+        return self._cached(key, partial(super().get_insurance_policies_page, page, per_page, after_id))
+
+    def get_insurance_policies_filtered_page(self, page, per_page, **filters):
+        key = ('policies_filtered', self.cache.generation('policies'), page, per_page, tuple(sorted(filters.items())))
+        return self._cached(key, partial(super().get_insurance_policies_filtered_page, page, per_page, **filters))
+
+    def get_all_unused_insurance_policies(self):
+        key = ('unused_policies', self.cache.generation('policies'))
+        return self._cached(key, super().get_all_unused_insurance_policies)
+
+    def insured_persons_count(self):
+        key = ('persons_count', self.cache.generation('persons'))
+        return self._cached(key, super().insured_persons_count)
+
+    def insurance_policies_count(self):
+        key = ('policies_count', self.cache.generation('policies'))
+        return self._cached(key, super().insurance_policies_count)
+
+    # Zápis
+
+    def add_insured_person_to_db(self, person):
+        person_id = super().add_insured_person_to_db(person)
+        self._changed('persons', put=(('person', person_id), person))
+        return person_id
+
+    def add_insured_persons_to_db(self, persons):
+        person_ids = super().add_insured_persons_to_db(persons)
+        self._changed('persons')
+        return person_ids
+
+    def update_insured_person_in_db(self, person_id, person):
+        super().update_insured_person_in_db(person_id, person)
+        self._changed('persons', put=(('person', int(person_id)), person))
+
+    def delete_insured_person_from_db(self, person_id):
+        super().delete_insured_person_from_db(person_id)
+        # Smazáním se smažou i vztahy, mění se tedy i počty pojištěnců u pojištění
+        self._changed('persons', 'policies',
+                      invalidate=(('person', int(person_id)), ('person_policies', int(person_id))))
+
+    def add_insurance_policy_to_db(self, policy):
+        policy_id = super().add_insurance_policy_to_db(policy)
+        self._changed('policies', put=(('policy', policy_id), policy))
+        return policy_id
+
+    def add_insurance_policies_to_db(self, policies):
+        policy_ids = super().add_insurance_policies_to_db(policies)
+        self._changed('policies')
+        return policy_ids
+
+    def update_insurance_policy_in_db(self, policy_id, policy):
+        super().update_insurance_policy_in_db(policy_id, policy)
+        holders = self.find_person_ids_by_policy_id(policy_id)
+        self._changed('policies', put=(('policy', int(policy_id)), policy),
+                      invalidate=[('person_policies', person_id) for person_id in holders])
+
+    def delete_insurance_policy_from_db(self, policy_id):
+        holders = self.find_person_ids_by_policy_id(policy_id)
+        super().delete_insurance_policy_from_db(policy_id)
+        self._changed('policies', invalidate=[('policy', int(policy_id))] +
+                      [('person_policies', person_id) for person_id in holders])
+
+    def add_person_policy_to_db(self, person_id, policy_id):
+        super().add_person_policy_to_db(person_id, policy_id)
+        self._changed('policies', invalidate=[('person_policies', int(person_id))])
+
+    def delete_person_policy_from_db(self, person_id, policy_id):
+        super().delete_person_policy_from_db(person_id, policy_id)
+        self._changed('policies', invalidate=[('person_policies', int(person_id))])
+
+    def add_person_policies_to_db(self, links):
+        count = super().add_person_policies_to_db(links)
+        self._changed('policies', invalidate={('person_policies', int(person_id)) for person_id, _ in links})
+        return count
+
+    def delete_person_policies_from_db(self, links):
+        count = super().delete_person_policies_from_db(links)
+        self._changed('policies', invalidate={('person_policies', int(person_id)) for person_id, _ in links})
+        return count
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from database import apply_storage_profile
+
+class ConnectionPool():
+    """
+    Omezený fond spojení s databází SQLite sdílený mezi vlákny.
+
+    Spojení se otevírají až podle potřeby (nejvýše max_size), po vrácení se znovu používají
+    a uzavírají se deterministicky metodou close(). Nastavení PRAGMA se provádí jen jednou
+    při otevření spojení.
+
+    Fond je bezpečný i při rozvětvení procesu (fork, např. pracovní procesy serveru WSGI):
+    spojení otevřená v rodičovském procesu se v potomkovi nepoužijí ani neuzavřou,
+    potomek si otevírá vlastní.
+
+    Attributes:
+        db_name (str): Cesta k databázi.
+        max_size (int): Maximální počet otevřených spojení.
+        timeout (float): Maximální doba čekání na volné spojení v sekundách.
+        storage_profile (str): Profil úložiště nastavovaný každému spojení (viz database.STORAGE_PROFILES).
+    """
+
+    def __init__(self, db_name, max_size=5, timeout=30.0, storage_profile='default'):
+        """Konstruktor třídy ConnectionPool"""
+        self._db_name = db_name
+        self._storage_profile = storage_profile
+        self._max_size = max_size
+        self._timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._checkouts = 0
+        self._waits = 0
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+        self._inherited = []
+
+    def _check_process(self):
+        """Po rozvětvení procesu zahodí spojení rodičovského procesu (SQLite je nesmí sdílet)."""
+        if self._pid == os.getpid():
+            return
+        # Spojení se neuzavírají (uzavření by mohlo ovlivnit zámky databáze rodiče),
+        # jen se drží, aby je neuzavřel ani garbage collector
+        self._inherited.extend(self._idle)
+        self._idle = []
+        self._open = 0
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+
+    @property
+    def db_name(self):
+        return self._db_name
+
+    def _connect(self):
+        """Otevře nové spojení a nastaví jeho PRAGMA."""
+        connection = sqlite3.connect(self._db_name, check_same_thread=False)
+        apply_storage_profile(connection, self._storage_profile)
+        return connection
+
+    def acquire(self):
+        """
+        Vypůjčí si spojení z fondu. Pokud jsou všechna spojení obsazena, čeká na vrácení.
+
+        Returns:
+            sqlite3.Connection: Spojení s databází.
+        """
+        self._check_process()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+            self._checkouts += 1
+            if not self._idle and self._open >= self._max_size:
+                self._waits += 1
+                if not self._condition.wait_for(lambda: self._idle or self._closed, self._timeout):
+                    raise TimeoutError(f"No free connection to {self._db_name} within {self._timeout} s.")
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection):
+        """
+        Vrátí spojení do fondu. Nedokončená transakce se vrátí zpět.
+
+        Args:
+            connection (sqlite3.Connection): Vypůjčené spojení.
+        """
+        if connection.in_transaction:
+            connection.rollback()
+        self._check_process()
+        with self._condition:
+            if self._closed:
+                connection.close()
+                self._open -= 1
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """Kontextový manažer, který spojení vypůjčí a po ukončení bloku vrátí do fondu."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Uzavře všechna nevyužitá spojení. Vypůjčená spojení se uzavřou při vrácení."""
+        with self._condition:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._open -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Statistiky fondu spojení.
+
+        Returns:
+            dict: Počet výpůjček, počet čekání na volné spojení, počet otevřených a nevyužitých spojení.
+        """
+        with self._condition:
+            return {
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'open_connections': self._open,
+                'idle_connections': len(self._idle),
+                'max_size': self._max_size,
+            }
@@ -1,4 +1,335 @@
+import re
 import sqlite3
+from contextlib import contextmanager
+
+# Profily nastavení úložiště SQLite (PRAGMA), které se použijí při otevření spojení
+STORAGE_PROFILES = {
+    # Výchozí chování SQLite: plná synchronizace, režim žurnálu zůstává podle souboru databáze
+    'default': {
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+    # WAL: čtenáři neblokují zapisovatele, menší počet fsync
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+}
+
+
+# Maximální počet parametrů jednoho dotazu při hromadném vyhledávání
+# (výchozí limit SQLITE_MAX_VARIABLE_NUMBER starších verzí SQLite je 999)
+BATCH_PARAMETERS = 900
+
+# Souhrnné statistiky portfolia spočítané od začátku z dat: tabulka statistik -> dotaz
+STATS_QUERIES = {
+    'PortfolioStats': '''
+        SELECT 'persons', count(*) FROM InsuredPersons
+        UNION ALL SELECT 'policies', count(*) FROM InsurancePolicies
+        UNION ALL SELECT 'links', count(*) FROM PersonInsurancePolicies
+        UNION ALL SELECT 'insured_with_policies', count(DISTINCT person_id) FROM PersonInsurancePolicies
+        UNION ALL SELECT 'total_amount_cents', coalesce(sum(CAST(round(insured_amount * 100) AS INTEGER)), 0)
+                  FROM InsurancePolicies''',
+    'CityStats': '''
+        SELECT city, count(*) FROM InsuredPersons GROUP BY city''',
+    'PolicyDateStats': '''
+        SELECT day, sum(starts), sum(ends) FROM (
+            SELECT substr(start_date, 1, 10) AS day, 1 AS starts, 0 AS ends FROM InsurancePolicies
+            UNION ALL
+            SELECT substr(end_date, 1, 10), 0, 1 FROM InsurancePolicies
+        ) GROUP BY day''',
+}
+
+# Přepočet statistik od začátku (migrace 3 a rebuild_portfolio_stats)
+STATS_REBUILD = [
+    'DELETE FROM PortfolioStats',
+    'DELETE FROM CityStats',
+    'DELETE FROM PolicyDateStats',
+    'INSERT INTO PortfolioStats (name, value) ' + STATS_QUERIES['PortfolioStats'],
+    'INSERT INTO CityStats (city, persons) ' + STATS_QUERIES['CityStats'],
+    'INSERT INTO PolicyDateStats (day, starts, ends) ' + STATS_QUERIES['PolicyDateStats'],
+]
+
+# Přírůstková aktualizace statistik: (UPDATE hodnoty PortfolioStats, CityStats, PolicyDateStats)
+_STAT_ADD = "UPDATE PortfolioStats SET value = value + ({value}) WHERE name = '{name}'"
+_CITY_ADD = '''INSERT INTO CityStats (city, persons) VALUES ({city}, {delta})
+       ON CONFLICT (city) DO UPDATE SET persons = persons + ({delta})'''
+_DAY_ADD = '''INSERT INTO PolicyDateStats (day, starts, ends) VALUES (substr({date}, 1, 10), {starts}, {ends})
+       ON CONFLICT (day) DO UPDATE SET starts = starts + ({starts}), ends = ends + ({ends})'''
+
+
+def _policy_stats(row, sign):
+    """Příkazy triggeru, které přičtou (sign='+') nebo odečtou (sign='-') pojištění row (NEW/OLD) ve statistikách."""
+    return ';\n'.join([
+        _STAT_ADD.format(name='policies', value=f'{sign}1'),
+        _STAT_ADD.format(name='total_amount_cents', value=f'{sign}CAST(round({row}.insured_amount * 100) AS INTEGER)'),
+        _DAY_ADD.format(date=f'{row}.start_date', starts=f'{sign}1', ends=0),
+        _DAY_ADD.format(date=f'{row}.end_date', starts=0, ends=f'{sign}1'),
+    ]) + ';'
+
+
+# Migrace 3: tabulky statistik a triggery, které je aktualizují při každé změně dat
+STATS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS PortfolioStats (
+           name TEXT PRIMARY KEY,
+           value INTEGER NOT NULL DEFAULT 0
+       ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS CityStats (
+           city TEXT PRIMARY KEY,
+           persons INTEGER NOT NULL DEFAULT 0
+       ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS CityStatsPersons ON CityStats (persons)',
+    '''CREATE TABLE IF NOT EXISTS PolicyDateStats (
+           day TEXT PRIMARY KEY,
+           starts INTEGER NOT NULL DEFAULT 0,
+           ends INTEGER NOT NULL DEFAULT 0
+       ) WITHOUT ROWID''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsuredPersonsStatsInsert AFTER INSERT ON InsuredPersons BEGIN
+           {_STAT_ADD.format(name='persons', value='+1')};
+           {_CITY_ADD.format(city='NEW.city', delta='+1')};
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsuredPersonsStatsDelete AFTER DELETE ON InsuredPersons BEGIN
+           {_STAT_ADD.format(name='persons', value='-1')};
+           {_CITY_ADD.format(city='OLD.city', delta='-1')};
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsuredPersonsStatsUpdate AFTER UPDATE OF city ON InsuredPersons
+       WHEN OLD.city IS NOT NEW.city BEGIN
+           {_CITY_ADD.format(city='OLD.city', delta='-1')};
+           {_CITY_ADD.format(city='NEW.city', delta='+1')};
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsurancePoliciesStatsInsert AFTER INSERT ON InsurancePolicies BEGIN
+           {_policy_stats('NEW', '+')}
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsurancePoliciesStatsDelete AFTER DELETE ON InsurancePolicies BEGIN
+           {_policy_stats('OLD', '-')}
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS InsurancePoliciesStatsUpdate
+       AFTER UPDATE OF insured_amount, start_date, end_date ON InsurancePolicies BEGIN
+           {_policy_stats('OLD', '-')}
+           {_policy_stats('NEW', '+')}
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS PersonInsurancePoliciesStatsInsert AFTER INSERT ON PersonInsurancePolicies BEGIN
+           {_STAT_ADD.format(name='links', value='+1')};
+           {_STAT_ADD.format(name='insured_with_policies', value='+1')}
+               AND (SELECT count(*) FROM PersonInsurancePolicies WHERE person_id = NEW.person_id) = 1;
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS PersonInsurancePoliciesStatsDelete AFTER DELETE ON PersonInsurancePolicies BEGIN
+           {_STAT_ADD.format(name='links', value='-1')};
+           {_STAT_ADD.format(name='insured_with_policies', value='-1')}
+               AND NOT EXISTS (SELECT 1 FROM PersonInsurancePolicies WHERE person_id = OLD.person_id);
+       END''',
+]
+
+# Fulltextové vyhledávání (FTS5): bez diakritiky, s indexy předpon délky 2 a 3
+_FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+# Telefon se indexuje jen jako číslice (celé číslo a posledních 9 číslic bez předvolby),
+# aby ho bylo možné najít bez ohledu na zápis
+_DIGITS = "replace(replace(replace(replace(replace({phone}, ' ', ''), '-', ''), '(', ''), ')', ''), '+', '')"
+_PHONE_DIGITS = _DIGITS + " || ' ' || substr(" + _DIGITS + ", -9)"
+
+# Sloupce indexu pojištěnců a pojištění
+PERSON_SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'city')
+POLICY_SEARCH_COLUMNS = ('title', 'insured_object')
+
+
+def _search_values(row, columns):
+    """Hodnoty sloupců indexu pro řádek row (NEW/OLD) triggeru."""
+    return ', '.join(_PHONE_DIGITS.format(phone=f'{row}.{column}') if column == 'phone' else f'{row}.{column}'
+                     for column in columns)
+
+
+def _search_triggers(table, index, columns):
+    """Triggery, které udržují index index (FTS5 s externím obsahem) v souladu s tabulkou table."""
+    names = ', '.join(columns)
+    insert = f'INSERT INTO {index} (rowid, {names}) VALUES (NEW.id, {_search_values("NEW", columns)});'
+    delete = (f"INSERT INTO {index} ({index}, rowid, {names}) "
+              f"VALUES ('delete', OLD.id, {_search_values('OLD', columns)});")
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS {index}Insert AFTER INSERT ON {table} BEGIN
+               {insert}
+           END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {index}Delete AFTER DELETE ON {table} BEGIN
+               {delete}
+           END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {index}Update AFTER UPDATE OF {names} ON {table} BEGIN
+               {delete}
+               {insert}
+           END''',
+    ]
+
+
+# Migrace 4: fulltextové indexy pojištěnců a pojištění udržované triggery
+SEARCH_SCHEMA = [
+    # Obsah indexu pojištěnců (telefon jen jako číslice), index ho čte při přestavbě
+    f'''CREATE VIEW IF NOT EXISTS InsuredPersonsSearchContent AS
+       SELECT id, first_name, last_name, email, {_PHONE_DIGITS.format(phone='phone')} AS phone, city
+       FROM InsuredPersons''',
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS InsuredPersonsSearch USING fts5(
+           {', '.join(PERSON_SEARCH_COLUMNS)},
+           content = 'InsuredPersonsSearchContent', content_rowid = 'id', {_FTS_OPTIONS}
+       )''',
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS InsurancePoliciesSearch USING fts5(
+           {', '.join(POLICY_SEARCH_COLUMNS)},
+           content = 'InsurancePolicies', content_rowid = 'id', {_FTS_OPTIONS}
+       )''',
+    *_search_triggers('InsuredPersons', 'InsuredPersonsSearch', PERSON_SEARCH_COLUMNS),
+    *_search_triggers('InsurancePolicies', 'InsurancePoliciesSearch', POLICY_SEARCH_COLUMNS),
+    "INSERT INTO InsuredPersonsSearch (InsuredPersonsSearch) VALUES ('rebuild')",
+    "INSERT INTO InsurancePoliciesSearch (InsurancePoliciesSearch) VALUES ('rebuild')",
+]
+
+# Váhy sloupců při řazení výsledků (bm25), ve stejném pořadí jako sloupce indexu
+PERSON_SEARCH_WEIGHTS = (5.0, 10.0, 3.0, 3.0, 1.0)
+POLICY_SEARCH_WEIGHTS = (10.0, 1.0)
+
+_SEARCH_TOKEN = re.compile(r'\w+')
+_PHONE_QUERY = re.compile(r'^[\d\s()+-]+$')
+
+
+def search_match_expression(text):
+    """
+    Převede text zadaný uživatelem na dotaz FTS5 (všechna slova jako předpony, spojená AND).
+
+    Text složený jen z číslic a znaků telefonního čísla se hledá jako jedno číslo.
+
+    Returns:
+        str: Výraz pro MATCH nebo None, pokud text neobsahuje žádné slovo.
+    """
+    text = text.strip()
+    if _PHONE_QUERY.match(text) and any(char.isdigit() for char in text):
+        tokens = [''.join(char for char in text if char.isdigit())]
+    else:
+        tokens = _SEARCH_TOKEN.findall(text)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+# Tabulky, jejichž změny se počítají v DataVersions (název verze -> tabulka)
+DATA_VERSION_TABLES = {
+    'persons': 'InsuredPersons',
+    'policies': 'InsurancePolicies',
+    'links': 'PersonInsurancePolicies',
+}
+_NOW = "strftime('%Y-%m-%dT%H:%M:%S', 'now')"
+
+
+def _data_version_triggers(name, table):
+    """Triggery, které při každé změně tabulky zvýší její verzi a zapíší čas změny (UTC)."""
+    update = f"UPDATE DataVersions SET version = version + 1, modified = {_NOW} WHERE name = '{name}';"
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS {table}Version{event.title()} AFTER {event} ON {table} BEGIN
+               {update}
+           END'''
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+# Migrace 5: verze dat (čítač změn tabulek) pro podmíněné žádosti HTTP (ETag, Last-Modified)
+DATA_VERSION_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS DataVersions (
+           name TEXT PRIMARY KEY,
+           version INTEGER NOT NULL DEFAULT 0,
+           modified TEXT NOT NULL
+       ) WITHOUT ROWID''',
+    *[f"INSERT OR IGNORE INTO DataVersions (name, version, modified) VALUES ('{name}', 0, {_NOW})"
+      for name in DATA_VERSION_TABLES],
+    *[trigger for name, table in DATA_VERSION_TABLES.items() for trigger in _data_version_triggers(name, table)],
+]
+
+
+def _rename_duplicate_policy_titles(cursor):
+    """
+    Přejmenuje duplicitní názvy pojištění (povolené ve starších verzích) před vytvořením unikátního indexu.
+
+    Původní název si ponechá nejstarší záznam, ostatní dostanou příponu s ID ("název (ID)").
+    Pokud by i nový název už existoval, přidá se pořadové číslo ("název (ID-2)", ...).
+    """
+    titles = {row[0] for row in cursor.execute('SELECT title FROM InsurancePolicies')}
+    duplicates = cursor.execute('''
+        SELECT id, title FROM InsurancePolicies
+        WHERE id NOT IN (SELECT min(id) FROM InsurancePolicies GROUP BY title)
+        ORDER BY id
+    ''').fetchall()
+    for policy_id, title in duplicates:
+        new_title = f'{title} ({policy_id})'
+        number = 1
+        while new_title in titles:
+            number += 1
+            new_title = f'{title} ({policy_id}-{number})'
+        titles.add(new_title)
+        cursor.execute('UPDATE InsurancePolicies SET title = ? WHERE id = ?', (new_title, policy_id))
+
+
+# Migrace schématu databáze. Verze schématu je uložena v PRAGMA user_version,
+# migrace MIGRATIONS[i] převádí databázi z verze i na verzi i + 1.
+# Krok migrace je příkaz SQL nebo funkce, která dostane kurzor databáze.
+MIGRATIONS = [
+    # 1: indexy pro vyhledávání pojištěnců, pojištění podle názvu a vztahů podle pojištění
+    [
+        '''CREATE INDEX IF NOT EXISTS InsuredPersonsNameEmail
+           ON InsuredPersons (last_name, first_name, email)''',
+        _rename_duplicate_policy_titles,
+        '''CREATE UNIQUE INDEX IF NOT EXISTS InsurancePoliciesTitle
+           ON InsurancePolicies (title)''',
+        '''CREATE INDEX IF NOT EXISTS PersonInsurancePoliciesPolicy
+           ON PersonInsurancePolicies (policy_id, person_id)''',
+    ],
+    # 2: kanonický tvar dat (utils.DATE_FORMAT) a částek pojištění, indexy pro dotazy podle platnosti a částky
+    [
+        '''UPDATE InsurancePolicies
+           SET start_date = strftime('%Y-%m-%dT%H:%M', start_date)
+           WHERE strftime('%Y-%m-%dT%H:%M', start_date) IS NOT NULL''',
+        '''UPDATE InsurancePolicies
+           SET end_date = strftime('%Y-%m-%dT%H:%M', end_date)
+           WHERE strftime('%Y-%m-%dT%H:%M', end_date) IS NOT NULL''',
+        '''UPDATE InsurancePolicies
+           SET insured_amount = round(CAST(insured_amount AS REAL), 2)''',
+        '''CREATE INDEX IF NOT EXISTS InsurancePoliciesStartDate
+           ON InsurancePolicies (start_date, end_date)''',
+        '''CREATE INDEX IF NOT EXISTS InsurancePoliciesEndDate
+           ON InsurancePolicies (end_date)''',
+        '''CREATE INDEX IF NOT EXISTS InsurancePoliciesAmount
+           ON InsurancePolicies (insured_amount)''',
+    ],
+    # 3: souhrnné statistiky portfolia udržované triggery
+    STATS_SCHEMA + STATS_REBUILD,
+    # 4: fulltextové vyhledávání pojištěnců a pojištění
+    SEARCH_SCHEMA,
+    # 5: verze dat pro podmíněné žádosti HTTP
+    DATA_VERSION_SCHEMA,
+]
+
+# Podmínky filtrů pojištění (viz DatabaseInsurances.fetch_insurance_policies_filtered)
+POLICY_FILTERS = {
+    'active_on': 'start_date <= :active_on AND end_date >= :active_on',
+    'start_to': 'start_date <= :start_to',
+    'end_from': 'end_date >= :end_from',
+    'end_to': 'end_date <= :end_to',
+    'amount_min': 'insured_amount >= :amount_min',
+    'amount_max': 'insured_amount <= :amount_max',
+}
+
+
+def apply_storage_profile(connection, profile='default'):
+    """
+    Nastaví PRAGMA spojení podle profilu úložiště.
+
+    Args:
+        connection (sqlite3.Connection): Spojení s databází.
+        profile (str, dict): Název profilu ze STORAGE_PROFILES nebo slovník PRAGMA.
+    """
+    pragmas = STORAGE_PROFILES[profile] if isinstance(profile, str) else profile
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value};")
+
 
 class DatabaseInsurances():
     """
@@ -7,14 +338,65 @@ class DatabaseInsurances():
     Poskytuje vytváření, čtení, zápis a mazání pojištěných v databázi
     """
 
-    def __init__(self, db_name):
-        """Vytvoří spojení s databází"""
-        self.connection = sqlite3.connect(db_name)
+    def __init__(self, db_name, connection=None, storage_profile='default'):
+        """
+        Vytvoří spojení s databází.
+
+        Args:
+            db_name (str): Cesta k databázi.
+            connection (sqlite3.Connection): Existující spojení (např. z fondu spojení).
+                Takové spojení se při uzavření objektu neuzavírá.
+            storage_profile (str): Profil úložiště pro nově otevřené spojení (viz STORAGE_PROFILES).
+        """
+        self._own_connection = connection is None
+        if connection is None:
+            connection = sqlite3.connect(db_name)
+            apply_storage_profile(connection, storage_profile)
+        self.connection = connection
         self.cursor = self.connection.cursor()
+        self._in_transaction = False
 
     def __del__(self):
-        self.cursor.close()
-        self.connection.close()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Uzavře kurzor a vlastní spojení s databází."""
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+            if self._own_connection:
+                self.connection.close()
+
+    def _commit(self):
+        """Potvrdí změny, pokud neběží transakce otevřená metodou transaction()."""
+        if not self._in_transaction:
+            self.connection.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Kontextový manažer, který seskupí všechny zápisy uvnitř bloku do jedné transakce.
+
+        Transakce se potvrdí na konci bloku, při výjimce se vrátí zpět.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            yield self
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
 
     def create_tables(self):
         """Vytváří tabulky pro ukládání záznamů s údaji o pojištěncích a pojištění."""
@@ -61,6 +443,43 @@ class DatabaseInsurances():
 
         self.connection.commit()
 
+        self.migrate()
+
+    def schema_version(self):
+        """
+        Získejte verzi schématu databáze.
+
+        Returns:
+            int: Počet provedených migrací (PRAGMA user_version).
+        """
+        return self.cursor.execute("PRAGMA user_version;").fetchone()[0]
+
+    def migrate(self):
+        """
+        Provede všechny dosud neprovedené migrace schématu (MIGRATIONS).
+
+        Každá migrace běží ve vlastní transakci spolu se zvýšením verze schématu,
+        takže při chybě zůstane databáze v předchozí verzi.
+
+        Returns:
+            int: Verze schématu po migraci.
+        """
+        version = self.schema_version()
+        for target_version in range(version + 1, len(MIGRATIONS) + 1):
+            try:
+                self.cursor.execute("BEGIN;")
+                for statement in MIGRATIONS[target_version - 1]:
+                    if callable(statement):
+                        statement(self.cursor)
+                    else:
+                        self.cursor.execute(statement)
+                self.cursor.execute(f"PRAGMA user_version = {target_version};")
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+        return max(version, len(MIGRATIONS))
+
     def insert_insured_person(self, first_name, last_name, email, phone, street, city, postal_code):
         """
         Záznam pojištěnce do databáze.
@@ -78,7 +497,7 @@ class DatabaseInsurances():
             INSERT INTO InsuredPersons (first_name, last_name, email, phone, street, city, postal_code)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (first_name, last_name, email, phone, street, city, postal_code))
-        self.connection.commit()
+        self._commit()
         return self.cursor.lastrowid
 
     def insert_insurance_policy(self, title, insured_amount, insured_object, start_date, end_date):
@@ -96,7 +515,7 @@ class DatabaseInsurances():
             INSERT INTO InsurancePolicies (title, insured_amount, insured_object, start_date, end_date)
             VALUES (?, ?, ?, ?, ?)
         ''', (title, insured_amount, insured_object, start_date, end_date))
-        self.connection.commit()
+        self._commit()
         return self.cursor.lastrowid
 
     def insert_person_insurance_policy(self, person_id, policy_id):
@@ -111,7 +530,134 @@ class DatabaseInsurances():
             INSERT INTO PersonInsurancePolicies (person_id, policy_id)
             VALUES (?, ?)
         ''', (person_id, policy_id))
-        self.connection.commit()
+        self._commit()
+
+    def insert_insured_persons(self, persons):
+        """
+        Hromadný záznam pojištěnců do databáze (executemany).
+
+        Args:
+            persons (list[tuple]): Pole pojištěnců (first_name, last_name, email, phone, street, city, postal_code).
+
+        Returns:
+            list[tuple]: Identifikátory a pole nově zapsaných pojištěnců.
+        """
+        if not persons:
+            return []
+        self.cursor.executemany('''
+            INSERT INTO InsuredPersons (first_name, last_name, email, phone, street, city, postal_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', persons)
+        # Během zápisu drží transakce zámek, nové záznamy jsou tedy posledními záznamy tabulky
+        result = self.cursor.execute('''
+            SELECT id, first_name, last_name, email, phone, street, city, postal_code
+            FROM InsuredPersons ORDER BY id DESC LIMIT ?
+        ''', (self.cursor.rowcount,)).fetchall()
+        self._commit()
+        result.reverse()
+        return result
+
+    def insert_insurance_policies(self, policies):
+        """
+        Hromadný záznam pojištění do databáze (executemany).
+
+        Args:
+            policies (list[tuple]): Pole pojištění (title, insured_amount, insured_object, start_date, end_date).
+
+        Returns:
+            list[int]: Identifikátory nově zapsaných pojištění ve stejném pořadí.
+        """
+        if not policies:
+            return []
+        self.cursor.executemany('''
+            INSERT INTO InsurancePolicies (title, insured_amount, insured_object, start_date, end_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', policies)
+        # Během zápisu drží transakce zámek, nové záznamy jsou tedy posledními záznamy tabulky
+        result = self.cursor.execute('''
+            SELECT id FROM InsurancePolicies ORDER BY id DESC LIMIT ?
+        ''', (self.cursor.rowcount,)).fetchall()
+        self._commit()
+        return [row[0] for row in reversed(result)]
+
+    def insert_person_insurance_policies(self, links):
+        """
+        Hromadný záznam vztahů mezi pojištěnými a pojištěními (executemany), existující vztahy se přeskočí.
+
+        Args:
+            links (list[tuple]): Dvojice (person_id, policy_id).
+
+        Returns:
+            int: Počet nově zapsaných vztahů.
+        """
+        self.cursor.executemany('''
+            INSERT OR IGNORE INTO PersonInsurancePolicies (person_id, policy_id)
+            VALUES (?, ?)
+        ''', links)
+        count = self.cursor.rowcount
+        self._commit()
+        return max(count, 0)
+
+    def delete_person_insurance_policies(self, links):
+        """
+        Hromadné odstranění vztahů mezi pojištěnými a pojištěními (executemany).
+
+        Args:
+            links (list[tuple]): Dvojice (person_id, policy_id).
+
+        Returns:
+            int: Počet odstraněných vztahů.
+        """
+        self.cursor.executemany('''
+            DELETE FROM PersonInsurancePolicies WHERE person_id = ? AND policy_id = ?
+        ''', links)
+        count = self.cursor.rowcount
+        self._commit()
+        return max(count, 0)
+
+    def find_existing_insured_persons(self, keys):
+        """
+        Najde, kteří z daných pojištěnců (jméno, příjmení, e-mail) již v databázi existují.
+
+        Args:
+            keys (list[tuple]): Trojice (first_name, last_name, email).
+
+        Returns:
+            set[tuple]: Trojice (first_name, last_name, email) nalezených pojištěnců.
+        """
+        found = set()
+        keys = list(keys)
+        for start in range(0, len(keys), BATCH_PARAMETERS // 3):
+            batch = keys[start:start + BATCH_PARAMETERS // 3]
+            values = ', '.join(['(?, ?, ?)'] * len(batch))
+            result = self.cursor.execute(f'''
+                SELECT first_name, last_name, email
+                FROM InsuredPersons
+                WHERE (last_name, first_name, email) IN (VALUES {values})
+            ''', [value for first_name, last_name, email in batch for value in (last_name, first_name, email)])
+            found.update(result.fetchall())
+        return found
+
+    def find_existing_policy_titles(self, titles):
+        """
+        Najde, které z daných názvů pojištění již v databázi existují.
+
+        Args:
+            titles (list[str]): Názvy pojištění.
+
+        Returns:
+            set[str]: Nalezené názvy pojištění.
+        """
+        found = set()
+        titles = list(titles)
+        for start in range(0, len(titles), BATCH_PARAMETERS):
+            batch = titles[start:start + BATCH_PARAMETERS]
+            result = self.cursor.execute(f'''
+                SELECT title FROM InsurancePolicies
+                WHERE title IN ({', '.join(['?'] * len(batch))})
+            ''', batch)
+            found.update(row[0] for row in result.fetchall())
+        return found
 
     def fetch_insured_person(self, person_id):
         """
@@ -226,6 +772,66 @@ class DatabaseInsurances():
         ''', (person_id,))
         return result.fetchall()
 
+    def fetch_insured_persons_by_ids(self, person_ids):
+        """
+        Vyhledejte pojištěnce podle seznamu ID (po dávkách BATCH_PARAMETERS)
+
+        Args:
+            person_ids (list[int]): Identifikátory pojištěných.
+
+        Returns:
+            list[tuple]: Pole nalezených pojištěnců (id na začátku), seřazená podle ID v dávce.
+        """
+        rows = []
+        for start in range(0, len(person_ids), BATCH_PARAMETERS):
+            batch = person_ids[start:start + BATCH_PARAMETERS]
+            result = self.cursor.execute(f'''
+                SELECT id, first_name, last_name, email, phone, street, city, postal_code
+                FROM InsuredPersons WHERE id IN ({', '.join(['?'] * len(batch))})
+                ORDER BY id
+            ''', batch)
+            rows.extend(result.fetchall())
+        return rows
+
+    def fetch_insurance_policies_by_persons(self, person_ids):
+        """
+        Vyhledejte pojištění pojištěnců podle seznamu ID (po dávkách BATCH_PARAMETERS)
+
+        Args:
+            person_ids (list[int]): Identifikátory pojištěných.
+
+        Returns:
+            list[tuple]: ID pojištěnce a všechna pole pojištění.
+        """
+        rows = []
+        for start in range(0, len(person_ids), BATCH_PARAMETERS):
+            batch = person_ids[start:start + BATCH_PARAMETERS]
+            result = self.cursor.execute(f'''
+                SELECT pip.person_id, ip.id, ip.title, ip.insured_amount, ip.insured_object, ip.start_date, ip.end_date
+                FROM PersonInsurancePolicies pip
+                JOIN InsurancePolicies ip ON ip.id = pip.policy_id
+                WHERE pip.person_id IN ({', '.join(['?'] * len(batch))})
+            ''', batch)
+            rows.extend(result.fetchall())
+        return rows
+
+    def fetch_person_ids_by_policy(self, policy_id):
+        """
+        Vyhledejte pojištěnce, kteří mají sjednané dané pojištění
+
+        Args:
+            policy_id (int): Identifikátor pojištění.
+
+        Returns:
+            list[tuple]: Seznam identifikátorů pojištěnců.
+        """
+        result = self.cursor.execute('''
+            SELECT person_id
+            FROM PersonInsurancePolicies
+            WHERE policy_id = ?
+        ''', (policy_id,))
+        return result.fetchall()
+
     def fetch_insurance_policy_by_id(self, id):
         """
         Vyhledejte pojištění podle id
@@ -273,6 +879,372 @@ class DatabaseInsurances():
         ''')
         return result.fetchall()
 
+    def fetch_insured_persons_page(self, page, per_page, after_id=None):
+        """
+        Získejte jednu stránku pojištěnců a celkový počet pojištěnců jedním dotazem.
+
+        Pokud je znám identifikátor posledního pojištěnce předchozí stránky (after_id),
+        začátek stránky se vyhledá přímo v indexu primárního klíče (keyset).
+        Jinak se začátek stránky dohledá posunem po primárním klíči bez čtení celých řádků.
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce.
+            after_id (int): Identifikátor posledního pojištěnce předchozí stránky nebo None.
+
+        Returns:
+            tuple: Seznam polí nalezených pojištěnců, celkový počet pojištěnců.
+        """
+        if after_id is not None:
+            seek = 'WHERE id > :after_id'
+        else:
+            seek = 'WHERE id >= (SELECT id FROM InsuredPersons ORDER BY id LIMIT 1 OFFSET :offset)'
+        result = self.cursor.execute(f'''
+            WITH total AS (SELECT count(id) AS persons FROM InsuredPersons)
+            SELECT total.persons, page.*
+            FROM total
+            LEFT JOIN (
+                SELECT id, first_name, last_name, email, phone, street, city, postal_code
+                FROM InsuredPersons
+                {seek}
+                ORDER BY id
+                LIMIT :limit
+            ) AS page
+        ''', {'after_id': after_id, 'offset': max(page - 1, 0) * per_page, 'limit': per_page})
+        rows = result.fetchall()
+        return [row[1:] for row in rows if row[1] is not None], rows[0][0]
+
+    def fetch_insurance_policies_page(self, page, per_page, after_id=None):
+        """
+        Získejte jednu stránku pojištění i s počtem pojištěnců a celkový počet pojištění jedním dotazem.
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce.
+            after_id (int): Identifikátor posledního pojištění předchozí stránky nebo None.
+
+        Returns:
+            tuple: Seznam polí nalezených pojištění, celkový počet pojištění.
+        """
+        if after_id is not None:
+            seek = 'WHERE id > :after_id'
+        else:
+            seek = 'WHERE id >= (SELECT id FROM InsurancePolicies ORDER BY id LIMIT 1 OFFSET :offset)'
+        result = self.cursor.execute(f'''
+            WITH total AS (SELECT count(id) AS policies FROM InsurancePolicies)
+            SELECT total.policies, page.*,
+                (SELECT NULLIF(count(person_id), 0)
+                 FROM PersonInsurancePolicies
+                 WHERE policy_id = page.id) AS persons
+            FROM total
+            LEFT JOIN (
+                SELECT id, title, insured_amount, insured_object, start_date, end_date
+                FROM InsurancePolicies
+                {seek}
+                ORDER BY id
+                LIMIT :limit
+            ) AS page
+        ''', {'after_id': after_id, 'offset': max(page - 1, 0) * per_page, 'limit': per_page})
+        rows = result.fetchall()
+        return [row[1:] for row in rows if row[1] is not None], rows[0][0]
+
+    def fetch_insurance_policies_filtered(self, page, per_page, **filters):
+        """
+        Získejte jednu stránku pojištění vyhovujících filtrům i s počtem pojištěnců a celkový počet
+        vyhovujících pojištění jedním dotazem. Filtry používají indexy podle platnosti a částky.
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce (-1 = všechny).
+            filters: Hodnoty filtrů POLICY_FILTERS (data v kanonickém tvaru, částky jako čísla),
+                filtry s hodnotou None se nepoužijí.
+
+        Returns:
+            tuple: Seznam polí nalezených pojištění, celkový počet vyhovujících pojištění.
+        """
+        unknown = set(filters) - set(POLICY_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown policy filters: {', '.join(sorted(unknown))}")
+        conditions = [POLICY_FILTERS[name] for name, value in filters.items() if value is not None]
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        parameters = {name: value for name, value in filters.items() if value is not None}
+        parameters.update({'offset': max(page - 1, 0) * max(per_page, 0), 'limit': per_page})
+
+        result = self.cursor.execute(f'''
+            WITH filtered AS (
+                SELECT id, title, insured_amount, insured_object, start_date, end_date
+                FROM InsurancePolicies
+                {where}
+            ),
+            total AS (SELECT count(id) AS policies FROM filtered)
+            SELECT total.policies, page.*,
+                (SELECT NULLIF(count(person_id), 0)
+                 FROM PersonInsurancePolicies
+                 WHERE policy_id = page.id) AS persons
+            FROM total
+            LEFT JOIN (
+                SELECT * FROM filtered
+                ORDER BY id
+                LIMIT :limit OFFSET :offset
+            ) AS page
+        ''', parameters)
+        rows = result.fetchall()
+        return [row[1:] for row in rows if row[1] is not None], rows[0][0]
+
+    def fetch_data_versions(self):
+        """
+        Verze dat tabulek (počet změn a čas poslední změny), viz DATA_VERSION_TABLES.
+
+        Returns:
+            list[tuple]: Trojice (name, version, modified).
+        """
+        return self.cursor.execute('SELECT name, version, modified FROM DataVersions').fetchall()
+
+    def fetch_portfolio_stats(self, today, top_cities=5):
+        """
+        Získejte souhrnné statistiky portfolia z průběžně udržovaných tabulek statistik.
+
+        Doba dotazu nezávisí na počtu pojištěnců ani pojištění (součty přes dny platnosti
+        závisí jen na počtu různých dnů začátku a konce pojištění).
+
+        Args:
+            today (str): Datum ve tvaru RRRR-MM-DD, ke kterému se počítají platná a skončená pojištění.
+            top_cities (int): Počet měst s nejvíce pojištěnci.
+
+        Returns:
+            dict: Hodnoty PortfolioStats, počet započatých (started) a skončených (expired) pojištění
+                a seznam dvojic (město, počet pojištěnců) top_cities.
+        """
+        stats = dict(self.cursor.execute('SELECT name, value FROM PortfolioStats').fetchall())
+        stats['started'] = self.cursor.execute(
+            'SELECT coalesce(sum(starts), 0) FROM PolicyDateStats WHERE day <= ?', (today,)).fetchone()[0]
+        stats['expired'] = self.cursor.execute(
+            'SELECT coalesce(sum(ends), 0) FROM PolicyDateStats WHERE day < ?', (today,)).fetchone()[0]
+        stats['top_cities'] = self.cursor.execute('''
+            SELECT city, persons FROM CityStats
+            WHERE persons > 0
+            ORDER BY persons DESC, city
+            LIMIT ?
+        ''', (top_cities,)).fetchall()
+        return stats
+
+    def portfolio_stats_differences(self):
+        """
+        Porovná tabulky statistik s hodnotami spočítanými znovu z dat (prochází celé tabulky).
+
+        Returns:
+            list[tuple]: Trojice (tabulka statistik, klíč, (uložená hodnota, správná hodnota)).
+        """
+        differences = []
+        for table, query in STATS_QUERIES.items():
+            stored = {row[0]: row[1:] for row in self.cursor.execute(f'SELECT * FROM {table}')}
+            actual = {row[0]: row[1:] for row in self.cursor.execute(query)}
+            for key in sorted(set(stored) | set(actual), key=str):
+                stored_value = stored.get(key)
+                actual_value = actual.get(key)
+                # Nulové řádky (např. město bez pojištěnců) jsou rovny chybějícím
+                if stored_value is not None and not any(stored_value) and actual_value is None:
+                    continue
+                if stored_value != actual_value:
+                    differences.append((table, key, (stored_value, actual_value)))
+        return differences
+
+    def rebuild_portfolio_stats(self):
+        """Přepočítá tabulky statistik od začátku v jedné transakci."""
+        with self.transaction():
+            for statement in STATS_REBUILD:
+                self.cursor.execute(statement)
+
+    def search_insured_persons(self, match, limit, offset=0, ranked=True):
+        """
+        Fulltextové vyhledání pojištěnců seřazené podle relevance (bm25).
+
+        Args:
+            match (str): Výraz FTS5 (viz search_match_expression).
+            limit (int): Maximální počet výsledků.
+            offset (int): Počet přeskočených výsledků.
+            ranked (bool): Řadit podle relevance; jinak podle ID, což je u častých slov
+                výrazně rychlejší (nemusí se ohodnotit všechny nalezené záznamy).
+
+        Returns:
+            list[tuple]: Pole nalezených pojištěnců (id, first_name, last_name, email, phone, street, city, postal_code).
+        """
+        if ranked:
+            order = f"bm25(InsuredPersonsSearch, {', '.join(map(str, PERSON_SEARCH_WEIGHTS))}), p.id"
+        else:
+            order = 'InsuredPersonsSearch.rowid'
+        result = self.cursor.execute(f'''
+            SELECT p.id, p.first_name, p.last_name, p.email, p.phone, p.street, p.city, p.postal_code
+            FROM InsuredPersonsSearch
+            JOIN InsuredPersons AS p ON p.id = InsuredPersonsSearch.rowid
+            WHERE InsuredPersonsSearch MATCH :match
+            ORDER BY {order}
+            LIMIT :limit OFFSET :offset
+        ''', {'match': match, 'limit': limit, 'offset': offset})
+        return result.fetchall()
+
+    def count_insured_persons_matches(self, match):
+        """
+        Počet pojištěnců nalezených fulltextovým vyhledáním.
+
+        Args:
+            match (str): Výraz FTS5 (viz search_match_expression).
+
+        Returns:
+            int: Počet nalezených pojištěnců.
+        """
+        return self.cursor.execute('''
+            SELECT count(*) FROM InsuredPersonsSearch WHERE InsuredPersonsSearch MATCH ?
+        ''', (match,)).fetchone()[0]
+
+    def search_insurance_policies(self, match, limit, offset=0, ranked=True):
+        """
+        Fulltextové vyhledání pojištění seřazené podle relevance (bm25).
+
+        Args:
+            match (str): Výraz FTS5 (viz search_match_expression).
+            limit (int): Maximální počet výsledků.
+            offset (int): Počet přeskočených výsledků.
+            ranked (bool): Řadit podle relevance; jinak podle ID, což je u častých slov
+                výrazně rychlejší (nemusí se ohodnotit všechny nalezené záznamy).
+
+        Returns:
+            list[tuple]: Pole nalezených pojištění (id, title, insured_amount, insured_object, start_date, end_date).
+        """
+        if ranked:
+            order = f"bm25(InsurancePoliciesSearch, {', '.join(map(str, POLICY_SEARCH_WEIGHTS))}), p.id"
+        else:
+            order = 'InsurancePoliciesSearch.rowid'
+        result = self.cursor.execute(f'''
+            SELECT p.id, p.title, p.insured_amount, p.insured_object, p.start_date, p.end_date
+            FROM InsurancePoliciesSearch
+            JOIN InsurancePolicies AS p ON p.id = InsurancePoliciesSearch.rowid
+            WHERE InsurancePoliciesSearch MATCH :match
+            ORDER BY {order}
+            LIMIT :limit OFFSET :offset
+        ''', {'match': match, 'limit': limit, 'offset': offset})
+        return result.fetchall()
+
+    def count_insurance_policies_matches(self, match):
+        """
+        Počet pojištění nalezených fulltextovým vyhledáním.
+
+        Args:
+            match (str): Výraz FTS5 (viz search_match_expression).
+
+        Returns:
+            int: Počet nalezených pojištění.
+        """
+        return self.cursor.execute('''
+            SELECT count(*) FROM InsurancePoliciesSearch WHERE InsurancePoliciesSearch MATCH ?
+        ''', (match,)).fetchone()[0]
+
+    def iter_all_insured_persons(self):
+        """
+        Postupně čte všechny pojištěnce seřazené podle ID (bez načtení celé tabulky do paměti).
+
+        Returns:
+            Iterator[tuple]: Pole záznamů pojištěnců.
+        """
+        return self.connection.execute('''
+            SELECT id, first_name, last_name, email, phone, street, city, postal_code
+            FROM InsuredPersons
+            ORDER BY id
+        ''')
+
+    def iter_all_insured_person_ids(self):
+        """
+        Postupně čte identifikátory všech pojištěnců seřazené podle ID (jen z primárního klíče).
+
+        Returns:
+            Iterator[tuple]: Jednoprvková pole (id,).
+        """
+        return self.connection.execute('SELECT id FROM InsuredPersons ORDER BY id')
+
+    def iter_all_insurance_policies(self):
+        """
+        Postupně čte všechna pojištění seřazená podle ID.
+
+        Returns:
+            Iterator[tuple]: Pole záznamů pojištění.
+        """
+        return self.connection.execute('''
+            SELECT id, title, insured_amount, insured_object, start_date, end_date
+            FROM InsurancePolicies
+            ORDER BY id
+        ''')
+
+    def iter_all_person_insurance_policies(self):
+        """
+        Postupně čte všechny vztahy mezi pojištěnci a pojištěními seřazené podle ID pojištěnce.
+
+        Returns:
+            Iterator[tuple]: Dvojice (person_id, policy_id).
+        """
+        return self.connection.execute('''
+            SELECT person_id, policy_id
+            FROM PersonInsurancePolicies
+            ORDER BY person_id
+        ''')
+
+    def fetch_insured_persons_after(self, after_id, limit):
+        """
+        Dávka pojištěnců seřazených podle ID, která začíná za daným pojištěncem (keyset).
+
+        Args:
+            after_id (int): Identifikátor posledního pojištěnce předchozí dávky nebo None (od začátku).
+            limit (int): Počet řádků dávky.
+
+        Returns:
+            list[tuple]: Pole záznamů pojištěnců.
+        """
+        return self.cursor.execute('''
+            SELECT id, first_name, last_name, email, phone, street, city, postal_code
+            FROM InsuredPersons
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (after_id if after_id is not None else -1, limit)).fetchall()
+
+    def fetch_insurance_policies_after(self, after_id, limit):
+        """
+        Dávka pojištění seřazených podle ID, která začíná za daným pojištěním (keyset).
+
+        Args:
+            after_id (int): Identifikátor posledního pojištění předchozí dávky nebo None (od začátku).
+            limit (int): Počet řádků dávky.
+
+        Returns:
+            list[tuple]: Pole záznamů pojištění.
+        """
+        return self.cursor.execute('''
+            SELECT id, title, insured_amount, insured_object, start_date, end_date
+            FROM InsurancePolicies
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (after_id if after_id is not None else -1, limit)).fetchall()
+
+    def fetch_person_insurance_policies_after(self, after, limit):
+        """
+        Dávka vztahů seřazených podle primárního klíče (person_id, policy_id), která začíná za daným vztahem.
+
+        Args:
+            after (tuple): Dvojice (person_id, policy_id) posledního vztahu předchozí dávky nebo None.
+            limit (int): Počet řádků dávky.
+
+        Returns:
+            list[tuple]: Dvojice (person_id, policy_id).
+        """
+        person_id, policy_id = after if after is not None else (-1, -1)
+        return self.cursor.execute('''
+            SELECT person_id, policy_id
+            FROM PersonInsurancePolicies
+            WHERE (person_id, policy_id) > (?, ?)
+            ORDER BY person_id, policy_id
+            LIMIT ?
+        ''', (person_id, policy_id, limit)).fetchall()
+
     def fetch_all_unused_insurance_policies(self):
         """
         Získejte všechna nesjednaná pojištění
@@ -283,7 +1255,7 @@ class DatabaseInsurances():
         result = self.cursor.execute('''
             SELECT id, title, insured_amount, insured_object, start_date, end_date
             FROM InsurancePolicies
-            WHERE id NOT in(SELECT DISTINCT policy_id FROM PersonInsurancePolicies)
+            WHERE NOT EXISTS (SELECT 1 FROM PersonInsurancePolicies WHERE policy_id = id)
         ''')
         return result.fetchall()
 
@@ -306,7 +1278,7 @@ class DatabaseInsurances():
             SET first_name = ?, last_name = ?, email = ?, phone = ?, street = ?, city = ?, postal_code = ?
             WHERE id = ?
         ''', (first_name, last_name, email, phone, street, city, postal_code, person_id))
-        self.connection.commit()
+        self._commit()
 
     def update_insurance_policy(self, policy_id, title, insured_amount, insured_object, start_date, end_date):
         """
@@ -325,7 +1297,7 @@ class DatabaseInsurances():
             SET title = ?, insured_amount = ?, insured_object = ?, start_date = ?, end_date = ?
             WHERE id = ?
         ''', (title, insured_amount, insured_object, start_date, end_date, policy_id))
-        self.connection.commit()
+        self._commit()
 
     def delete_insured_person(self, person_id):
         """
@@ -334,11 +1306,10 @@ class DatabaseInsurances():
         Args:
             person_id (int): Identifikátor pojištěného.
         """
-        self.cursor.execute("PRAGMA foreign_keys = ON;")
         self.cursor.execute('''
             DELETE FROM InsuredPersons WHERE id = ?
         ''', (person_id,))
-        self.connection.commit()
+        self._commit()
 
     def delete_insurance_policy(self, policy_id):
         """
@@ -347,11 +1318,10 @@ class DatabaseInsurances():
         Args:
             policy_id (int): Identifikátor pojištění.
         """
-        self.cursor.execute("PRAGMA foreign_keys = ON;")
         self.cursor.execute('''
             DELETE FROM InsurancePolicies WHERE id = ?
         ''', (policy_id,))
-        self.connection.commit()
+        self._commit()
 
     def delete_person_insurance_policy(self, person_id, policy_id):
         """
@@ -364,4 +1334,4 @@ class DatabaseInsurances():
         self.cursor.execute('''
             DELETE FROM PersonInsurancePolicies WHERE person_id = ? AND policy_id=?
         ''', (person_id, policy_id))
-        self.connection.commit()
+        self._commit()
@@ -0,0 +1,105 @@
+import argparse
+import csv
+import io
+import json
+import sys
+
+from interface_to_db import DatabaseInterface
+from importer import PERSON_FIELDS, POLICY_FIELDS
+
+# Druh exportu: (název metody DatabaseInterface, názvy sloupců)
+EXPORTS = {
+    'persons': ('export_insured_persons', ('id',) + PERSON_FIELDS),
+    'policies': ('export_insurance_policies', ('id',) + POLICY_FIELDS),
+    'person_policies': ('export_person_policies', ('person_id', 'policy_id')),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def csv_chunks(rows, fields, chunk_rows=1000):
+    """
+    Generátor textu CSV po částech (hlavička a pak vždy chunk_rows řádků).
+
+    Args:
+        rows (Iterable[tuple]): Řádky exportu.
+        fields (tuple[str]): Názvy sloupců.
+        chunk_rows (int): Počet řádků v jedné části.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count == chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+def jsonl_chunks(rows, fields, chunk_rows=1000):
+    """
+    Generátor textu JSON Lines po částech (vždy chunk_rows řádků).
+
+    Args:
+        rows (Iterable[tuple]): Řádky exportu.
+        fields (tuple[str]): Názvy sloupců.
+        chunk_rows (int): Počet řádků v jedné části.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+        if len(lines) == chunk_rows:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def export_chunks(my_db, kind, file_format):
+    """
+    Generátor exportu celé tabulky po částech textu.
+
+    Data se čtou z databáze postupně, paměť ani doba do první části nezávisí na velikosti tabulky.
+
+    Args:
+        my_db (DatabaseInterface): Rozhraní do databáze.
+        kind (str): Druh exportu (klíč EXPORTS).
+        file_format (str): 'csv' nebo 'jsonl'.
+    """
+    method, fields = EXPORTS[kind]
+    rows = getattr(my_db, method)()
+    if file_format == 'csv':
+        return csv_chunks(rows, fields)
+    return jsonl_chunks(rows, fields)
+
+
+def main():
+    """Příkazový řádek pro export."""
+    parser = argparse.ArgumentParser(description="Export pojištěnců, pojištění nebo jejich vztahů do CSV nebo JSON Lines.")
+    parser.add_argument('kind', choices=EXPORTS.keys(), help="druh exportovaných záznamů")
+    parser.add_argument('--format', choices=EXPORT_FORMATS.keys(), default='csv', help="formát exportu")
+    parser.add_argument('--db', default='insurance.db', help="cesta k databázi")
+    parser.add_argument('-o', '--output', help="výstupní soubor (výchozí standardní výstup)")
+    args = parser.parse_args()
+
+    my_db = DatabaseInterface(args.db)
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for chunk in export_chunks(my_db, args.kind, args.format):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        my_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,74 @@
-from flask import Flask, render_template, request, redirect, url_for
+import asyncio
+import io
+import threading
+import weakref
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
 
-app = Flask(__name__)
+from markupsafe import escape
+
+from flask import Flask, Response, render_template, request, redirect, url_for, abort, jsonify
+
+
+class _ThreadLoop:
+    """Smyčka událostí jednoho vlákna; zavře se, když se uvolní (po skončení vlákna)."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        weakref.finalize(self, self.loop.close)
+
+
+class AsyncFlask(Flask):
+    """
+    Aplikace Flask, která asynchronní pohledy (async def) spouští ve smyčce událostí vlákna žádosti.
+
+    Smyčka se vytvoří při první asynchronní žádosti vlákna a znovu se použije pro další žádosti
+    téhož vlákna (bez závislosti na asgiref a bez vytváření vlákna pro každou žádost). Opakované
+    použití pomáhá jen serverům se stálými vlákny (např. gunicorn --threads); vývojový server
+    s threaded=True obsluhuje každou žádost v novém vlákně, smyčka se tam tedy vytváří pro každou
+    žádost. Data vlákna se po jeho skončení uvolní a smyčka se zavře.
+    """
+
+    _loops = threading.local()
+
+    def async_to_sync(self, func):
+        def run(*args, **kwargs):
+            thread_loop = getattr(self._loops, 'thread_loop', None)
+            if thread_loop is None:
+                thread_loop = self._loops.thread_loop = _ThreadLoop()
+            return thread_loop.loop.run_until_complete(func(*args, **kwargs))
+        return run
+
+
+app = AsyncFlask(__name__)
 
 from insured_person import InsuredPerson
 from policy import InsurancePolicy
 from persons import Persons
-from policies import Policies
 
 from interface_to_db import DatabaseInterface
-from database import DatabaseInsurances
+from async_db import AsyncDatabaseInterface
+from api import ApiInterface
+from http_cache import ConditionalGet, StaticFingerprints
+from metrics import RequestMetrics
 
 from table_utils import Pagination
+from utils import Check, parse_amount, parse_date
+from importer import BulkImporter, read_records, file_format_from_name
+from exporter import EXPORTS, EXPORT_FORMATS, export_chunks
+
+# Nejvyšší hodnota filtru "Končí do (dní)" (větší počet dní už nelze přičíst k datu)
+MAX_EXPIRING_DAYS = 36500
+
+
+def _is_date_only(text):
+    """Zda je text samotné datum bez času (hodnota <input type="date">)."""
+    try:
+        date.fromisoformat(text)
+    except ValueError:
+        return False
+    return True
 
 
 class FlaskInterface:
@@ -21,41 +79,76 @@ class FlaskInterface:
     Attributes:
         my_db (DatabaseInterface): Rozhraní do databáze.
         insured (Persons): kolekce pojištěných.
+        app (Flask): Aplikace, ve které jsou trasy registrované.
     """
 
-    def __init__(self, my_db: DatabaseInterface, persons: Persons) -> None:
+    def __init__(self, my_db: DatabaseInterface, persons: Persons, flask_app: Flask = None) -> None:
         """
         Konstruktér třídy. Propojuje trasy se svými třídními metodami.
 
         Args:
             my_db (DatabaseInterface): Rozhraní do databáze.
             persons (Persons): kolekce pojištěných.
+            flask_app (Flask): Aplikace pro registraci tras (výchozí je sdílená aplikace app modulu,
+                nová aplikace pro každé rozhraní viz wsgi.create_app).
         """
         self.my_db = my_db
         self.insured = persons
+        self.app = flask_app if flask_app is not None else app
+        # Stránky s více nezávislými dotazy je provádějí souběžně (počet vláken viz DB_EXECUTOR_WORKERS)
+        self.async_db = AsyncDatabaseInterface(my_db, self.app.config.get('DB_EXECUTOR_WORKERS'))
+
+        # Měření žádostí (Server-Timing, /metrics), pokud rozhraní do databáze měří dotazy
+        if getattr(my_db, 'metrics', None) is not None:
+            RequestMetrics(self.app, my_db.metrics, my_db)
+        # Hlášení opakovaných dotazů (N+1) v každé žádosti, pokud je detektor zapnutý
+        if getattr(my_db, 'query_detector', None) is not None:
+            my_db.query_detector.register(self.app)
+
+        # Stránky, které se často obnovují, odpovídají 304, pokud se jejich data nezměnila
+        conditional = ConditionalGet(my_db)
+        all_data = ('persons', 'policies', 'links')
+        today = lambda: datetime.now().date().isoformat()
+        # Filtr expiring_days počítá s aktuálním časem (na minuty), výsledek platí jen do další minuty
+        expiring_minute = lambda: (datetime.now().strftime('%Y-%m-%dT%H:%M')
+                                   if request.args.get('expiring_days', '').strip() else None)
 
         # Registrace tras uvnitř konstruktoru
-        app.add_url_rule('/', view_func=self.index, methods=['GET'])
-        app.add_url_rule('/persons', view_func=self.persons, methods=['GET'])
-        app.add_url_rule('/policies', view_func=self.policies, methods=['GET'])
-        app.add_url_rule('/new', view_func=self.new_person, methods=['GET', 'POST'])
-        app.add_url_rule('/new2', view_func=self.new2_policy, methods=['GET', 'POST'])
-        app.add_url_rule('/delete_person/<person_id>', view_func=self.delete_person, methods=['GET'])
-        app.add_url_rule('/edit_person/<person_id>/<source>/<page>', view_func=self.edit_person, methods=['GET', 'POST'])
-        app.add_url_rule('/person/<person_id>', view_func=self.person, methods=['GET'])
-        app.add_url_rule('/delete_policy/<policy_id>/<current_page>', view_func=self.delete_policy, methods=['GET'])
-        app.add_url_rule('/edit_policy/<policy_id>/<source>/<page>', view_func=self.edit_policy, methods=['GET', 'POST'])
-        app.add_url_rule('/delete_person_policy/<person_id>/<policy_id>', view_func=self.delete_person_policy, methods=['GET'])
-        app.add_url_rule('/add_person_policy/<person_id>', view_func=self.add_person_policy, methods=['GET', 'POST'])
-        app.add_url_rule('/about', view_func=self.about_project, methods=['GET'])
-        app.add_url_rule('/show_persons', view_func=self.show_persons, methods=['GET'])
+        self.app.add_url_rule('/', view_func=self.index, methods=['GET'])
+        self.app.add_url_rule('/persons', view_func=conditional(self.persons, 'persons'), methods=['GET'])
+        self.app.add_url_rule('/policies', view_func=conditional(self.policies, 'policies', 'links', extra=expiring_minute), methods=['GET'])
+        self.app.add_url_rule('/new', view_func=self.new_person, methods=['GET', 'POST'])
+        self.app.add_url_rule('/new2', view_func=self.new2_policy, methods=['GET', 'POST'])
+        self.app.add_url_rule('/delete_person/<person_id>', view_func=self.delete_person, methods=['GET'])
+        self.app.add_url_rule('/edit_person/<person_id>/<source>/<page>', view_func=self.edit_person, methods=['GET', 'POST'])
+        self.app.add_url_rule('/person/<person_id>', view_func=conditional(self.person, *all_data), methods=['GET'])
+        self.app.add_url_rule('/delete_policy/<policy_id>/<current_page>', view_func=self.delete_policy, methods=['GET'])
+        self.app.add_url_rule('/edit_policy/<policy_id>/<source>/<page>', view_func=self.edit_policy, methods=['GET', 'POST'])
+        self.app.add_url_rule('/delete_person_policy/<person_id>/<policy_id>', view_func=self.delete_person_policy, methods=['GET'])
+        self.app.add_url_rule('/add_person_policy/<person_id>', view_func=self.add_person_policy, methods=['GET', 'POST'])
+        self.app.add_url_rule('/import', view_func=self.import_data, methods=['GET', 'POST'])
+        self.app.add_url_rule('/export/<kind>/<file_format>', view_func=self.export_data, methods=['GET'])
+        self.app.add_url_rule('/search', view_func=self.search, methods=['GET'])
+        self.app.add_url_rule('/search.json', view_func=self.search_json, methods=['GET'])
+        self.app.add_url_rule('/stats', view_func=conditional(self.stats, *all_data, extra=today), methods=['GET'])
+        self.app.add_url_rule('/stats.json', view_func=conditional(self.stats_json, *all_data, extra=today), methods=['GET'])
+        self.app.add_url_rule('/about', view_func=self.about_project, methods=['GET'])
+        self.app.add_url_rule('/show_persons', view_func=self.show_persons, methods=['GET'])
+
+        # Otisky statických souborů v URL a dlouhá doba uložení v cache prohlížeče
+        StaticFingerprints(self.app)
+
+        # JSON REST API (/api/v1) nad stejným rozhraním do databáze a kolekcí pojištěných
+        self.api = ApiInterface(my_db, persons)
+        self.app.register_blueprint(self.api.blueprint)
 
     def start(self):
         """
             Spustí webový server flask na adrese
             http://127.0.0.1:5000
+            (vývojový server, pro provoz viz serve.py)
         """
-        app.run(debug=True)
+        self.app.run(debug=True)
 
     def index(self):
         """Domovská stránka"""
@@ -67,12 +160,19 @@ class FlaskInterface:
         saved = request.args.get('saved', '0') == '1'
         saved_text = request.args.get('saved_text', '')
 
-        to_show, page, total_pages  = Pagination.calculate_table_pages(self.my_db, 'persons', 3, page)
+        # Kurzor (after) platí jen pro stránku, pro kterou byl vygenerován
+        after_id = None
+        if request.args.get('cursor_page') == str(page) and request.args.get('after', '').isdigit():
+            after_id = int(request.args['after'])
+
+        to_show, page, total_pages  = Pagination.calculate_table_pages(self.my_db, 'persons', 3, page, after_id)
+        last_id = Pagination.last_row_id(to_show, 'persons')
 
         return render_template('persons.html', persons=to_show, saved=saved, saved_text=saved_text,
                             page=page, previous_page=page - 1 if page > 1 else 1,
                             next_page=page + 1 if page < total_pages else total_pages + 1,
-                            total_pages=total_pages)
+                            total_pages=total_pages, pages=Pagination.page_window(page, total_pages),
+                            last_id=last_id)
 
     def policies(self):
         """Webová stránka: Seznam pojištění"""
@@ -80,13 +180,72 @@ class FlaskInterface:
         saved = request.args.get('saved', '0') == '1'
         saved_text = request.args.get('saved_text', '')
 
-        to_show, page, total_pages  = Pagination.calculate_table_pages(self.my_db, 'policies', 3, page)
+        # Kurzor (after) platí jen pro stránku, pro kterou byl vygenerován
+        after_id = None
+        if request.args.get('cursor_page') == str(page) and request.args.get('after', '').isdigit():
+            after_id = int(request.args['after'])
+
+        filters, filter_args, filter_error = self._policy_filters()
+
+        to_show, page, total_pages  = Pagination.calculate_table_pages(self.my_db, 'policies', 3, page, after_id, filters)
+        # Kurzor se používá jen pro nefiltrovaný seznam
+        last_id = Pagination.last_row_id(to_show, 'policies') if not filters else None
 
         return render_template('policies.html', policies=to_show,
                             saved=saved, saved_text=saved_text, page=page, 
                             previous_page=page - 1 if page > 1 else 0,
                             next_page=page + 1 if page < total_pages else total_pages + 1,
-                            total_pages=total_pages)
+                            total_pages=total_pages, pages=Pagination.page_window(page, total_pages),
+                            last_id=last_id,
+                            filter_args=filter_args, filter_error=filter_error)
+
+    def _policy_filters(self):
+        """
+        Filtry seznamu pojištění z parametrů žádosti.
+
+        Parametry: active_on (platné k datu; u data bez času kdykoli během dne), expiring_days
+        (končí během dní, nejvýše MAX_EXPIRING_DAYS), amount_min a amount_max (rozsah částky).
+
+        Returns:
+            tuple: Filtry pro DatabaseInterface.get_insurance_policies_filtered_page,
+                vyplněné parametry filtrů (pro stránkování) a text chyby nebo None.
+        """
+        filter_args = {name: request.args[name].strip()
+                       for name in ('active_on', 'expiring_days', 'amount_min', 'amount_max')
+                       if request.args.get(name, '').strip()}
+        filters = {}
+        errors = []
+
+        if 'active_on' in filter_args:
+            active_on = parse_date(filter_args['active_on'])
+            if not Check.date(active_on):
+                errors.append("Neplatná hodnota: Platné k")
+            elif _is_date_only(filter_args['active_on']):
+                # Datum z formuláře (bez času): pojištění platná kdykoli během dne, i když začínají
+                # později než o půlnoci nebo končí dřív než na konci dne
+                filters['start_to'] = active_on.replace(hour=23, minute=59)
+                filters['end_from'] = active_on
+            else:
+                filters['active_on'] = active_on
+
+        if 'expiring_days' in filter_args:
+            days = filter_args['expiring_days']
+            if days.isdigit() and int(days) <= MAX_EXPIRING_DAYS:
+                now = datetime.now().replace(second=0, microsecond=0)
+                filters['end_from'] = max(filters.get('end_from', now), now)
+                filters['end_to'] = now + timedelta(days=int(days))
+            else:
+                errors.append("Neplatná hodnota: Končí do (dní)")
+
+        for name, label in (('amount_min', "Částka od"), ('amount_max', "Částka do")):
+            if name in filter_args:
+                amount = parse_amount(filter_args[name])
+                if isinstance(amount, Decimal):
+                    filters[name] = amount
+                else:
+                    errors.append(f"Neplatná hodnota: {label}")
+
+        return filters, filter_args, ', '.join(errors) or None
 
     def new_person(self):
         """Webová stránka: Vytvoření nového pojištěnce"""
@@ -150,9 +309,9 @@ class FlaskInterface:
             person_id (int): Identifikátor pojištěného.
         """        
         
-        db = DatabaseInsurances(self.my_db.db_name)
-        db.delete_insured_person(person_id)
-        del self.insured[int(person_id)]
+        self.my_db.delete_insured_person_from_db(person_id)
+        if int(person_id) in self.insured:
+            del self.insured[int(person_id)]
 
         total_pages = Pagination.total_table_pages(self.my_db, 'persons', 3)
 
@@ -182,9 +341,10 @@ class FlaskInterface:
                 return render_template('edit_person.html', person_id=person_id, person=edited_insured, source=source, page=page, err_msg=check_data)
 
             # Aktualizovat kolekce
-            for policy_id, policy in self.insured[int(person_id)].policies:
-                edited_insured.policies[policy_id] = policy
-            self.insured[int(person_id)] = edited_insured
+            if int(person_id) in self.insured:
+                for policy_id, policy in self.insured[int(person_id)].policies:
+                    edited_insured.policies[policy_id] = policy
+                self.insured[int(person_id)] = edited_insured
             self.my_db.update_insured_person_in_db(person_id, edited_insured)
             
             if source=='persons':
@@ -199,23 +359,19 @@ class FlaskInterface:
             return "Pojištěnec ID: {person_id} nenalezen v database!"
         return render_template('edit_person.html', person_id=person_id, person=person, source=source, page=page, err_msg=None)
 
-    def person(self, person_id):
+    async def person(self, person_id):
         """
         Webová stránka: Přehled pojištěného a jeho pojištění.
 
         Args:
             person_id (str): Identifikátor pojištěného.
         """
-        person = self.my_db.find_insured_person_by_id(person_id)
-        policies_dic = self.my_db.find_insurance_policies_by_person_id(person_id)
-
-        # Aktualizovat kolekce
-        policies_replace = Policies()
-        for id, policy in policies_dic.items():
-            policies_replace[id]=policy
-        person.policies = policies_replace
-        self.insured[int(person_id)] = person
+        person, policies_dic = await asyncio.gather(self.async_db.find_insured_person_by_id(person_id),
+                                                    self.async_db.find_insurance_policies_by_person_id(person_id))
+        if person==None:
+            return f"Pojištěnec ID: {person_id} nenalezen v database!"
 
+        # Jen čtení (z cache), kolekce pojištěnců se nemění
         person_policies = [(id, policy) for id, policy in policies_dic.items()]
 
         return render_template('person.html', person_id=person_id, person=person, policies=person_policies)
@@ -228,8 +384,7 @@ class FlaskInterface:
             policy_id (str): Identifikátor pojištění.
             current_page (str): Číslo stránky v tabulce pojištěnců pro vrácení.
         """
-        db = DatabaseInsurances(self.my_db.db_name)
-        db.delete_insurance_policy(policy_id)
+        self.my_db.delete_insurance_policy_from_db(policy_id)
         self.insured.delete_policy(policy_id)
 
         return redirect(url_for('policies', page=Pagination.chek_policies_page(self.my_db, current_page)))
@@ -280,12 +435,12 @@ class FlaskInterface:
             person_id (str): Identifikátor pojištěného.
             policy_id (str): Identifikátor pojištění.
         """
-        db = DatabaseInsurances(self.my_db.db_name)
-        db.delete_person_insurance_policy(person_id, policy_id)
-        del self.insured[int(person_id)].policies[int(policy_id)]
+        self.my_db.delete_person_policy_from_db(person_id, policy_id)
+        if int(person_id) in self.insured and int(policy_id) in self.insured[int(person_id)].policies:
+            del self.insured[int(person_id)].policies[int(policy_id)]
         return redirect(url_for('person', person_id=person_id))
 
-    def add_person_policy(self, person_id):
+    async def add_person_policy(self, person_id):
         """
         Webová stránka: Spojte pojištění s pojištěním.
 
@@ -294,42 +449,203 @@ class FlaskInterface:
         """
         if request.method == 'POST':
             policy_id = request.form['policySelect']
-            policy = self.my_db.find_insurance_policy_by_id(policy_id)
+            policy = await self.async_db.find_insurance_policy_by_id(policy_id)
             if policy==None:
                 return "Pojištění ID: {policy_id} nenalezeno"
-            self.insured[int(person_id)].policies[int(policy_id)]=policy
-            db = DatabaseInsurances(self.my_db.db_name)
-            db.insert_person_insurance_policy(person_id, policy_id)
+            if int(person_id) in self.insured:
+                self.insured[int(person_id)].policies[int(policy_id)]=policy
+            await self.async_db.add_person_policy_to_db(person_id, policy_id)
             return redirect(url_for('person', person_id=person_id))
         
-        person = self.my_db.find_insured_person_by_id(person_id)
-        unused_policies = self.my_db.get_all_unused_insurance_policies()
+        person, unused_policies = await asyncio.gather(self.async_db.find_insured_person_by_id(person_id),
+                                                       self.async_db.get_all_unused_insurance_policies())
+        if person==None:
+            return f"Pojištěnec ID: {person_id} nenalezen v database!"
         select_data = []
         policies = []
         for id, policy in unused_policies.items():
             select_data.append((id, policy.title))
             policy_dic = {
                 'title': policy.title,
-                'insured_amount': policy.insured_amount,
+                'insured_amount': str(policy.insured_amount),
                 'insured_object': policy.insured_object,
-                'start_date': policy.start_date,
-                'end_date': policy.end_date,
+                'start_date': policy.start_date_text,
+                'end_date': policy.end_date_text,
             }
             policies.append(policy_dic)
 
         return render_template('person_policy.html', person_name=f"{person.first_name} {person.last_name}", select_data=select_data, policies=policies, person_id=person_id)
 
+    def import_data(self):
+        """Webová stránka: Hromadný import pojištěnců nebo pojištění ze souboru CSV nebo JSON Lines"""
+        if request.method == 'POST':
+            kind = request.form['kind']
+            upload = request.files.get('file')
+            if upload is None or upload.filename == '':
+                return render_template('import.html', err_msg="Vyberte soubor", result=None, errors=[])
+
+            # Na stránce se zobrazí jen prvních 100 chyb, ostatní se jen započítají
+            errors = []
+            def on_error(row_number, message):
+                if len(errors) < 100:
+                    errors.append((row_number, message))
+
+            def on_person_inserted(person_id, person):
+                self.insured[person_id] = person
+
+            importer = BulkImporter(self.my_db, on_error=on_error, on_person_inserted=on_person_inserted)
+            stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+            records = read_records(stream, file_format_from_name(upload.filename))
+            if kind == 'persons':
+                result = importer.import_persons(records)
+            else:
+                result = importer.import_policies(records)
+
+            return render_template('import.html', err_msg=None, result=result, errors=errors)
+
+        return render_template('import.html', err_msg=None, result=None, errors=[])
+
+    def export_data(self, kind, file_format):
+        """
+        Export celé tabulky jako postupně odesílaný soubor.
+
+        Args:
+            kind (str): persons, policies nebo person_policies.
+            file_format (str): csv nebo jsonl.
+        """
+        if kind not in EXPORTS or file_format not in EXPORT_FORMATS:
+            abort(404)
+        response = Response(export_chunks(self.my_db, kind, file_format),
+                            mimetype=EXPORT_FORMATS[file_format])
+        response.headers['Content-Disposition'] = f'attachment; filename={kind}.{file_format}'
+        return response
+
+    async def search(self):
+        """Webová stránka: Vyhledávání pojištěnců a pojištění"""
+        text = request.args.get('q', '').strip()
+        kind = request.args.get('kind', 'persons')
+        if kind not in ('persons', 'policies'):
+            abort(404)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = 10
+
+        (persons, persons_total), (policies, policies_total) = await asyncio.gather(
+            self.async_db.search_insured_persons(text, page if kind == 'persons' else 1,
+                                                 per_page if kind == 'persons' else 0),
+            self.async_db.search_insurance_policies(text, page if kind == 'policies' else 1,
+                                                    per_page if kind == 'policies' else 0))
+        total = persons_total if kind == 'persons' else policies_total
+        total_pages = max((total + per_page - 1) // per_page, 1)
+
+        return render_template('search.html', text=text, kind=kind, page=page, total_pages=total_pages,
+                               persons=list(persons.items()), persons_total=persons_total,
+                               policies=list(policies.items()), policies_total=policies_total)
+
+    def search_json(self):
+        """Návrhy našeptávače ve formátu JSON"""
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        suggestions = self.my_db.search_suggestions(request.args.get('q', ''), limit)
+        for suggestion in suggestions:
+            if suggestion['kind'] == 'person':
+                suggestion['url'] = url_for('person', person_id=suggestion['id'])
+            else:
+                suggestion['url'] = url_for('edit_policy', policy_id=suggestion['id'], source='policies', page=1)
+        return jsonify(suggestions)
+
+    def stats(self):
+        """Webová stránka: Statistiky portfolia"""
+        return render_template('stats.html', stats=self.my_db.portfolio_stats())
+
+    def stats_json(self):
+        """Statistiky portfolia ve formátu JSON"""
+        top_cities = min(max(request.args.get('top_cities', 5, type=int), 0), 100)
+        stats = self.my_db.portfolio_stats(top_cities=top_cities)
+        stats['total_amount'] = str(stats['total_amount'])
+        return jsonify(stats)
+
     def about_project(self):
         """Webová stránka: Informace o programu"""
         return render_template('about.html')
 
     def show_persons(self):
-        """Webová stránka: Servisní stránka"""
-        result = '<a href="/">PojištěníApp</a><br>\n'
-        for id, _ in self.insured:
-            result += f'<h4>{id}. {self.insured[id]}: <br></h4>\n<ul>'
-            for id2, policy in self.insured[id].policies:
-                result += f'<li>\t{id2}. {policy}</li>\n'
-            result += f'</ul>\n'
-        return result
+        """
+        Webová stránka: Servisní stránka.
+
+        Výpis kolekce pojištěnců v paměti se odesílá postupně. Volitelné parametry:
+        from_id a to_id (rozsah ID), with_policies=1 (jen pojištěnci s pojištěním),
+        page a per_page (stránkování vyfiltrovaných pojištěnců, od 1).
+        """
+        from_id = request.args.get('from_id', type=int)
+        to_id = request.args.get('to_id', type=int)
+        with_policies = request.args.get('with_policies', '0') == '1'
+        page = request.args.get('page', type=int)
+        per_page = request.args.get('per_page', 100, type=int)
+        if page is not None and page < 1:
+            abort(400, description='Parameter page must be at least 1.')
+        if per_page < 1:
+            abort(400, description='Parameter per_page must be at least 1.')
+
+        return Response(self._show_persons_chunks(from_id, to_id, with_policies, page, per_page),
+                        mimetype='text/html')
+
+    def _show_persons_chunks(self, from_id, to_id, with_policies, page, per_page):
+        """
+        Generátor servisní stránky po částech (stav spojení a cache, vždy 100 pojištěnců a nakonec souhrn kolekce).
 
+        Souhrn kolekce se počítá až po odeslání pojištěnců, jeho doba roste s velikostí kolekce
+        a nemá zdržet první odeslané bajty.
+        """
+        yield '<a href="/">PojištěníApp</a><br>\n'
+        pool = self.my_db.pool_stats()
+        yield (f'<p>Spojení: otevřených {pool["open_connections"]}, volných {pool["idle_connections"]}, '
+               f'výpůjček {pool["checkouts"]}, čekání {pool["waits"]}</p>\n')
+        if hasattr(self.my_db, 'cache_stats'):
+            cache = self.my_db.cache_stats()
+            yield (f'<p>Cache: položek {cache["size"]}/{cache["max_size"]}, zásahů {cache["hits"]}, '
+                   f'výpadků {cache["misses"]}, vyřazení {cache["evictions"]}, '
+                   f'zneplatnění {cache["invalidations"]}</p>\n')
+
+        ids = (id for id in self.insured.ids()
+               if (from_id is None or id >= from_id) and (to_id is None or id <= to_id))
+        if page is not None and not with_policies:
+            # Stránkovat už identifikátory, aby se nenačítali pojištěnci před stránkou
+            start = (page - 1) * per_page
+            ids = islice(ids, start, start + per_page)
+
+        def selected():
+            # Kolekce načítaná z databáze (LazyPersons) načte pojištěnce po dávkách, ne po jednom
+            preload = getattr(self.insured, 'preload', None)
+            batch_size = per_page if page is not None and not with_policies else 100
+            while batch := list(islice(ids, batch_size)):
+                if preload is not None:
+                    preload(batch)
+                for id in batch:
+                    person = self.insured[id]
+                    if person is None or (with_policies and person.policies_count == 0):
+                        continue
+                    yield id, person
+
+        persons = selected()
+        if page is not None and with_policies:
+            start = (page - 1) * per_page
+            persons = islice(persons, start, start + per_page)
+
+        parts = []
+        for id, person in persons:
+            parts.append(f'<h4>{id}. {escape(person)}: <br></h4>\n<ul>')
+            if person.policies_count:
+                for id2, policy in person.policies:
+                    parts.append(f'<li>\t{id2}. {escape(policy)}</li>\n')
+            parts.append('</ul>\n')
+            if len(parts) >= 100:
+                yield ''.join(parts)
+                parts = []
+        yield ''.join(parts)
+
+        summary = self.insured.summary()
+        yield (f'<p>Pojištěnců: {summary["persons"]}, sjednaných pojištění: {summary["links"]}, '
+               f'různých pojištění: {summary["policies"]}, '
+               f'odhad paměti: {summary["estimated_bytes"] / 1048576:.1f} MB</p>\n')
+        if 'loaded' in summary:
+            yield (f'<p>Načteno v paměti: {summary["loaded"]}, načtení z databáze: {summary["faults"]}, '
+                   f'uvolnění: {summary["evictions"]}</p>\n')
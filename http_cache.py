@@ -0,0 +1,156 @@
+import hashlib
+import os
+from functools import lru_cache, wraps
+
+from flask import Response, current_app, request, make_response
+
+# Doba uložení statických souborů s otiskem v URL v cache prohlížeče (1 rok)
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def source_fingerprint():
+    """
+    Otisk šablon a zdrojových kódů aplikace.
+
+    Je součástí ETag, po nasazení nové verze aplikace tedy neplatí ETag vydané předchozí verzí.
+    Ve všech procesech se stejnou verzí aplikace je stejný.
+
+    Returns:
+        str: Prvních 8 znaků SHA-1.
+    """
+    digest = hashlib.sha1()
+    templates = os.path.join(_ROOT, 'templates')
+    paths = [os.path.join(_ROOT, name) for name in os.listdir(_ROOT) if name.endswith('.py')]
+    paths += [os.path.join(templates, name) for name in os.listdir(templates)]
+    for path in sorted(paths):
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:8]
+
+
+class ConditionalGet:
+    """
+    Podmíněné žádosti GET (ETag, Last-Modified, 304 Not Modified) podle verze dat v databázi.
+
+    ETag se skládá z otisku aplikace a verzí tabulek, na kterých stránka závisí
+    (DatabaseInterface.data_versions). Pokud klient pošle ETag nebo čas, které stále platí,
+    odpoví se 304 bez volání pohledu, tedy bez dotazů na řádky a bez šablony.
+
+    Attributes:
+        my_db (DatabaseInterface): Rozhraní do databáze.
+    """
+
+    def __init__(self, my_db):
+        """Konstruktor třídy ConditionalGet"""
+        self.my_db = my_db
+        self._salt = source_fingerprint()
+
+    def __call__(self, view, *names, extra=None):
+        """
+        Obalí pohled podmíněnou žádostí.
+
+        Args:
+            view (callable): Pohled Flask.
+            names (str): Verze dat, na kterých odpověď závisí (persons, policies, links).
+            extra (callable): Funkce vracející další část ETag, pokud odpověď závisí i na něčem jiném
+                (např. na dnešním datu); Last-Modified se pak neposílá. Pokud pro danou žádost vrátí
+                None, odpověď závisí jen na datech.
+
+        Returns:
+            callable: Pohled se stejným názvem (endpoint).
+        """
+        @wraps(view)
+        def conditional_view(*args, **kwargs):
+            versions = self.my_db.data_versions()
+            etag = '-'.join([self._salt] + [str(versions[name][0]) for name in names])
+            last_modified = None
+            extra_tag = extra() if extra is not None else None
+            if extra_tag is not None:
+                etag += f'-{extra_tag}'
+            else:
+                last_modified = max(versions[name][1] for name in names)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                # Čas změny má přesnost na sekundy a další zápis ve stejné sekundě ho nezmění,
+                # If-Modified-Since tedy platí, jen pokud je až po sekundě poslední změny
+                not_modified = (last_modified is not None and request.if_modified_since is not None
+                                and last_modified < request.if_modified_since)
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(current_app.ensure_sync(view)(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Prohlížeč smí odpověď uložit, ale před použitím ji musí ověřit
+            response.cache_control.no_cache = True
+            return response
+
+        return conditional_view
+
+
+class StaticFingerprints:
+    """
+    Otisky statických souborů v URL (?v=otisk) a dlouhá doba uložení v cache prohlížeče.
+
+    url_for('static', filename=...) doplní otisk obsahu souboru, šablony se tedy nemění.
+    Soubor s platným otiskem v URL se smí uložit na STATIC_MAX_AGE; po změně souboru
+    se změní otisk, a tím i URL.
+    """
+
+    def __init__(self, app, max_age=STATIC_MAX_AGE):
+        """
+        Konstruktor třídy StaticFingerprints. Registruje se v aplikaci Flask.
+
+        Args:
+            app (Flask): Aplikace.
+            max_age (int): Doba uložení v cache v sekundách.
+        """
+        self.static_folder = app.static_folder
+        self.max_age = max_age
+        self._fingerprints = {}
+        app.url_defaults(self._add_fingerprint)
+        app.after_request(self._cache_headers)
+
+    def fingerprint(self, filename):
+        """
+        Otisk obsahu statického souboru (přepočítá se jen po změně souboru).
+
+        Returns:
+            str: Prvních 10 znaků SHA-1 nebo None, pokud soubor neexistuje.
+        """
+        path = os.path.join(self.static_folder, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._fingerprints.get(filename)
+        if cached is None or cached[0] != key:
+            with open(path, 'rb') as file:
+                cached = (key, hashlib.sha1(file.read()).hexdigest()[:10])
+            self._fingerprints[filename] = cached
+        return cached[1]
+
+    def _add_fingerprint(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            fingerprint = self.fingerprint(values['filename'])
+            if fingerprint is not None:
+                values['v'] = fingerprint
+
+    def _cache_headers(self, response):
+        if (request.endpoint == 'static' and response.status_code in (200, 304) and 'v' in request.args
+                and request.args['v'] == self.fingerprint(request.view_args['filename'])):
+            response.cache_control.public = True
+            response.cache_control.max_age = self.max_age
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
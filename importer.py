@@ -0,0 +1,232 @@
+import argparse
+import csv
+import json
+import os
+from itertools import islice
+
+from interface_to_db import DatabaseInterface
+from insured_person import InsuredPerson
+from policy import InsurancePolicy
+
+PERSON_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'street', 'city', 'postal_code')
+POLICY_FIELDS = ('title', 'insured_amount', 'insured_object', 'start_date', 'end_date')
+
+
+def read_records(stream, file_format):
+    """
+    Postupně čte záznamy ze souboru CSV (s hlavičkou) nebo JSON Lines.
+
+    Args:
+        stream (TextIO): Textový proud se souborem.
+        file_format (str): 'csv' nebo 'jsonl'.
+
+    Returns:
+        Iterator[tuple]: Dvojice (číslo řádku, slovník hodnot). Neplatný řádek má místo slovníku None.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def file_format_from_name(file_name):
+    """
+    Určí formát souboru podle přípony.
+
+    Returns:
+        str: 'jsonl' pro přípony .jsonl a .json, jinak 'csv'.
+    """
+    return 'jsonl' if os.path.splitext(file_name)[1].lower() in ('.jsonl', '.json') else 'csv'
+
+
+class BulkImporter:
+    """
+    Hromadný import pojištěnců a pojištění.
+
+    Záznamy se zpracovávají po dávkách: každá dávka se ověří po sloupcích (check_columns),
+    porovná s databází jedním dotazem a zapíše jedním příkazem executemany v jedné transakci.
+    V paměti je vždy jen jedna dávka, chyby se předávají průběžně funkci on_error.
+
+    Attributes:
+        my_db (DatabaseInterface): Rozhraní do databáze.
+        chunk_size (int): Počet záznamů v jedné dávce.
+        on_error (callable): Funkce on_error(číslo řádku, text chyby) pro report chyb.
+        on_person_inserted (callable): Funkce on_person_inserted(person_id, person) volaná pro každého nového pojištěnce.
+    """
+
+    def __init__(self, my_db, chunk_size=1000, on_error=None, on_person_inserted=None):
+        """Konstruktor třídy BulkImporter"""
+        self.my_db = my_db
+        self.chunk_size = chunk_size
+        self.on_error = on_error
+        self.on_person_inserted = on_person_inserted
+
+    def _chunks(self, records):
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _error(self, result, key, row_number, message):
+        result[key] += 1
+        if self.on_error is not None:
+            self.on_error(row_number, message)
+
+    @staticmethod
+    def _values(record, fields):
+        """Vrátí hodnoty sloupců záznamu nebo None, pokud některý sloupec chybí."""
+        if any(record.get(field) is None for field in fields):
+            return None
+        return [str(record[field]) for field in fields]
+
+    def _validate(self, result, chunk, fields, item_class):
+        """
+        Ověří dávku záznamů najednou po sloupcích (item_class.check_columns).
+
+        Sloupce se berou z vytvořených objektů, kontrolují se tedy už převedené hodnoty
+        (např. data a částky pojištění). Chyby se hlásí všechny najednou pro každý řádek.
+
+        Returns:
+            list[tuple]: Dvojice (číslo řádku, objekt item_class) správných záznamů.
+        """
+        rows = []
+        for row_number, record in chunk:
+            if record is None:
+                self._error(result, 'invalid', row_number, "Neplatný záznam")
+                continue
+            values = self._values(record, fields)
+            if values is None:
+                self._error(result, 'invalid', row_number, f"Chybí sloupce: {', '.join(fields)}")
+                continue
+            rows.append((row_number, item_class(*values)))
+
+        columns = {field: [getattr(item, field) for _, item in rows] for field in fields}
+        valid = []
+        for (row_number, item), codes in zip(rows, item_class.check_columns(columns, all_errors=True)):
+            if codes:
+                self._error(result, 'invalid', row_number, '; '.join(item_class.error_message(code) for code in codes))
+                continue
+            valid.append((row_number, item))
+        return valid
+
+    def import_persons(self, records):
+        """
+        Import pojištěnců.
+
+        Args:
+            records (Iterable[tuple]): Dvojice (číslo řádku, slovník hodnot), viz read_records.
+
+        Returns:
+            dict: Počet přečtených, uložených, duplicitních a neplatných záznamů.
+        """
+        result = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0}
+        for chunk in self._chunks(records):
+            result['rows'] += len(chunk)
+            valid = self._validate(result, chunk, PERSON_FIELDS, InsuredPerson)
+
+            with self.my_db.unit_of_work():
+                seen = self.my_db.existing_insured_persons([person for _, person in valid])
+                to_insert = []
+                for row_number, person in valid:
+                    key = (person.first_name, person.last_name, person.email)
+                    if key in seen:
+                        self._error(result, 'duplicates', row_number,
+                                    f"Tento pojištěnec již existuje: {person.first_name} {person.last_name}")
+                        continue
+                    seen.add(key)
+                    to_insert.append(person)
+                person_ids = self.my_db.add_insured_persons_to_db(to_insert)
+
+            result['inserted'] += len(person_ids)
+            if self.on_person_inserted is not None:
+                for person_id, person in zip(person_ids, to_insert):
+                    self.on_person_inserted(person_id, person)
+        return result
+
+    def import_policies(self, records):
+        """
+        Import pojištění.
+
+        Args:
+            records (Iterable[tuple]): Dvojice (číslo řádku, slovník hodnot), viz read_records.
+
+        Returns:
+            dict: Počet přečtených, uložených, duplicitních a neplatných záznamů.
+        """
+        result = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0}
+        for chunk in self._chunks(records):
+            result['rows'] += len(chunk)
+            valid = self._validate(result, chunk, POLICY_FIELDS, InsurancePolicy)
+
+            with self.my_db.unit_of_work():
+                seen = self.my_db.existing_policy_titles([policy.title for _, policy in valid])
+                to_insert = []
+                for row_number, policy in valid:
+                    if policy.title in seen:
+                        self._error(result, 'duplicates', row_number, f"Tento Jméno již existuje: {policy.title}")
+                        continue
+                    seen.add(policy.title)
+                    to_insert.append(policy)
+                self.my_db.add_insurance_policies_to_db(to_insert)
+
+            result['inserted'] += len(to_insert)
+        return result
+
+
+def main():
+    """Příkazový řádek pro hromadný import."""
+    parser = argparse.ArgumentParser(description="Hromadný import pojištěnců nebo pojištění ze souboru CSV nebo JSON Lines.")
+    parser.add_argument('kind', choices=('persons', 'policies'), help="druh importovaných záznamů")
+    parser.add_argument('file', help="soubor CSV (s hlavičkou) nebo JSON Lines")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="formát souboru (výchozí podle přípony)")
+    parser.add_argument('--db', default='insurance.db', help="cesta k databázi")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="počet záznamů v jedné transakci")
+    parser.add_argument('--report', help="soubor CSV pro report chyb (číslo řádku, chyba)")
+    args = parser.parse_args()
+
+    my_db = DatabaseInterface(args.db, storage_profile='wal')
+    my_db.create_tables()
+
+    report_file = open(args.report, 'w', newline='', encoding='utf-8') if args.report else None
+    report = csv.writer(report_file) if report_file else None
+    if report:
+        report.writerow(('row', 'error'))
+
+    def on_error(row_number, message):
+        if report:
+            report.writerow((row_number, message))
+        else:
+            print(f"řádek {row_number}: {message}")
+
+    importer = BulkImporter(my_db, args.chunk_size, on_error)
+    try:
+        with open(args.file, newline='', encoding='utf-8-sig') as stream:
+            records = read_records(stream, args.format or file_format_from_name(args.file))
+            if args.kind == 'persons':
+                result = importer.import_persons(records)
+            else:
+                result = importer.import_policies(records)
+    finally:
+        if report_file:
+            report_file.close()
+        my_db.close()
+
+    print(f"Přečteno: {result['rows']}, uloženo: {result['inserted']}, "
+          f"duplicitních: {result['duplicates']}, neplatných: {result['invalid']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -17,22 +17,58 @@ class InsuredPerson(Person):
         policies (Policies): kolekce pojištění
     """
 
-    _policies = Policies()
+    # Kolekce pojištění se vytváří až při prvním přístupu, každý pojištěnec má vlastní
+    __slots__ = ('_policies', '_holders', '_person_id')
 
     def __init__(self, first_name, last_name, email, phone, street, city, postal_code):
         """Konstruktor třídy InsuredPerson"""
         super().__init__(first_name, last_name, email, phone, street, city, postal_code)
+        self._holders = None
+        self._person_id = None
+
+    def _bind(self, holders, person_id):
+        """
+        Připojí pojištěnce k indexu pojištění -> pojištěnci kolekce Persons (holders None = odpojit).
+
+        Args:
+            holders (dict[int: set[int]]): Index kolekce Persons.
+            person_id (int): Identifikátor pojištěnce v kolekci.
+        """
+        self._holders = holders
+        self._person_id = person_id
+        if hasattr(self, '_policies'):
+            self._policies._bind(holders, person_id)
 
     @property
     def policies(self):
-        return self._policies
+        try:
+            return self._policies
+        except AttributeError:
+            self._policies = Policies()
+            if self._holders is not None:
+                self._policies._bind(self._holders, self._person_id)
+            return self._policies
+
+    @property
+    def policies_count(self):
+        """Počet sjednaných pojištění (bez vytvoření prázdné kolekce)."""
+        try:
+            return len(self._policies)
+        except AttributeError:
+            return 0
 
     @policies.setter
     def policies(self, value):
         if not isinstance(value, Policies):
             raise TypeError("Policies must be an instance of Policies class")
+        if hasattr(self, '_policies') and self._holders is not None:
+            self._policies._bind(None, None)
         self._policies = value
+        if self._holders is not None:
+            value._bind(self._holders, self._person_id)
 
     @policies.deleter
     def policies(self):
+        if self._holders is not None:
+            self._policies._bind(None, None)
         del self._policies
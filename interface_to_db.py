@@ -3,9 +3,17 @@ from insured_person import InsuredPerson
 from policy import InsurancePolicy
 
 from persons import Persons
-from policies import Policies
+from lazy_persons import LazyPersons
+from snapshot_persons import SnapshotPersons
 
-from database import DatabaseInsurances
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from database import DatabaseInsurances, search_match_expression
+from utils import format_date
+from connection_pool import ConnectionPool
 
 class DatabaseInterface():
     """
@@ -13,44 +21,251 @@ class DatabaseInterface():
 
     Attributes:
         db_name (str): Cesta k databázi.
+        metrics (Metrics): Měření dotazů do databáze (None = neměřit).
+        query_detector (QueryDetector): Detektor N+1 dotazů (None = vypnutý).
     """
 
     _db_name = None
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, pool_size=5, storage_profile='default', metrics=None, query_detector=None):
         self._db_name = db_name
+        self._pool = ConnectionPool(db_name, pool_size, storage_profile=storage_profile)
+        self._local = threading.local()
+        self.metrics = metrics
+        self.query_detector = query_detector
+        self._database_class = metrics.database_class if metrics is not None else DatabaseInsurances
+        if query_detector is not None:
+            self._database_class = query_detector.database_class(self._database_class)
 
     @property
     def db_name(self):
         return self._db_name
 
+    @contextmanager
+    def _database(self):
+        """
+        Vypůjčí si spojení z fondu spojení a vrátí nad ním objekt DatabaseInsurances.
+
+        Uvnitř bloku unit_of_work() se v tomtéž vlákně používá spojení této transakce.
+        """
+        db = getattr(self._local, 'unit_of_work', None)
+        if db is not None:
+            yield db
+            return
+        with self._pool.connection() as connection:
+            with self._database_class(self._db_name, connection) as db:
+                yield db
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Kontextový manažer, který seskupí všechny zápisy do databáze uvnitř bloku do jedné transakce.
+
+        Metody tohoto objektu volané uvnitř bloku (ve stejném vlákně) sdílí jedno spojení
+        a jejich změny se potvrdí najednou na konci bloku. Při výjimce se všechny změny vrátí zpět.
+        Vnořený blok se připojí k vnější transakci.
+
+        Example:
+            with my_db.unit_of_work():
+                person_id = my_db.add_insured_person_to_db(person)
+                my_db.add_person_policy_to_db(person_id, policy_id)
+        """
+        if getattr(self._local, 'unit_of_work', None) is not None:
+            yield self
+            return
+        with self._pool.connection() as connection:
+            with self._database_class(self._db_name, connection) as db:
+                with db.transaction():
+                    self._local.unit_of_work = db
+                    try:
+                        yield self
+                    finally:
+                        self._local.unit_of_work = None
+
+    def pool_stats(self):
+        """
+        Statistiky fondu spojení s databází.
+
+        Returns:
+            dict: Počet výpůjček, čekání a otevřených spojení.
+        """
+        return self._pool.stats()
+
+    def close(self):
+        """Uzavře všechna spojení s databází."""
+        self._pool.close()
+
     def create_tables(self):
         """Vytváří tabulky pro ukládání záznamů s údaji o pojištěncích a pojištění."""
-        db = DatabaseInsurances(self._db_name)
-        db.create_tables()
+        with self._database() as db:
+            db.create_tables()
+
+    @staticmethod
+    def _policy_row(policy):
+        """
+        Hodnoty pojištění v kanonickém tvaru pro uložení do databáze.
+
+        Data se ukládají jako text ve tvaru utils.DATE_FORMAT (řadí se správně i jako text),
+        částka jako číslo zaokrouhlené na haléře.
+
+        Returns:
+            tuple: (title, insured_amount, insured_object, start_date, end_date).
+        """
+        amount = policy.insured_amount
+        return (policy.title, float(amount) if isinstance(amount, Decimal) else amount, policy.insured_object,
+                format_date(policy.start_date), format_date(policy.end_date))
 
     def load_persons(self):
-        """Načte sbírky pojištěnců a pojištění z databáze do objektu Persons."""
-        db = DatabaseInsurances(self._db_name)
+        """
+        Načte sbírky pojištěnců a pojištění z databáze do objektu Persons.
 
-        persons = Persons()
+        Data se čtou třemi průchody (pojištění, pojištěnci, vztahy) bez ohledu na počet pojištěnců.
+        Každé pojištění se vytvoří jen jednou a sdílí ho všichni pojištěnci, kteří ho mají sjednané.
+        """
+        with self._database() as db:
+            policies_by_id = {}
+            for policy_id, title, insured_amount, insured_object, start_date, end_date in db.iter_all_insurance_policies():
+                policies_by_id[policy_id] = InsurancePolicy(title, insured_amount, insured_object, start_date, end_date)
 
-        insured_persons_data = db.fetch_all_insured_persons()
-        for row in insured_persons_data:
-            person_id, first_name, last_name, email, phone, street, city, postal_code = row
-            person = InsuredPerson(first_name, last_name, email, phone, street, city, postal_code)
+            persons = Persons()
+            for person_id, first_name, last_name, email, phone, street, city, postal_code in db.iter_all_insured_persons():
+                persons[person_id] = InsuredPerson(first_name, last_name, email, phone, street, city, postal_code)
 
-            policies = Policies()
-            policies_data = db.fetch_insurance_policies_by_person(person_id)
-            for policy_data in policies_data:
-                policy_id, title, insured_amount, insured_object, start_date, end_date = policy_data
-                policy = InsurancePolicy(title, insured_amount, insured_object, start_date, end_date)
-                policies[policy_id] = policy
-            
-            person.policies = policies
-            persons[person_id] = person
+            for person_id, policy_id in db.iter_all_person_insurance_policies():
+                person = persons[person_id]
+                # Vztahy bez existujícího pojištěnce nebo pojištění přeskočit
+                if person is not None and policy_id in policies_by_id:
+                    person.policies[policy_id] = policies_by_id[policy_id]
+
+            return persons
+
+    def load_persons_lazy(self, max_loaded=10000, preload_ids=True):
+        """
+        Vytvoří kolekci pojištěnců, která načítá pojištěnce z databáze až při prvním přístupu.
+
+        Args:
+            max_loaded (int): Maximální počet pojištěnců držených v paměti.
+            preload_ids (bool): Načíst předem identifikátory všech pojištěnců.
+
+        Returns:
+            LazyPersons: Kolekce pojištěnců.
+        """
+        return LazyPersons(self, max_loaded, self.insured_person_ids() if preload_ids else None)
+
+    def load_persons_snapshot(self):
+        """
+        Načte pojištěnce a jejich pojištění do kompaktního snímku jen pro čtení (uloženého po sloupcích).
+
+        Čte se stejnými třemi průchody jako load_persons, ale bez objektu na pojištěnce a vztah;
+        objekty se vytvářejí až při přístupu (viz SnapshotPersons).
+
+        Returns:
+            SnapshotPersons: Snímek pojištěnců.
+        """
+        with self._database() as db:
+            return SnapshotPersons.from_rows(db.iter_all_insurance_policies(), db.iter_all_insured_persons(),
+                                             db.iter_all_person_insurance_policies())
+
+    def load_person(self, person_id):
+        """
+        Načte pojištěnce i s jeho pojištěními (nové objekty, které nejsou sdílené s jinou kolekcí).
+
+        Args:
+            person_id (int): Identifikátor pojištěnce.
+
+        Returns:
+            InsuredPerson: pojištěnec nebo None.
+        """
+        with self._database() as db:
+            person_data = db.fetch_insured_person(person_id)
+            if not person_data:
+                return None
+            person = InsuredPerson(*person_data[:7])
+            for policy_id, title, insured_amount, insured_object, start_date, end_date in db.fetch_insurance_policies_by_person(person_id):
+                person.policies[policy_id] = InsurancePolicy(title, insured_amount, insured_object, start_date, end_date)
+            return person
+
+    def load_persons_by_ids(self, person_ids):
+        """
+        Načte pojištěnce i s jejich pojištěními dvěma dotazy (pro každou dávku BATCH_PARAMETERS ID).
+
+        Stejně jako load_person vytváří nové objekty, které nejsou sdílené s jinou kolekcí.
+
+        Args:
+            person_ids (Iterable[int]): Identifikátory pojištěnců.
+
+        Returns:
+            dict[int: InsuredPerson]: Nalezení pojištěnci podle ID (neexistující ID chybí).
+        """
+        person_ids = list(person_ids)
+        if not person_ids:
+            return {}
+        with self._database() as db:
+            persons = {row[0]: InsuredPerson(*row[1:]) for row in db.fetch_insured_persons_by_ids(person_ids)}
+            for person_id, policy_id, *policy_data in db.fetch_insurance_policies_by_persons(person_ids):
+                # Vztahy pojištěnce smazaného mezi dotazy přeskočit
+                if person_id in persons:
+                    persons[person_id].policies[policy_id] = InsurancePolicy(*policy_data)
+            return persons
+
+    def insured_person_ids(self):
+        """
+        Identifikátory všech pojištěnců.
+
+        Returns:
+            list[int]: Identifikátory seřazené podle ID.
+        """
+        with self._database() as db:
+            return [row[0] for row in db.iter_all_insured_person_ids()]
+
+    def _export_rows(self, query_name, batch_size, key=lambda row: row[0]):
+        """
+        Generátor, který postupně čte řádky tabulky po dávkách stránkovaných podle klíče (keyset).
+
+        Spojení s databází se vypůjčí jen na načtení jedné dávky a mezi dávkami se vrátí do fondu,
+        pomalý příjemce exportu tak neblokuje ostatní žádosti ani zápisy. Dávky se čtou
+        v samostatných transakcích: řádky změněné během exportu se mohou projevit jen v pozdějších dávkách.
+
+        Args:
+            query_name (str): Název metody DatabaseInsurances (after, limit) vracející dávku řádků.
+            batch_size (int): Počet řádků načtených najednou.
+            key (callable): Klíč řádku, za kterým začíná další dávka.
+        """
+        after = None
+        while True:
+            with self._database() as db:
+                rows = getattr(db, query_name)(after, batch_size)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = key(rows[-1])
+
+    def export_insured_persons(self, batch_size=1000):
+        """
+        Postupné čtení všech pojištěnců pro export.
+
+        Returns:
+            Iterator[tuple]: Pole (id, first_name, last_name, email, phone, street, city, postal_code).
+        """
+        return self._export_rows('fetch_insured_persons_after', batch_size)
+
+    def export_insurance_policies(self, batch_size=1000):
+        """
+        Postupné čtení všech pojištění pro export.
 
-        return persons
+        Returns:
+            Iterator[tuple]: Pole (id, title, insured_amount, insured_object, start_date, end_date).
+        """
+        return self._export_rows('fetch_insurance_policies_after', batch_size)
+
+    def export_person_policies(self, batch_size=1000):
+        """
+        Postupné čtení všech vztahů mezi pojištěnci a pojištěními pro export.
+
+        Returns:
+            Iterator[tuple]: Dvojice (person_id, policy_id).
+        """
+        return self._export_rows('fetch_person_insurance_policies_after', batch_size, key=lambda row: row)
 
     def add_insured_person_to_db(self, person):
         """
@@ -62,12 +277,12 @@ class DatabaseInterface():
         Returns:
             int: Identifikátor nového záznamu pojištěnce.
         """        
-        db = DatabaseInsurances(self._db_name)
-        person_id = db.insert_insured_person(
-            person.first_name, person.last_name, person.email, person.phone,
-            person.street, person.city, person.postal_code
-        )
-        return person_id
+        with self._database() as db:
+            person_id = db.insert_insured_person(
+                person.first_name, person.last_name, person.email, person.phone,
+                person.street, person.city, person.postal_code
+            )
+            return person_id
 
     def add_insurance_policy_to_db(self, policy):
         """
@@ -79,12 +294,40 @@ class DatabaseInterface():
         Returns:
             int: Identifikátor nového záznamu pojištění.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policy_id = db.insert_insurance_policy(
-            policy.title, policy.insured_amount, policy.insured_object,
-            policy.start_date, policy.end_date
-        )
-        return policy_id
+        with self._database() as db:
+            policy_id = db.insert_insurance_policy(*self._policy_row(policy))
+            return policy_id
+
+    def add_insured_persons_to_db(self, persons):
+        """
+        Hromadné přidání pojištěnců do databáze.
+
+        Args:
+            persons (list[InsuredPerson]): pojištěnci.
+
+        Returns:
+            list[int]: Identifikátory nových záznamů pojištěnců ve stejném pořadí.
+        """
+        with self._database() as db:
+            rows = db.insert_insured_persons([
+                (person.first_name, person.last_name, person.email, person.phone,
+                 person.street, person.city, person.postal_code)
+                for person in persons
+            ])
+            return [row[0] for row in rows]
+
+    def add_insurance_policies_to_db(self, policies):
+        """
+        Hromadné vytvoření pojištění v databázi.
+
+        Args:
+            policies (list[InsurancePolicy]): Pojištění.
+
+        Returns:
+            list[int]: Identifikátory nových záznamů pojištění ve stejném pořadí.
+        """
+        with self._database() as db:
+            return db.insert_insurance_policies([self._policy_row(policy) for policy in policies])
 
     def find_insured_person_by_id(self, person_id):
         """
@@ -96,13 +339,13 @@ class DatabaseInterface():
         Returns:
             InsuredPerson: pojištěnec nebo None.
         """        
-        db = DatabaseInsurances(self._db_name)
-        person_data = db.fetch_insured_person(person_id)
-        if person_data:
-            return InsuredPerson(
-                person_data[0], person_data[1], person_data[2],
-                person_data[3], person_data[4], person_data[5], person_data[6])
-        return None
+        with self._database() as db:
+            person_data = db.fetch_insured_person(person_id)
+            if person_data:
+                return InsuredPerson(
+                    person_data[0], person_data[1], person_data[2],
+                    person_data[3], person_data[4], person_data[5], person_data[6])
+            return None
 
     def find_insurance_policies_by_person_id(self, person_id):
         """
@@ -114,19 +357,32 @@ class DatabaseInterface():
         Returns:
             dict[int: InsurancePolicy]: Všechna Sjednaná pojištění pojištěncu.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policies_data = db.fetch_insurance_policies_by_person(person_id)
-        policies = {}
-        for policy_data in policies_data:
-            policy = InsurancePolicy(
-                title=policy_data[1],
-                insured_amount=policy_data[2],
-                insured_object=policy_data[3],
-                start_date=policy_data[4],
-                end_date=policy_data[5]
-            )
-            policies[policy_data[0]]=policy
-        return policies
+        with self._database() as db:
+            policies_data = db.fetch_insurance_policies_by_person(person_id)
+            policies = {}
+            for policy_data in policies_data:
+                policy = InsurancePolicy(
+                    title=policy_data[1],
+                    insured_amount=policy_data[2],
+                    insured_object=policy_data[3],
+                    start_date=policy_data[4],
+                    end_date=policy_data[5]
+                )
+                policies[policy_data[0]]=policy
+            return policies
+
+    def find_person_ids_by_policy_id(self, policy_id):
+        """
+        Získání pojištěnců, kteří mají sjednané dané pojištění.
+
+        Args:
+            policy_id (int, str): Identifikátor pojištění.
+
+        Returns:
+            list[int]: Identifikátory pojištěnců.
+        """
+        with self._database() as db:
+            return [row[0] for row in db.fetch_person_ids_by_policy(policy_id)]
 
     def find_insurance_policy_by_id(self, id):
         """
@@ -138,17 +394,17 @@ class DatabaseInterface():
         Returns:
             InsurancePolicy: Nalezené pojištění nebo None.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policy_data = db.fetch_insurance_policy_by_id(id)
-        if policy_data:
-            return InsurancePolicy(
-                title=policy_data[1],
-                insured_amount=policy_data[2],
-                insured_object=policy_data[3],
-                start_date=policy_data[4],
-                end_date=policy_data[5]
-            )
-        return None
+        with self._database() as db:
+            policy_data = db.fetch_insurance_policy_by_id(id)
+            if policy_data:
+                return InsurancePolicy(
+                    title=policy_data[1],
+                    insured_amount=policy_data[2],
+                    insured_object=policy_data[3],
+                    start_date=policy_data[4],
+                    end_date=policy_data[5]
+                )
+            return None
 
     def get_all_insured_persons(self):
         """
@@ -157,15 +413,15 @@ class DatabaseInterface():
         Returns:
             dict[int: InsuredPerson]: Všichni pojištěnci z databáze.
         """        
-        db = DatabaseInsurances(self._db_name)
-        persons_data = db.fetch_all_insured_persons()
-        persons = {}
-        for person_data in persons_data:
-            persons[person_data[0]]=InsuredPerson(
-                person_data[1], person_data[2], person_data[3],
-                person_data[4], person_data[5], person_data[6], person_data[7]
-            )
-        return persons
+        with self._database() as db:
+            persons_data = db.fetch_all_insured_persons()
+            persons = {}
+            for person_data in persons_data:
+                persons[person_data[0]]=InsuredPerson(
+                    person_data[1], person_data[2], person_data[3],
+                    person_data[4], person_data[5], person_data[6], person_data[7]
+                )
+            return persons
 
     def get_all_insurance_policies(self):
         """
@@ -174,19 +430,269 @@ class DatabaseInterface():
         Returns:
             dict[int: InsurancePolicy]: Všechna pojištění z databáze.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policies_data = db.fetch_all_insurance_policies()
-        policies = {}
-        for policy_data in policies_data:
-            policy = InsurancePolicy(
-                title=policy_data[1],
-                insured_amount=policy_data[2],
-                insured_object=policy_data[3],
-                start_date=policy_data[4],
-                end_date=policy_data[5]
-            )
-            policies[policy_data[0]]=(policy, policy_data[6])
-        return policies
+        with self._database() as db:
+            policies_data = db.fetch_all_insurance_policies()
+            policies = {}
+            for policy_data in policies_data:
+                policy = InsurancePolicy(
+                    title=policy_data[1],
+                    insured_amount=policy_data[2],
+                    insured_object=policy_data[3],
+                    start_date=policy_data[4],
+                    end_date=policy_data[5]
+                )
+                policies[policy_data[0]]=(policy, policy_data[6])
+            return policies
+
+    def get_insured_persons_page(self, page, per_page, after_id=None):
+        """
+        Získání jedné stránky pojištěných.
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce.
+            after_id (int): Identifikátor posledního pojištěnce předchozí stránky nebo None.
+
+        Returns:
+            tuple: dict[int: InsuredPerson] pojištěnci na stránce, celkový počet pojištěnců.
+        """
+        with self._database() as db:
+            persons_data, total = db.fetch_insured_persons_page(page, per_page, after_id)
+            persons = {}
+            for person_data in persons_data:
+                persons[person_data[0]]=InsuredPerson(
+                    person_data[1], person_data[2], person_data[3],
+                    person_data[4], person_data[5], person_data[6], person_data[7]
+                )
+            return persons, total
+
+    def get_insurance_policies_page(self, page, per_page, after_id=None):
+        """
+        Získání jedné stránky pojištění.
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce.
+            after_id (int): Identifikátor posledního pojištění předchozí stránky nebo None.
+
+        Returns:
+            tuple: dict[int: (InsurancePolicy, int)] pojištění na stránce s počtem pojištěnců,
+                celkový počet pojištění.
+        """
+        with self._database() as db:
+            policies_data, total = db.fetch_insurance_policies_page(page, per_page, after_id)
+            policies = {}
+            for policy_data in policies_data:
+                policy = InsurancePolicy(
+                    title=policy_data[1],
+                    insured_amount=policy_data[2],
+                    insured_object=policy_data[3],
+                    start_date=policy_data[4],
+                    end_date=policy_data[5]
+                )
+                policies[policy_data[0]]=(policy, policy_data[6])
+            return policies, total
+
+    def get_insurance_policies_filtered_page(self, page, per_page, **filters):
+        """
+        Získání jedné stránky pojištění vyhovujících filtrům (dotaz s indexy, bez filtrování v Pythonu).
+
+        Args:
+            page (int): Číslo stránky (od 1).
+            per_page (int): Počet řádků na stránce (-1 = všechny).
+            filters: Filtry active_on (datetime), start_to, end_from a end_to (datetime), amount_min
+                a amount_max (Decimal); filtr s hodnotou None se nepoužije.
+
+        Returns:
+            tuple: dict[int: (InsurancePolicy, int)] pojištění na stránce s počtem pojištěnců,
+                celkový počet vyhovujících pojištění.
+        """
+        parameters = {}
+        for name, value in filters.items():
+            if isinstance(value, datetime):
+                value = format_date(value)
+            elif isinstance(value, Decimal):
+                value = float(value)
+            parameters[name] = value
+
+        with self._database() as db:
+            policies_data, total = db.fetch_insurance_policies_filtered(page, per_page, **parameters)
+            policies = {}
+            for policy_id, title, insured_amount, insured_object, start_date, end_date, persons in policies_data:
+                policies[policy_id] = (InsurancePolicy(title, insured_amount, insured_object, start_date, end_date), persons)
+            return policies, total
+
+    def find_policies_active_on(self, date):
+        """
+        Pojištění platná v daném okamžiku.
+
+        Args:
+            date (datetime): Datum a čas.
+
+        Returns:
+            dict[int: InsurancePolicy]: Platná pojištění.
+        """
+        policies, _ = self.get_insurance_policies_filtered_page(1, -1, active_on=date)
+        return {policy_id: policy for policy_id, (policy, _) in policies.items()}
+
+    def find_policies_expiring_within(self, days, now=None):
+        """
+        Pojištění, jejichž platnost skončí během následujících days dní.
+
+        Args:
+            days (int): Počet dní.
+            now (datetime): Počátek období (výchozí aktuální čas).
+
+        Returns:
+            dict[int: InsurancePolicy]: Končící pojištění.
+        """
+        now = now or datetime.now()
+        policies, _ = self.get_insurance_policies_filtered_page(1, -1, end_from=now, end_to=now + timedelta(days=days))
+        return {policy_id: policy for policy_id, (policy, _) in policies.items()}
+
+    def find_policies_by_amount(self, amount_min=None, amount_max=None):
+        """
+        Pojištění s částkou v daném rozsahu (včetně mezí).
+
+        Args:
+            amount_min (Decimal): Nejmenší částka nebo None.
+            amount_max (Decimal): Největší částka nebo None.
+
+        Returns:
+            dict[int: InsurancePolicy]: Nalezená pojištění.
+        """
+        policies, _ = self.get_insurance_policies_filtered_page(1, -1, amount_min=amount_min, amount_max=amount_max)
+        return {policy_id: policy for policy_id, (policy, _) in policies.items()}
+
+    def search_insured_persons(self, text, page=1, per_page=10):
+        """
+        Fulltextové vyhledání pojištěnců podle jména, příjmení, e-mailu, telefonu nebo města.
+
+        Hledá se bez ohledu na diakritiku a velikost písmen, slova se porovnávají jako předpony.
+
+        Args:
+            text (str): Hledaný text.
+            page (int): Číslo stránky výsledků (od 1).
+            per_page (int): Počet výsledků na stránce.
+
+        Returns:
+            tuple: dict[int: InsuredPerson] nalezení pojištěnci seřazení podle relevance, celkový počet.
+        """
+        match = search_match_expression(text)
+        if match is None:
+            return {}, 0
+        with self._database() as db:
+            rows = db.search_insured_persons(match, per_page, max(page - 1, 0) * per_page)
+            total = db.count_insured_persons_matches(match)
+        return {row[0]: InsuredPerson(*row[1:]) for row in rows}, total
+
+    def search_insurance_policies(self, text, page=1, per_page=10):
+        """
+        Fulltextové vyhledání pojištění podle názvu nebo předmětu pojištění.
+
+        Args:
+            text (str): Hledaný text.
+            page (int): Číslo stránky výsledků (od 1).
+            per_page (int): Počet výsledků na stránce.
+
+        Returns:
+            tuple: dict[int: InsurancePolicy] nalezená pojištění seřazená podle relevance, celkový počet.
+        """
+        match = search_match_expression(text)
+        if match is None:
+            return {}, 0
+        with self._database() as db:
+            rows = db.search_insurance_policies(match, per_page, max(page - 1, 0) * per_page)
+            total = db.count_insurance_policies_matches(match)
+        return {row[0]: InsurancePolicy(*row[1:]) for row in rows}, total
+
+    def search_suggestions(self, text, limit=10):
+        """
+        Návrhy pro našeptávač: první nalezení pojištěnci a pojištění (bez řazení podle relevance
+        a bez celkového počtu, aby odpověď byla rychlá i pro krátké a časté předpony).
+
+        Args:
+            text (str): Hledaný text.
+            limit (int): Maximální počet návrhů každého druhu.
+
+        Returns:
+            list[dict]: Návrhy s klíči kind ('person' nebo 'policy'), id a label.
+        """
+        match = search_match_expression(text)
+        if match is None:
+            return []
+        with self._database() as db:
+            persons = db.search_insured_persons(match, limit, ranked=False)
+            policies = db.search_insurance_policies(match, limit, ranked=False)
+        suggestions = [{'kind': 'person', 'id': row[0], 'label': f"{row[1]} {row[2]}, {row[6]} ({row[3]})"}
+                       for row in persons]
+        suggestions += [{'kind': 'policy', 'id': row[0], 'label': row[1]} for row in policies]
+        return suggestions
+
+    def data_versions(self):
+        """
+        Verze dat tabulek pojištěnců, pojištění a vztahů (mění se při každém zápisu, i z jiného procesu).
+
+        Dotaz čte jen malou tabulku DataVersions, je tedy levnější než čtení samotných dat.
+
+        Returns:
+            dict[str: tuple]: Podle názvu (persons, policies, links) dvojice (verze, čas poslední změny v UTC).
+        """
+        with self._database() as db:
+            return {name: (version, datetime.fromisoformat(modified).replace(tzinfo=timezone.utc))
+                    for name, version, modified in db.fetch_data_versions()}
+
+    def portfolio_stats(self, today=None, top_cities=5):
+        """
+        Souhrnné statistiky portfolia z průběžně udržovaných tabulek statistik (konstantní doba dotazu).
+
+        Args:
+            today (date): Den, ke kterému se počítají platná a skončená pojištění (výchozí dnes).
+            top_cities (int): Počet měst s nejvíce pojištěnci.
+
+        Returns:
+            dict: Počty pojištěnců, pojištění a sjednaných pojištění, celková pojistná částka,
+                průměrný počet pojištění na pojištěnce, počty platných, skončených a budoucích
+                pojištění a města s nejvíce pojištěnci.
+        """
+        today = today or date.today()
+        with self._database() as db:
+            stats = db.fetch_portfolio_stats(today.isoformat(), top_cities)
+
+        persons = stats.get('persons', 0)
+        policies = stats.get('policies', 0)
+        links = stats.get('links', 0)
+        insured_with_policies = stats.get('insured_with_policies', 0)
+        return {
+            'as_of': today.isoformat(),
+            'persons': persons,
+            'policies': policies,
+            'links': links,
+            'insured_with_policies': insured_with_policies,
+            'total_amount': (Decimal(stats.get('total_amount_cents', 0)) / 100).quantize(Decimal('0.01')),
+            'policies_per_insured': round(links / persons, 2) if persons else 0.0,
+            'policies_per_insured_with_policies': round(links / insured_with_policies, 2) if insured_with_policies else 0.0,
+            'active_policies': stats['started'] - stats['expired'],
+            'expired_policies': stats['expired'],
+            'future_policies': policies - stats['started'],
+            'top_cities': [{'city': city, 'persons': count} for city, count in stats['top_cities']],
+        }
+
+    def check_portfolio_stats(self, rebuild=False):
+        """
+        Kontrola konzistence statistik portfolia s daty (prochází celé tabulky).
+
+        Args:
+            rebuild (bool): Přepočítat statistiky od začátku (i když jsou v pořádku).
+
+        Returns:
+            list[tuple]: Rozdíly nalezené před přepočtem, viz DatabaseInsurances.portfolio_stats_differences.
+        """
+        with self._database() as db:
+            differences = db.portfolio_stats_differences()
+            if rebuild:
+                db.rebuild_portfolio_stats()
+            return differences
 
     def get_all_unused_insurance_policies(self):
         """
@@ -195,19 +701,19 @@ class DatabaseInterface():
         Returns:
             dict[int: InsurancePolicy]: Všechna bezplatná pojištění z databáze.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policies_data = db.fetch_all_unused_insurance_policies()
-        policies = {}
-        for policy_data in policies_data:
-            policy = InsurancePolicy(
-                title=policy_data[1],
-                insured_amount=policy_data[2],
-                insured_object=policy_data[3],
-                start_date=policy_data[4],
-                end_date=policy_data[5]
-            )
-            policies[policy_data[0]]=policy
-        return policies
+        with self._database() as db:
+            policies_data = db.fetch_all_unused_insurance_policies()
+            policies = {}
+            for policy_data in policies_data:
+                policy = InsurancePolicy(
+                    title=policy_data[1],
+                    insured_amount=policy_data[2],
+                    insured_object=policy_data[3],
+                    start_date=policy_data[4],
+                    end_date=policy_data[5]
+                )
+                policies[policy_data[0]]=policy
+            return policies
 
     def update_insured_person_in_db(self, person_id, person):
         """
@@ -217,11 +723,11 @@ class DatabaseInterface():
         person_id (int): Identifikátor pojištěnce.
         person (InsuredPerson): pojištěnec.
         """        
-        db = DatabaseInsurances(self._db_name)
-        db.update_insured_person(
-            person_id, person.first_name, person.last_name, person.email,
-            person.phone, person.street, person.city, person.postal_code
-        )
+        with self._database() as db:
+            db.update_insured_person(
+                person_id, person.first_name, person.last_name, person.email,
+                person.phone, person.street, person.city, person.postal_code
+            )
 
     def update_insurance_policy_in_db(self, policy_id, policy):
         """
@@ -231,11 +737,96 @@ class DatabaseInterface():
         policy_id (int): Identifikátor pojištění.
         policy (InsurancePolicy): Pojištění.
         """        
-        db = DatabaseInsurances(self._db_name)
-        db.update_insurance_policy(
-            policy_id, policy.title, policy.insured_amount, policy.insured_object,
-            policy.start_date, policy.end_date
-        )
+        with self._database() as db:
+            db.update_insurance_policy(policy_id, *self._policy_row(policy))
+
+    def delete_insured_person_from_db(self, person_id):
+        """
+        Odstranění pojištěnce z databáze.
+
+        Args:
+            person_id (int): Identifikátor pojištěnce.
+        """
+        with self._database() as db:
+            db.delete_insured_person(person_id)
+
+    def delete_insurance_policy_from_db(self, policy_id):
+        """
+        Odstranění pojištění z databáze.
+
+        Args:
+            policy_id (int): Identifikátor pojištění.
+        """
+        with self._database() as db:
+            db.delete_insurance_policy(policy_id)
+
+    def add_person_policy_to_db(self, person_id, policy_id):
+        """
+        Spojení pojištění s pojištěncem v databázi.
+
+        Args:
+            person_id (int): Identifikátor pojištěnce.
+            policy_id (int): Identifikátor pojištění.
+        """
+        with self._database() as db:
+            db.insert_person_insurance_policy(person_id, policy_id)
+
+    def delete_person_policy_from_db(self, person_id, policy_id):
+        """
+        Odpojení pojištění od pojištěnce v databázi.
+
+        Args:
+            person_id (int): Identifikátor pojištěnce.
+            policy_id (int): Identifikátor pojištění.
+        """
+        with self._database() as db:
+            db.delete_person_insurance_policy(person_id, policy_id)
+
+    def add_person_policies_to_db(self, links):
+        """
+        Hromadné spojení pojištění s pojištěnci v databázi (existující vztahy se přeskočí).
+
+        Args:
+            links (list[tuple]): Dvojice (person_id, policy_id).
+
+        Returns:
+            int: Počet nových vztahů.
+        """
+        with self._database() as db:
+            return db.insert_person_insurance_policies(links)
+
+    def delete_person_policies_from_db(self, links):
+        """
+        Hromadné odpojení pojištění od pojištěnců v databázi.
+
+        Args:
+            links (list[tuple]): Dvojice (person_id, policy_id).
+
+        Returns:
+            int: Počet odstraněných vztahů.
+        """
+        with self._database() as db:
+            return db.delete_person_insurance_policies(links)
+
+    def insured_persons_count(self):
+        """
+        Počet pojištěnců v databázi.
+
+        Returns:
+            int: Celkový počet pojištěnců.
+        """
+        with self._database() as db:
+            return db.insured_persons_count()[0]
+
+    def insurance_policies_count(self):
+        """
+        Počet pojištění v databázi.
+
+        Returns:
+            int: Celkový počet pojištění.
+        """
+        with self._database() as db:
+            return db.insurance_policies_count()[0]
 
     def is_person_exists(self, person):
         """
@@ -247,9 +838,36 @@ class DatabaseInterface():
         Returns:
             int: Počet nalezených pojištěnců.
         """        
-        db = DatabaseInsurances(self._db_name)
-        persons_count = db.insured_person_exist(person.first_name, person.last_name, person.email)
-        return persons_count[0]
+        with self._database() as db:
+            persons_count = db.insured_person_exist(person.first_name, person.last_name, person.email)
+            return persons_count[0]
+
+    def existing_insured_persons(self, persons):
+        """
+        Hromadně ověřuje, kteří pojištěnci (jméno, příjmení, e-mail) již v databázi existují.
+
+        Args:
+            persons (list[InsuredPerson]): pojištěnci.
+
+        Returns:
+            set[tuple]: Trojice (first_name, last_name, email) existujících pojištěnců.
+        """
+        with self._database() as db:
+            return db.find_existing_insured_persons(
+                [(person.first_name, person.last_name, person.email) for person in persons])
+
+    def existing_policy_titles(self, titles):
+        """
+        Hromadně ověřuje, které názvy pojištění již v databázi existují.
+
+        Args:
+            titles (list[str]): Názvy pojištění.
+
+        Returns:
+            set[str]: Existující názvy pojištění.
+        """
+        with self._database() as db:
+            return db.find_existing_policy_titles(titles)
 
     def is_policy_title_unique(self, title, policy_id):
         """
@@ -262,12 +880,12 @@ class DatabaseInterface():
         Returns:
             bool: True pokud existuje, jinak False.
         """        
-        db = DatabaseInsurances(self._db_name)
-        found_ids = db.find_insurance_policy_id_by_name(title)
-        for id in found_ids:
-            if int(policy_id) != id[0]:
-                return False
-        return True
+        with self._database() as db:
+            found_ids = db.find_insurance_policy_id_by_name(title)
+            for id in found_ids:
+                if int(policy_id) != id[0]:
+                    return False
+            return True
 
     def is_policy_title_exist(self, title):
         """
@@ -279,6 +897,6 @@ class DatabaseInterface():
         Returns:
             int: Počet nalezených pojištění.
         """        
-        db = DatabaseInsurances(self._db_name)
-        policies_count = db.find_insurance_policy_by_name(title)[0]
-        return policies_count>0
+        with self._database() as db:
+            policies_count = db.find_insurance_policy_by_name(title)[0]
+            return policies_count>0
@@ -0,0 +1,192 @@
+import sys
+import threading
+from itertools import islice
+
+from persons import Persons, _deep_sizeof
+
+class LazyPersons(Persons):
+    """
+    Kolekce pojištěnců s načítáním z databáze až při prvním přístupu.
+
+    Identifikátory pojištěnců mohou být známé předem (ids), jinak se existence pojištěnce
+    ověřuje v databázi. Pojištěnec se i s kolekcí pojištění načte při prvním přístupu
+    a v paměti se drží nejvýše max_loaded pojištěnců; nejdéle nepoužití se uvolní
+    (po uvolnění se při dalším přístupu znovu načtou z databáze).
+
+    Index pojištění -> pojištěnci (viz Persons) pokrývá jen pojištěnce načtené v paměti.
+
+    Attributes:
+        my_db (DatabaseInterface): Rozhraní do databáze.
+        max_loaded (int): Maximální počet pojištěnců v paměti.
+    """
+
+    def __init__(self, my_db, max_loaded=10000, ids=None):
+        """
+        Konstruktor třídy LazyPersons.
+
+        Args:
+            my_db (DatabaseInterface): Rozhraní do databáze.
+            max_loaded (int): Maximální počet pojištěnců v paměti.
+            ids (Iterable[int]): Identifikátory všech pojištěnců nebo None (nejsou známé předem).
+        """
+        super().__init__()
+        self.my_db = my_db
+        self.max_loaded = max_loaded
+        self._ids = set(ids) if ids is not None else None
+        self._lock = threading.RLock()
+        self._faults = 0
+        self._evictions = 0
+
+    def _load(self, _id):
+        """Načte pojištěnce z databáze do paměti, případně uvolní nejdéle nepoužité pojištěnce."""
+        person = self.my_db.load_person(_id)
+        self._faults += 1
+        if person is None:
+            return None
+        super().__setitem__(_id, person)
+        self._evict()
+        return person
+
+    def _evict(self):
+        while len(self._persons) > self.max_loaded:
+            oldest = next(iter(self._persons))
+            super().__delitem__(oldest)
+            self._evictions += 1
+
+    # Přidání pojištěnce
+    def __setitem__(self, _id, person):
+        with self._lock:
+            super().__setitem__(_id, person)
+            # Přesunout na konec pořadí použití
+            self._persons[_id] = self._persons.pop(_id)
+            if self._ids is not None:
+                self._ids.add(_id)
+            self._evict()
+
+    # Získání pojištěnce podle identifikátoru _id (při prvním přístupu se načte z databáze)
+    def __getitem__(self, _id):
+        with self._lock:
+            person = self._persons.pop(_id, None)
+            if person is not None:
+                self._persons[_id] = person
+                return person
+            if self._ids is not None and _id not in self._ids:
+                return None
+            return self._load(_id)
+
+    # Odstranění pojištěnce podle identifikátoru _id
+    def __delitem__(self, _id):
+        with self._lock:
+            if self._ids is not None:
+                if _id not in self._ids:
+                    raise KeyError(f"Person with ID {_id} does not exist.")
+                self._ids.discard(_id)
+            if _id in self._persons:
+                super().__delitem__(_id)
+
+    # Kontrola přítomnosti pojištěnce podle identifikátoru _id
+    def __contains__(self, _id):
+        _id = int(_id)
+        if self._ids is not None:
+            return _id in self._ids
+        return self[_id] is not None
+
+    # Magická metoda pro získání množství
+    def __len__(self):
+        if self._ids is not None:
+            return len(self._ids)
+        return self.my_db.insured_persons_count()
+
+    # Magická metoda pro iteraci (pojištěnci se postupně načítají z databáze)
+    def __iter__(self):
+        for _id in self.ids():
+            person = self[_id]
+            if person is not None:
+                yield _id, person
+
+    def ids(self):
+        """
+        Snímek identifikátorů pojištěnců (bezpečný pro iteraci během změn kolekce).
+
+        Returns:
+            list[int]: Identifikátory pojištěnců seřazené podle ID.
+        """
+        if self._ids is not None:
+            with self._lock:
+                return sorted(self._ids)
+        return self.my_db.insured_person_ids()
+
+    def preload(self, ids):
+        """
+        Načte do paměti pojištěnce s danými ID, kteří v ní ještě nejsou, hromadně dvěma dotazy
+        (DatabaseInterface.load_persons_by_ids) místo dvou dotazů na pojištěnce při přístupu.
+
+        Args:
+            ids (Iterable[int]): Identifikátory pojištěnců, např. jedné stránky výpisu.
+        """
+        with self._lock:
+            missing = [_id for _id in ids
+                       if _id not in self._persons and (self._ids is None or _id in self._ids)]
+            if not missing:
+                return
+            self._faults += len(missing)
+            for _id, person in self.my_db.load_persons_by_ids(missing).items():
+                super().__setitem__(_id, person)
+            self._evict()
+
+    def loaded_ids(self):
+        """
+        Identifikátory pojištěnců načtených v paměti.
+
+        Returns:
+            list[int]: Identifikátory od nejdéle nepoužitého.
+        """
+        with self._lock:
+            return list(self._persons)
+
+    def unload(self):
+        """Uvolní z paměti všechny načtené pojištěnce (při dalším přístupu se znovu načtou z databáze)."""
+        with self._lock:
+            for _id in list(self._persons):
+                super().__delitem__(_id)
+
+    def replace_policy(self, policy_id, policy):
+        with self._lock:
+            super().replace_policy(policy_id, policy)
+
+    def delete_policy(self, policy_id):
+        with self._lock:
+            super().delete_policy(policy_id)
+
+    def summary(self, sample_size=1000):
+        """
+        Souhrn velikosti kolekce.
+
+        Vztahy, různá pojištění a odhad paměti se počítají jen z pojištěnců načtených v paměti.
+
+        Args:
+            sample_size (int): Počet pojištěnců pro odhad paměti.
+
+        Returns:
+            dict: Počet pojištěnců, načtených pojištěnců, vztahů a různých pojištění,
+                odhad paměti v bajtech a počet načtení a uvolnění pojištěnců.
+        """
+        with self._lock:
+            links = sum(len(persons) for persons in self._holders.values())
+            sample = list(islice(self._persons.values(), sample_size))
+            sample_bytes = _deep_sizeof(sample, exclude=(self._holders,)) - sys.getsizeof(sample)
+            estimated_bytes = sys.getsizeof(self._persons) + _deep_sizeof(self._holders)
+            if sample:
+                estimated_bytes += sample_bytes * len(self._persons) // len(sample)
+            if self._ids is not None:
+                estimated_bytes += _deep_sizeof(self._ids)
+
+            return {
+                'persons': len(self),
+                'loaded': len(self._persons),
+                'links': links,
+                'policies': len(self._holders),
+                'estimated_bytes': estimated_bytes,
+                'faults': self._faults,
+                'evictions': self._evictions,
+            }
@@ -1,10 +1,9 @@
-from interface_to_db import DatabaseInterface
-from flask_interface import FlaskInterface
+from wsgi import create_app
 
 
 if __name__ == '__main__':
-    my_db = DatabaseInterface('insurance.db')
-    my_db.create_tables()
-    persons = my_db.load_persons()
-    web_interface = FlaskInterface(my_db, persons)
+    # Vývojový server v jednom procesu (konfigurace viz wsgi.DEFAULT_CONFIG, provozní server viz serve.py)
+    app = create_app({'WORKERS': 1})
+    web_interface = app.extensions['insurance']
     web_interface.start()
+    web_interface.my_db.close()
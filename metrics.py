@@ -0,0 +1,422 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import Response, request, before_render_template, template_rendered
+
+from database import DatabaseInsurances
+
+# Hranice histogramů dob v sekundách (dotaz do databáze, celá žádost)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metody DatabaseInsurances, které se neměří (nejsou to dotazy)
+_NOT_MEASURED = {'close', 'transaction'}
+
+# Záznamy o pomalých dotazech a žádostech (úroveň WARNING)
+slow_log = logging.getLogger('insurance.slow')
+
+# Měření právě obsluhované žádosti (přenáší se i do vláken AsyncDatabaseInterface)
+_current_request = contextvars.ContextVar('insurance_request_timing', default=None)
+
+
+def _row_count(result, cursor):
+    """
+    Počet řádků, které dotaz vrátil nebo změnil.
+
+    Returns:
+        int: Počet řádků nebo None, pokud ho nelze zjistit (např. kurzor iter_*, který se čte až později).
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        # Stránky tabulek vrací (řádky, celkový počet)
+        return len(result[0]) if result and isinstance(result[0], list) else 1
+    rowcount = cursor.rowcount if cursor is not None else -1
+    if rowcount >= 0:
+        return rowcount
+    return 0 if result is None else None
+
+
+class _Series:
+    """Počet, součet dob, řádky a histogram pro jednu kombinaci štítků."""
+
+    __slots__ = ('count', 'seconds', 'rows', 'slow', 'buckets', 'queries', 'db_seconds', 'render_seconds')
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.buckets = [0] * (bucket_count + 1)
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+class RequestTiming:
+    """
+    Součty jedné žádosti: počet dotazů, doba v databázi a v šablonách, dotazy podle metod.
+
+    Dotazy asynchronního pohledu běží souběžně v několika vláknech, součty proto chrání zámek.
+
+    Attributes:
+        label (str): Popis žádosti pro záznam pomalých dotazů (např. 'GET /policies?page=2').
+        start (float): Začátek žádosti (time.perf_counter).
+        queries (int): Počet dotazů do databáze.
+        db_time (float): Součet dob dotazů v sekundách (souběžné dotazy se sčítají).
+        render_time (float): Doba vykreslování šablon v sekundách.
+        methods (dict): {metoda DatabaseInsurances: [počet, doba]}.
+    """
+
+    __slots__ = ('label', 'start', 'queries', 'db_time', 'render_time', 'methods', '_render_start', '_lock')
+
+    def __init__(self, label=None):
+        """Konstruktor třídy RequestTiming"""
+        self.label = label
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.methods = {}
+        self._render_start = None
+        self._lock = threading.Lock()
+
+    def add_query(self, method, duration):
+        with self._lock:
+            self.queries += 1
+            self.db_time += duration
+            totals = self.methods.get(method)
+            if totals is None:
+                self.methods[method] = [1, duration]
+            else:
+                totals[0] += 1
+                totals[1] += duration
+
+    @property
+    def elapsed(self):
+        """Doba od začátku žádosti v sekundách."""
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total):
+        """
+        Hodnota hlavičky Server-Timing: databáze, šablony, zbytek aplikace (objekty, stránkování) a celkem.
+
+        Args:
+            total (float): Celková doba žádosti v sekundách.
+        """
+        app_time = max(total - self.db_time - self.render_time, 0.0)
+        return (f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+                f'render;dur={self.render_time * 1000:.2f}, app;dur={app_time * 1000:.2f}, '
+                f'total;dur={total * 1000:.2f}')
+
+
+def current_request_timing():
+    """
+    Měření právě obsluhované žádosti.
+
+    Returns:
+        RequestTiming: Měření nebo None mimo žádost (nebo bez zapnutého měření).
+    """
+    return _current_request.get()
+
+
+class Metrics:
+    """
+    Měření dotazů do databáze a žádostí aplikace.
+
+    Každá veřejná metoda DatabaseInsurances (dotaz) se měří: počet volání, doba, počet vrácených
+    nebo změněných řádků, vše podle názvu metody. Žádosti se měří podle koncového bodu (endpoint)
+    a stavového kódu, včetně součtů dotazů, doby v databázi a v šablonách.
+
+    Měření stojí dvě volání time.perf_counter a jeden krátký zámek na dotaz, lze ho tedy nechat
+    zapnuté i v provozu. Dotazy a žádosti delší než nastavené hranice se zapisují do záznamu 'insurance.slow'.
+
+    Každý proces serveru měří sám za sebe (při více pracovních procesech vrací /metrics
+    hodnoty toho procesu, který žádost obsloužil).
+
+    Attributes:
+        slow_query_ms (float): Hranice pomalého dotazu v ms (None = nezaznamenávat).
+        slow_request_ms (float): Hranice pomalé žádosti v ms (None = nezaznamenávat).
+    """
+
+    def __init__(self, slow_query_ms=None, slow_request_ms=None):
+        """Konstruktor třídy Metrics"""
+        self.slow_query_ms = slow_query_ms
+        self.slow_request_ms = slow_request_ms
+        self._slow_query = slow_query_ms / 1000 if slow_query_ms is not None else None
+        self._slow_request = slow_request_ms / 1000 if slow_request_ms is not None else None
+        self._queries = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._database_class = None
+
+    @property
+    def database_class(self):
+        """Podtřída DatabaseInsurances, jejíž dotazy se měří do tohoto objektu."""
+        if self._database_class is None:
+            namespace = {}
+            for name, function in vars(DatabaseInsurances).items():
+                if callable(function) and not name.startswith('_') and name not in _NOT_MEASURED:
+                    namespace[name] = self._measured(name, function)
+            self._database_class = type('MeasuredDatabaseInsurances', (DatabaseInsurances,), namespace)
+        return self._database_class
+
+    def _measured(self, name, function):
+        """Obalí metodu DatabaseInsurances měřením."""
+        @wraps(function)
+        def measured(db, *args, **kwargs):
+            result = None
+            start = time.perf_counter()
+            try:
+                result = function(db, *args, **kwargs)
+                return result
+            finally:
+                self.record_query(name, time.perf_counter() - start, _row_count(result, db.cursor))
+        return measured
+
+    def record_query(self, method, duration, rows=None):
+        """
+        Zaznamená jeden dotaz.
+
+        Args:
+            method (str): Název metody DatabaseInsurances.
+            duration (float): Doba v sekundách.
+            rows (int): Počet vrácených nebo změněných řádků (None = neznámý).
+        """
+        slow = self._slow_query is not None and duration >= self._slow_query
+        bucket = bisect.bisect_left(QUERY_BUCKETS, duration)
+        with self._lock:
+            series = self._queries.get(method)
+            if series is None:
+                series = self._queries[method] = _Series(len(QUERY_BUCKETS))
+            series.count += 1
+            series.seconds += duration
+            series.buckets[bucket] += 1
+            if rows:
+                series.rows += rows
+            if slow:
+                series.slow += 1
+
+        timing = _current_request.get()
+        if timing is not None:
+            timing.add_query(method, duration)
+        if slow:
+            slow_log.warning("Slow query %s: %.1f ms, rows: %s, request: %s", method, duration * 1000, rows,
+                             timing.label if timing is not None else None)
+
+    def start_request(self, label=None):
+        """
+        Začne měřit žádost v aktuálním kontextu.
+
+        Args:
+            label (str): Popis žádosti pro záznam pomalých dotazů a žádostí.
+
+        Returns:
+            tuple: (RequestTiming, token pro finish_request).
+        """
+        timing = RequestTiming(label)
+        return timing, _current_request.set(timing)
+
+    def finish_request(self, timing, token, endpoint, status):
+        """
+        Ukončí měření žádosti a zaznamená její součty.
+
+        Args:
+            timing (RequestTiming): Měření ze start_request.
+            token: Token ze start_request.
+            endpoint (str): Koncový bod žádosti.
+            status (int): Stavový kód odpovědi.
+
+        Returns:
+            float: Celková doba žádosti v sekundách.
+        """
+        total = timing.elapsed
+        _current_request.reset(token)
+        slow = self._slow_request is not None and total >= self._slow_request
+        bucket = bisect.bisect_left(REQUEST_BUCKETS, total)
+        with self._lock:
+            series = self._requests.get((endpoint, status))
+            if series is None:
+                series = self._requests[(endpoint, status)] = _Series(len(REQUEST_BUCKETS))
+            series.count += 1
+            series.seconds += total
+            series.buckets[bucket] += 1
+            series.queries += timing.queries
+            series.db_seconds += timing.db_time
+            series.render_seconds += timing.render_time
+            if slow:
+                series.slow += 1
+        if slow:
+            methods = ', '.join(f'{method} {count}x {seconds * 1000:.1f} ms' for method, (count, seconds)
+                                in sorted(timing.methods.items(), key=lambda item: -item[1][1]))
+            slow_log.warning("Slow request %s (%s): %.1f ms, db %.1f ms in %d queries, render %.1f ms [%s]",
+                             timing.label, endpoint, total * 1000, timing.db_time * 1000,
+                             timing.queries, timing.render_time * 1000, methods)
+        return total
+
+    def query_stats(self):
+        """
+        Souhrn dotazů podle metod.
+
+        Returns:
+            dict: {metoda: {'count', 'seconds', 'rows', 'slow'}}.
+        """
+        with self._lock:
+            return {method: {'count': series.count, 'seconds': series.seconds, 'rows': series.rows,
+                             'slow': series.slow}
+                    for method, series in self._queries.items()}
+
+    def request_stats(self):
+        """
+        Souhrn žádostí podle koncového bodu a stavového kódu.
+
+        Returns:
+            dict: {(endpoint, status): {'count', 'seconds', 'queries', 'db_seconds', 'render_seconds', 'slow'}}.
+        """
+        with self._lock:
+            return {key: {'count': series.count, 'seconds': series.seconds, 'queries': series.queries,
+                          'db_seconds': series.db_seconds, 'render_seconds': series.render_seconds,
+                          'slow': series.slow}
+                    for key, series in self._requests.items()}
+
+    def prometheus(self, my_db=None):
+        """
+        Měření v textovém formátu Prometheus.
+
+        Args:
+            my_db (DatabaseInterface): Rozhraní do databáze, jehož fond spojení (a cache) se přidá.
+
+        Returns:
+            str: Text pro /metrics.
+        """
+        with self._lock:
+            queries = sorted(self._queries.items())
+            requests = sorted(self._requests.items())
+            lines = []
+            _family(lines, 'insurance_db_queries_total', 'counter', 'Database queries by DatabaseInsurances method.',
+                    [({'method': method}, series.count) for method, series in queries])
+            _family(lines, 'insurance_db_query_rows_total', 'counter', 'Rows returned or changed by database queries.',
+                    [({'method': method}, series.rows) for method, series in queries])
+            _family(lines, 'insurance_db_slow_queries_total', 'counter', 'Database queries over the slow query threshold.',
+                    [({'method': method}, series.slow) for method, series in queries])
+            _histogram(lines, 'insurance_db_query_seconds', 'Database query duration.', QUERY_BUCKETS,
+                       [({'method': method}, series) for method, series in queries])
+
+            labels = lambda endpoint, status: {'endpoint': endpoint, 'status': str(status)}
+            _family(lines, 'insurance_http_request_queries_total', 'counter', 'Database queries made by requests.',
+                    [(labels(*key), series.queries) for key, series in requests])
+            _family(lines, 'insurance_http_request_db_seconds_total', 'counter', 'Time requests spent in database queries.',
+                    [(labels(*key), series.db_seconds) for key, series in requests])
+            _family(lines, 'insurance_http_request_render_seconds_total', 'counter', 'Time requests spent rendering templates.',
+                    [(labels(*key), series.render_seconds) for key, series in requests])
+            _family(lines, 'insurance_http_slow_requests_total', 'counter', 'Requests over the slow request threshold.',
+                    [(labels(*key), series.slow) for key, series in requests])
+            _histogram(lines, 'insurance_http_request_seconds', 'Request duration.', REQUEST_BUCKETS,
+                       [(labels(*key), series) for key, series in requests])
+
+        if my_db is not None:
+            pool = my_db.pool_stats()
+            _family(lines, 'insurance_db_pool_checkouts_total', 'counter', 'Connections borrowed from the pool.',
+                    [({}, pool['checkouts'])])
+            _family(lines, 'insurance_db_pool_waits_total', 'counter', 'Waits for a free pooled connection.',
+                    [({}, pool['waits'])])
+            _family(lines, 'insurance_db_pool_open_connections', 'gauge', 'Open pooled connections.',
+                    [({}, pool['open_connections'])])
+            if hasattr(my_db, 'cache_stats'):
+                cache = my_db.cache_stats()
+                for name in ('hits', 'misses', 'evictions', 'invalidations'):
+                    _family(lines, f'insurance_cache_{name}_total', 'counter', f'Read cache {name}.',
+                            [({}, cache[name])])
+                _family(lines, 'insurance_cache_size', 'gauge', 'Read cache entries.', [({}, cache['size'])])
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _family(lines, name, kind, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for labels, value in samples:
+        lines.append(f'{name}{_labels(labels)} {value}')
+
+
+def _histogram(lines, name, help_text, bounds, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, series in samples:
+        cumulative = 0
+        for bound, count in zip(bounds + ('+Inf',), series.buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels({**labels, "le": str(bound)})} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {series.seconds}')
+        lines.append(f'{name}_count{_labels(labels)} {series.count}')
+
+
+class RequestMetrics:
+    """
+    Měření žádostí aplikace Flask: hlavička Server-Timing, koncový bod /metrics a záznam pomalých žádostí.
+
+    Registruje se v aplikaci podobně jako http_cache.StaticFingerprints.
+    """
+
+    def __init__(self, app, metrics, my_db=None, path='/metrics'):
+        """
+        Konstruktor třídy RequestMetrics. Registruje se v aplikaci Flask.
+
+        Args:
+            app (Flask): Aplikace.
+            metrics (Metrics): Měření, do kterého se žádosti zaznamenávají.
+            my_db (DatabaseInterface): Rozhraní do databáze pro statistiky fondu spojení a cache.
+            path (str): Cesta koncového bodu ve formátu Prometheus.
+        """
+        self.metrics = metrics
+        self.my_db = my_db
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        app.add_url_rule(path, endpoint='metrics', view_func=self.prometheus, methods=['GET'])
+
+    def prometheus(self):
+        """Měření ve formátu Prometheus"""
+        return Response(self.metrics.prometheus(self.my_db), mimetype='text/plain; version=0.0.4')
+
+    def _start(self):
+        label = f'{request.method} {request.full_path.rstrip("?")}'
+        request.environ['insurance.timing'] = self.metrics.start_request(label)
+
+    def _finish(self, response):
+        started = request.environ.pop('insurance.timing', None)
+        if started is None:
+            return response
+        timing, token = started
+        total = self.metrics.finish_request(timing, token, request.endpoint or 'unknown', response.status_code)
+        response.headers['Server-Timing'] = timing.server_timing(total)
+        return response
+
+    def _teardown(self, exception):
+        # Neošetřená výjimka: after_request se nevolá, žádost se zaznamená jako chyba 500
+        started = request.environ.pop('insurance.timing', None)
+        if started is not None:
+            self.metrics.finish_request(*started, request.endpoint or 'unknown', 500)
+
+    def _render_started(self, sender, **extra):
+        timing = _current_request.get()
+        if timing is not None:
+            timing._render_start = time.perf_counter()
+
+    def _render_finished(self, sender, **extra):
+        timing = _current_request.get()
+        if timing is not None and timing._render_start is not None:
+            timing.render_time += time.perf_counter() - timing._render_start
+            timing._render_start = None
@@ -13,6 +13,10 @@ class Person:
         postal_code (str): PSČ.
     """
 
+    # Kolekce Persons drží v paměti objekt pro každého pojištěnce, bez slovníku __dict__ je každý menší;
+    # InsuredPerson přidává vlastní sloty pro kolekci pojištění
+    __slots__ = ('_first_name', '_last_name', '_email', '_phone', '_street', '_city', '_postal_code')
+
     def __init__(self, first_name, last_name, email, phone, street, city, postal_code):
         """Konstruktor třídy Person"""
         self._first_name = first_name
@@ -82,28 +86,49 @@ class Person:
     def postal_code(self, value):
         self._postal_code = value
 
-    def check_valid_data(self):
+    # Kontroly atributů v pořadí hlášení chyb: (kód chyby, atributy, funkce kontroly, text chyby)
+    CHECKS = (
+        ('first_name', ('first_name',), Check.filled, "Jméno není vyplněno"),
+        ('last_name', ('last_name',), Check.filled, "Příjmení není vyplněno"),
+        ('email', ('email',), Check.email, "E-mailová adresa není vyplněna nebo neodpovídá formátu"),
+        ('phone', ('phone',), Check.phone, "Telefon není vyplněn nebo neodpovídá formátu"),
+        ('street', ('street',), Check.filled, "Ulice a číslo popisné nejsou vyplněny"),
+        ('city', ('city',), Check.filled, "Město není vyplněno"),
+        ('postal_code', ('postal_code',), Check.postal_code, "PSČ není vyplněno nebo obsahuje neplatné znaky."),
+    )
+    _COMPILED_CHECKS = Check.compile(CHECKS)
+
+    def check_valid_data(self, all_errors=False):
         """
         Zkontroluje, zda jsou všechny jeho atributy správné.
 
+        Args:
+            all_errors (bool): Vrátit seznam všech chyb, ne jen první.
+
         Returns:
             str: Text popisující chybu nebo prázdný řádek, pokud jsou všechny hodnoty správně vyplněny.
+                V režimu all_errors seznam textů všech chyb (prázdný, pokud chyby nejsou).
+        """
+        return Check.errors(self, self._COMPILED_CHECKS, all_errors)
+
+    @classmethod
+    def check_columns(cls, columns, all_errors=False):
+        """
+        Zkontroluje sloupce hodnot atributů mnoha pojištěnců najednou (viz Check.batch).
+
+        Args:
+            columns (dict[str: list]): Sloupce hodnot podle názvu atributu.
+            all_errors (bool): Vracet všechny chyby řádku, ne jen první.
+
+        Returns:
+            list: Pro každý řádek None, kód první chyby nebo n-tice kódů chyb.
         """
-        result = ""
-
-        if len(self._first_name.strip()) == 0:
-            result="Jméno není vyplněno"
-        elif len(self._last_name.strip()) == 0:
-            result="Příjmení není vyplněno"
-        elif not Check.email(self._email):
-            result="E-mailová adresa není vyplněna nebo neodpovídá formátu"
-        elif not Check.phone(self._phone):
-            result="Telefon není vyplněn nebo neodpovídá formátu"
-        elif len(self._street.strip()) == 0:
-            result="Ulice a číslo popisné nejsou vyplněny"
-        elif len(self._city.strip()) == 0:
-            result="Město není vyplněno"
-        elif not Check.postal_code(self._postal_code):
-            result="PSČ není vyplněno nebo obsahuje neplatné znaky."
-
-        return result
+        return Check.batch(columns, ((code, attributes, check) for code, attributes, check, _ in cls.CHECKS), all_errors)
+
+    @classmethod
+    def error_message(cls, code):
+        """Text chyby podle kódu chyby (viz CHECKS)."""
+        for check_code, _, _, message in cls.CHECKS:
+            if check_code == code:
+                return message
+        raise KeyError(code)
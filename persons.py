@@ -1,3 +1,7 @@
+import gc
+import sys
+from itertools import islice
+
 from insured_person import InsuredPerson
 
 class Persons:
@@ -5,11 +9,15 @@ class Persons:
     Kolekce pojištěnce. 
     Obsahuje slovník, kde klíč je identifikátor pojištěného a hodnota je objekt typu InsuredPerson.
     Umožňuje přistupovat k prvkům kolekce podle klíče ve slovníku jako podle indexu.
+
+    Udržuje index pojištění -> pojištěnci (identifikátor pojištění: množina identifikátorů
+    pojištěnců), který se aktualizuje při změnách kolekce i kolekcí pojištění jednotlivých pojištěnců.
     """
 
     def __init__(self):
-        """Konstruktor třídy Persons. Vytvoří slovník pro uložení pojištěnců."""
+        """Konstruktor třídy Persons. Vytvoří slovník pro uložení pojištěnců a index pojištění."""
         self._persons = {}
+        self._holders = {}
 
     # Přidání pojištěnce
     def __setitem__(self, _id, person):
@@ -17,6 +25,10 @@ class Persons:
         #     raise ValueError(f"Person with ID {_id} already exists.")
         if not isinstance(person, InsuredPerson):
             raise TypeError("Person must be an instance of InsuredPerson.")
+        previous = self._persons.get(_id)
+        if previous is not None and previous is not person:
+            previous._bind(None, None)
+        person._bind(self._holders, _id)
         self._persons[_id] = person
 
     # Získání pojištěnce podle identifikátoru _id
@@ -26,6 +38,7 @@ class Persons:
     # Odstranění pojištěnce podle identifikátoru _id
     def __delitem__(self, _id):
         if _id in self._persons.keys():
+            self._persons[_id]._bind(None, None)
             del self._persons[_id]
         else:
             raise KeyError(f"Person with ID {_id} does not exist.")
@@ -45,25 +58,105 @@ class Persons:
 
     def replace_policy(self, policy_id, policy):
         """
-        Vyhledá pojištění podle ID pojištění každého pojištěnce a nahradí novém.
+        Nahradí pojištění novým u všech pojištěnců, kteří ho mají sjednané (podle indexu pojištění).
 
         Args:
             policy_id (int): Identifikátor pojištění.
             policy (InsurancePolicy): pojištění.
         """
-        for id, person in self._persons.items():
-            if policy_id in person.policies:
-                self._persons[id].policies[policy_id]=policy
+        for id in self._holders.get(policy_id, ()):
+            self._persons[id].policies[policy_id]=policy
 
     def delete_policy(self, policy_id):
         """
-        Vyhledá pojištění podle ID pojištění každého pojištěnce a odstraní je.
+        Odstraní pojištění u všech pojištěnců, kteří ho mají sjednané (podle indexu pojištění).
 
         Args:
             policy_id (int): Identifikátor pojištění.
         """
         policy_id = int(policy_id)
+        for id in list(self._holders.get(policy_id, ())):
+            del self._persons[id].policies[policy_id]
+
+    def holders(self, policy_id):
+        """
+        Pojištěnci, kteří mají sjednané dané pojištění.
+
+        Args:
+            policy_id (int): Identifikátor pojištění.
+
+        Returns:
+            set[int]: Identifikátory pojištěnců.
+        """
+        return set(self._holders.get(int(policy_id), ()))
+
+    def check_policy_index(self):
+        """
+        Ověří, že index pojištění -> pojištěnci odpovídá kolekcím pojištění všech pojištěnců.
+
+        Returns:
+            bool: True, pokud index odpovídá, jinak False.
+        """
+        expected = {}
         for id, person in self._persons.items():
-            if policy_id in person.policies:
-                del self._persons[id].policies[policy_id]
+            if person.policies_count:
+                for policy_id, _ in person.policies:
+                    expected.setdefault(policy_id, set()).add(id)
+        return expected == self._holders
+
+    def ids(self):
+        """
+        Snímek identifikátorů pojištěnců (bezpečný pro iteraci během změn kolekce).
 
+        Returns:
+            list[int]: Identifikátory pojištěnců v pořadí vložení.
+        """
+        return list(self._persons)
+
+    def summary(self, sample_size=1000):
+        """
+        Souhrn velikosti kolekce.
+
+        Paměťová náročnost se odhaduje z prvních sample_size pojištěnců (včetně jejich pojištění)
+        a přepočítá se na celou kolekci.
+
+        Args:
+            sample_size (int): Počet pojištěnců pro odhad paměti.
+
+        Returns:
+            dict: Počet pojištěnců, vztahů a různých pojištění a odhad paměti v bajtech.
+        """
+        links = sum(len(persons) for persons in self._holders.values())
+
+        sample = list(islice(self._persons.values(), sample_size))
+        # Pojištěnci odkazují na index pojištění, ten se počítá jednou za celou kolekci
+        sample_bytes = _deep_sizeof(sample, exclude=(self._holders,)) - sys.getsizeof(sample)
+        estimated_bytes = sys.getsizeof(self._persons) + _deep_sizeof(self._holders)
+        if sample:
+            estimated_bytes += sample_bytes * len(self._persons) // len(sample)
+
+        return {
+            'persons': len(self._persons),
+            'links': links,
+            'policies': len(self._holders),
+            'estimated_bytes': estimated_bytes,
+        }
+
+
+def _deep_sizeof(obj, exclude=()):
+    """
+    Velikost objektu včetně všech objektů, na které odkazuje (bez tříd, modulů a funkcí).
+
+    Objekty z exclude (a to, na co odkazují jen přes ně) se nepočítají.
+    """
+    seen = {id(item) for item in exclude}
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, type(sys), type(_deep_sizeof))):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return size
@@ -5,11 +5,35 @@ class Policies:
     Kolekce pojištění. 
     Obsahuje slovník, kde klíč je identifikátor pojištění a hodnota je objekt typu InsurancePolicy.
     Umožňuje přistupovat k prvkům kolekce podle klíče ve slovníku jako podle indexu.
+
+    Kolekce pojištěnce uloženého v kolekci Persons je připojena k jejímu indexu
+    pojištění -> pojištěnci a při každé změně ho aktualizuje.
     """
 
+    __slots__ = ('_policies', '_holders', '_person_id')
+
     def __init__(self):
         """Konstruktor třídy Policies. Vytvoří slovník pro uložení pojištění"""
         self._policies = {}
+        self._holders = None
+        self._person_id = None
+
+    def _bind(self, holders, person_id):
+        """
+        Připojí kolekci k indexu pojištění -> pojištěnci (nebo ji odpojí, pokud je holders None).
+
+        Args:
+            holders (dict[int: set[int]]): Index kolekce Persons.
+            person_id (int): Identifikátor pojištěnce, kterému kolekce patří.
+        """
+        if self._holders is not None:
+            for policy_id in self._policies:
+                _discard_holder(self._holders, policy_id, self._person_id)
+        self._holders = holders
+        self._person_id = person_id
+        if holders is not None:
+            for policy_id in self._policies:
+                holders.setdefault(policy_id, set()).add(person_id)
 
     # Přidání pojištění
     def __setitem__(self, _id, policy):
@@ -17,6 +41,8 @@ class Policies:
         #     raise ValueError(f"Policy with ID {_id} already exists.")
         if not isinstance(policy, InsurancePolicy):
             raise TypeError("Policy must be an instance of InsurancePolicy.")
+        if self._holders is not None and _id not in self._policies:
+            self._holders.setdefault(_id, set()).add(self._person_id)
         self._policies[_id] = policy
 
     # Získání pojištění podle identifikátoru _id
@@ -27,6 +53,8 @@ class Policies:
     def __delitem__(self, _id):
         if _id in self._policies.keys():
             del self._policies[_id]
+            if self._holders is not None:
+                _discard_holder(self._holders, _id, self._person_id)
         else:
             raise KeyError(f"Policy with ID {_id} does not exist.")
 
@@ -42,3 +70,11 @@ class Policies:
     def __iter__(self):
         return iter(self._policies.items())
 
+
+def _discard_holder(holders, policy_id, person_id):
+    """Odebere pojištěnce z indexu pojištění -> pojištěnci, prázdnou množinu odstraní."""
+    persons = holders.get(policy_id)
+    if persons is not None:
+        persons.discard(person_id)
+        if not persons:
+            del holders[policy_id]
@@ -1,4 +1,4 @@
-from utils import Check
+from utils import Check, parse_amount, parse_date, format_date
 
 class InsurancePolicy:
     """
@@ -6,19 +6,26 @@ class InsurancePolicy:
 
     Attributes:
         title (str): Jméno.
-        insured_amount (int): Částka.
+        insured_amount (Decimal): Částka zaokrouhlená na haléře.
         insured_object (str): Předmět pojištění.
-        start_date (str): Platnost od.
-        end_date (str): Platnost do.
+        start_date (datetime): Platnost od.
+        end_date (datetime): Platnost do.
+
+    Částka a data se při přiřazení převádějí z textu (viz utils.parse_amount a utils.parse_date).
+    Hodnota, kterou převést nelze, se ponechá beze změny a ohlásí ji check_valid_data.
     """
 
+    # Při načítání po pojištěncích (load_person, LazyPersons) vzniká objekt pro každý vztah pojištěnce
+    # s pojištěním, proto bez slovníku __dict__
+    __slots__ = ('_title', '_insured_amount', '_insured_object', '_start_date', '_end_date')
+
     def __init__(self, title, insured_amount, insured_object, start_date, end_date):
         """Konstruktor třídy InsurancePolicy"""
         self._title = title
-        self._insured_amount = insured_amount
+        self._insured_amount = parse_amount(insured_amount)
         self._insured_object = insured_object
-        self._start_date = start_date
-        self._end_date = end_date
+        self._start_date = parse_date(start_date)
+        self._end_date = parse_date(end_date)
 
     def __str__(self) -> str:
         return f'{self._title}, {self._insured_amount}'
@@ -37,7 +44,7 @@ class InsurancePolicy:
 
     @insured_amount.setter
     def insured_amount(self, value):
-        self._insured_amount = value
+        self._insured_amount = parse_amount(value)
 
     @property
     def insured_object(self):
@@ -53,7 +60,12 @@ class InsurancePolicy:
 
     @start_date.setter
     def start_date(self, value):
-        self._start_date = value
+        self._start_date = parse_date(value)
+
+    @property
+    def start_date_text(self):
+        """Platnost od v kanonickém tvaru (hodnota pro <input type="datetime-local">)."""
+        return format_date(self._start_date)
 
     @property
     def end_date(self):
@@ -61,23 +73,55 @@ class InsurancePolicy:
 
     @end_date.setter
     def end_date(self, value):
-        self._end_date = value
+        self._end_date = parse_date(value)
 
-    def check_valid_data(self):
+    @property
+    def end_date_text(self):
+        """Platnost do v kanonickém tvaru (hodnota pro <input type="datetime-local">)."""
+        return format_date(self._end_date)
+
+    # Kontroly atributů v pořadí hlášení chyb: (kód chyby, atributy, funkce kontroly, text chyby)
+    CHECKS = (
+        ('title', ('title',), Check.filled, "Zadejte hodnotu: Jméno"),
+        ('insured_object', ('insured_object',), Check.filled, "Zadejte hodnotu: Předmět pojištění"),
+        ('insured_amount', ('insured_amount',), Check.amount, "Neplatná hodnota: Částka"),
+        ('start_date', ('start_date',), Check.date, "Neplatná hodnota: Platnost od"),
+        ('end_date', ('end_date',), Check.date, "Neplatná hodnota: Platnost do"),
+        ('dates', ('start_date', 'end_date'), Check.ordered, "Platnost od by mělo být dříve než Platnost do"),
+    )
+    _COMPILED_CHECKS = Check.compile(CHECKS)
+
+    def check_valid_data(self, all_errors=False):
         """
         Zkontroluje, zda jsou všechny jeho atributy správné.
 
+        Args:
+            all_errors (bool): Vrátit seznam všech chyb, ne jen první.
+
         Returns:
             str: Text popisující chybu nebo prázdný řádek, pokud jsou všechny hodnoty správně vyplněny.
-        """        
-        result=""
-        if len(self._title.strip()) == 0:
-            result = "Zadejte hodnotu: Jméno"
-        elif len(self._insured_object.strip()) == 0:
-            result = "Zadejte hodnotu: Předmět pojištění"
-        elif not Check.positive_number(self._insured_amount):
-            result = "Neplatná hodnota: Částka"
-        elif self._start_date > self._end_date:
-            result = "Platnost od by mělo být dříve než Platnost do"
-            
-        return result
+                V režimu all_errors seznam textů všech chyb (prázdný, pokud chyby nejsou).
+        """
+        return Check.errors(self, self._COMPILED_CHECKS, all_errors)
+
+    @classmethod
+    def check_columns(cls, columns, all_errors=False):
+        """
+        Zkontroluje sloupce hodnot atributů mnoha pojištění najednou (viz Check.batch).
+
+        Args:
+            columns (dict[str: list]): Sloupce hodnot podle názvu atributu.
+            all_errors (bool): Vracet všechny chyby řádku, ne jen první.
+
+        Returns:
+            list: Pro každý řádek None, kód první chyby nebo n-tice kódů chyb.
+        """
+        return Check.batch(columns, ((code, attributes, check) for code, attributes, check, _ in cls.CHECKS), all_errors)
+
+    @classmethod
+    def error_message(cls, code):
+        """Text chyby podle kódu chyby (viz CHECKS)."""
+        for check_code, _, _, message in cls.CHECKS:
+            if check_code == code:
+                return message
+        raise KeyError(code)
@@ -0,0 +1,35 @@
+import argparse
+import sys
+
+from interface_to_db import DatabaseInterface
+
+
+def main():
+    """Příkazový řádek pro kontrolu konzistence a přepočet statistik portfolia."""
+    parser = argparse.ArgumentParser(description="Kontrola statistik portfolia (PortfolioStats, CityStats, PolicyDateStats) "
+                                                 "proti datům a jejich přepočet od začátku.")
+    parser.add_argument('--db', default='insurance.db', help="cesta k databázi")
+    parser.add_argument('--rebuild', action='store_true', help="přepočítat statistiky od začátku")
+    args = parser.parse_args()
+
+    my_db = DatabaseInterface(args.db, storage_profile='wal')
+    try:
+        my_db.create_tables()
+        differences = my_db.check_portfolio_stats(rebuild=args.rebuild)
+        for table, key, (stored, actual) in differences:
+            print(f"{table} {key}: uloženo {stored}, správně {actual}")
+        if args.rebuild:
+            remaining = my_db.check_portfolio_stats()
+            print(f"Statistiky přepočítány, nalezených rozdílů: {len(differences)}, po přepočtu: {len(remaining)}")
+            failed = bool(remaining)
+        else:
+            print(f"Nalezených rozdílů: {len(differences)}")
+            failed = bool(differences)
+    finally:
+        my_db.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
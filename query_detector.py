@@ -0,0 +1,358 @@
+import contextvars
+import logging
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import request
+
+from database import DatabaseInsurances
+
+# Výchozí počet opakování stejného dotazu ze stejného místa, nad který se hlásí N+1
+DEFAULT_THRESHOLD = 5
+
+# Moduly datové vrstvy, které se při hledání místa volání přeskakují
+_DATA_LAYER = {'database.py', 'query_detector.py', 'metrics.py', 'cache.py', 'async_db.py', 'connection_pool.py'}
+
+# Příkazy řízení transakce se nezaznamenávají
+_TRANSACTION = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'END')
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_STRING = re.compile(r"[xX]?'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+# Hlášení opakovaných dotazů (úroveň WARNING)
+query_log = logging.getLogger('insurance.queries')
+
+# Právě probíhající záznam dotazů (přenáší se i do vláken AsyncDatabaseInterface)
+_current_recording = contextvars.ContextVar('insurance_query_recording', default=None)
+
+
+def statement_shape(sql):
+    """
+    Tvar dotazu SQL: hodnoty nahrazené '?', seznamy hodnot zkrácené na '(?)', mezery sjednocené.
+
+    Dotazy, které se liší jen hodnotami (parametry nebo hodnotami vloženými přímo do textu), mají stejný tvar.
+
+    Args:
+        sql (str): Dotaz SQL.
+
+    Returns:
+        str: Tvar dotazu.
+    """
+    shape = _NUMBER.sub('?', _STRING.sub('?', sql))
+    shape = _LIST.sub('(?)', shape)
+    return ' '.join(shape.split())
+
+
+def _call_site(depth):
+    """
+    Místo volání v kódu aplikace: nejbližší rámce mimo datovou vrstvu a mimo knihovny.
+
+    Returns:
+        str: Např. 'interface_to_db.py:123 (load_persons) < flask_interface.py:310 (person)'.
+    """
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < depth:
+        path = frame.f_code.co_filename
+        name = os.path.basename(path)
+        if os.path.dirname(os.path.abspath(path)) == _ROOT and name not in _DATA_LAYER:
+            frames.append(f'{name}:{frame.f_lineno} ({frame.f_code.co_name})')
+        frame = frame.f_back
+    return ' < '.join(frames) or '?'
+
+
+class _RecordingExecutor:
+    """Kurzor nebo spojení, které si zapisuje text provedených dotazů; ostatní volání předává dál."""
+
+    __slots__ = ('_target', '_statements')
+
+    def __init__(self, target, statements):
+        self._target = target
+        self._statements = statements
+
+    def execute(self, sql, *args):
+        self._statements.append(sql)
+        return self._target.execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        self._statements.append(sql)
+        return self._target.executemany(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class RepeatedQuery:
+    """
+    Dotaz stejného tvaru opakovaně volaný ze stejného místa (typicky N+1 ve smyčce).
+
+    Attributes:
+        shape (str): Tvar dotazu (statement_shape).
+        call_site (str): Místo volání v kódu aplikace.
+        method (str): Metoda DatabaseInsurances, která dotaz poslala.
+        count (int): Počet volání.
+    """
+
+    __slots__ = ('shape', 'call_site', 'method', 'count')
+
+    def __init__(self, shape, call_site, method, count):
+        """Konstruktor třídy RepeatedQuery"""
+        self.shape = shape
+        self.call_site = call_site
+        self.method = method
+        self.count = count
+
+    def __str__(self):
+        return f'{self.count}x {self.method} from {self.call_site}: {self.shape}'
+
+
+class QueryRecording:
+    """
+    Dotazy zaznamenané v jednom rozsahu (žádost, volání DatabaseInterface, blok v kontrole).
+
+    Za jeden dotaz se počítá každé provedení dotazu metodou DatabaseInsurances (execute nebo
+    executemany, hromadný zápis je tedy jeden dotaz). Vnořený záznam předává dotazy i vnějšímu.
+
+    Attributes:
+        name (str): Popis rozsahu (např. 'GET /persons?page=2').
+        calls (list[tuple]): Volání (metoda, místo volání, tvary dotazů) v pořadí provedení.
+    """
+
+    def __init__(self, name=None, parent=None):
+        """Konstruktor třídy QueryRecording"""
+        self.name = name
+        self.calls = []
+        self._parent = parent
+        self._lock = threading.Lock()
+
+    def add(self, method, call_site, statements):
+        """
+        Zaznamená jedno volání metody DatabaseInsurances.
+
+        Args:
+            method (str): Název metody.
+            call_site (str): Místo volání v kódu aplikace.
+            statements (list[str]): Dotazy SQL, které metoda poslala.
+        """
+        shapes = tuple(statement_shape(statement) for statement in statements
+                       if not statement.lstrip().upper().startswith(_TRANSACTION))
+        recording = self
+        while recording is not None:
+            with recording._lock:
+                recording.calls.append((method, call_site, shapes))
+            recording = recording._parent
+
+    @property
+    def query_count(self):
+        """Počet dotazů."""
+        return sum(len(shapes) for _, _, shapes in self.calls)
+
+    def repeated(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Dotazy stejného tvaru volané ze stejného místa víc než threshold krát.
+
+        Returns:
+            list[RepeatedQuery]: Seřazené od nejčastějšího.
+        """
+        counts = {}
+        for method, call_site, shapes in self.calls:
+            for shape in dict.fromkeys(shapes):
+                key = (shape, call_site)
+                counts[key] = (method, counts.get(key, (None, 0))[1] + 1)
+        return sorted((RepeatedQuery(shape, call_site, method, count)
+                       for (shape, call_site), (method, count) in counts.items() if count > threshold),
+                      key=lambda repeated: -repeated.count)
+
+    def summary(self, limit=20):
+        """
+        Přehled dotazů pro chybová hlášení: počet volání každého tvaru a místa.
+
+        Returns:
+            str: Řádky 'počet x metoda from místo: tvar'.
+        """
+        repeated = self.repeated(0)
+        lines = [str(query) for query in repeated[:limit]]
+        if len(repeated) > limit:
+            lines.append(f'... and {len(repeated) - limit} more')
+        return '\n'.join(lines)
+
+
+class QueryDetector:
+    """
+    Detektor N+1 dotazů: zaznamenává SQL poslané do databáze v jednom rozsahu a hlásí
+    dotazy stejného tvaru opakované ze stejného místa v kódu.
+
+    Zapíná se volitelně (DatabaseInterface(query_detector=...), v aplikaci QUERY_DETECTOR).
+    Mimo záznam stojí jen jedno čtení contextvar na volání metody DatabaseInsurances.
+    Během záznamu se zapisuje text dotazů, které metoda provede (ne sqlite3 set_trace_callback,
+    ten hlásí i vnitřní dotazy FTS5 a každý řádek executemany zvlášť).
+
+    Example:
+        with my_db.query_detector.record('load_persons') as recording:
+            my_db.load_persons()
+        print(recording.query_count, recording.repeated())
+
+    Attributes:
+        threshold (int): Počet opakování, nad který se dotaz hlásí.
+        depth (int): Počet rámců místa volání.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, depth=3):
+        """Konstruktor třídy QueryDetector"""
+        self.threshold = threshold
+        self.depth = depth
+        self._classes = {}
+
+    def database_class(self, base=DatabaseInsurances):
+        """
+        Podtřída base (DatabaseInsurances nebo jeho měřená podtřída), jejíž dotazy se zaznamenávají.
+
+        Returns:
+            type: Podtřída base.
+        """
+        if base not in self._classes:
+            namespace = {'_recorded_call': False}
+            for name, function in vars(DatabaseInsurances).items():
+                if callable(function) and not name.startswith('_') and name not in ('close', 'transaction'):
+                    namespace[name] = self._recorded(name, getattr(base, name))
+            self._classes[base] = type(f'Recorded{base.__name__}', (base,), namespace)
+        return self._classes[base]
+
+    def _recorded(self, name, function):
+        """Obalí metodu DatabaseInsurances zaznamenáváním dotazů."""
+        depth = self.depth
+
+        @wraps(function)
+        def recorded(db, *args, **kwargs):
+            recording = _current_recording.get()
+            # Metoda volaná z jiné metody se zaznamená v rámci vnější
+            if recording is None or db._recorded_call:
+                return function(db, *args, **kwargs)
+            statements = []
+            cursor, connection = db.cursor, db.connection
+            db.cursor, db.connection = _RecordingExecutor(cursor, statements), _RecordingExecutor(connection, statements)
+            db._recorded_call = True
+            try:
+                return function(db, *args, **kwargs)
+            finally:
+                db.cursor, db.connection = cursor, connection
+                db._recorded_call = False
+                recording.add(name, _call_site(depth), statements)
+        return recorded
+
+    def start(self, name=None):
+        """
+        Začne záznam dotazů v aktuálním kontextu (vnořený záznam předává dotazy i vnějšímu).
+
+        Returns:
+            tuple: (QueryRecording, token pro finish).
+        """
+        recording = QueryRecording(name, _current_recording.get())
+        return recording, _current_recording.set(recording)
+
+    def finish(self, recording, token):
+        """
+        Ukončí záznam a nahlásí opakované dotazy do záznamu 'insurance.queries'.
+
+        Returns:
+            list[RepeatedQuery]: Opakované dotazy.
+        """
+        _current_recording.reset(token)
+        repeated = recording.repeated(self.threshold)
+        for query in repeated:
+            query_log.warning("Repeated query in %s: %s", recording.name, query)
+        return repeated
+
+    @contextmanager
+    def record(self, name=None):
+        """
+        Kontextový manažer, který zaznamená dotazy uvnitř bloku.
+
+        Args:
+            name (str): Popis rozsahu pro hlášení.
+
+        Returns:
+            QueryRecording: Záznam (úplný po ukončení bloku).
+        """
+        recording, token = self.start(name)
+        try:
+            yield recording
+        finally:
+            self.finish(recording, token)
+
+    @contextmanager
+    def max_queries(self, max_queries, name=None, allow_repeated=False):
+        """
+        Kontextový manažer pro kontroly: ověří, že blok neposlal víc dotazů než max_queries
+        a (pokud allow_repeated není True) žádný dotaz neopakoval víc než threshold krát.
+
+        Raises:
+            AssertionError: Překročený počet dotazů nebo opakovaný dotaz (s přehledem dotazů).
+        """
+        with self.record(name) as recording:
+            yield recording
+        if recording.query_count > max_queries:
+            raise AssertionError(f"{name or 'Block'} made {recording.query_count} queries, "
+                                 f"expected at most {max_queries}:\n{recording.summary()}")
+        repeated = recording.repeated(self.threshold)
+        if repeated and not allow_repeated:
+            raise AssertionError(f"{name or 'Block'} repeated queries (N+1):\n"
+                                 + '\n'.join(str(query) for query in repeated))
+
+    def register(self, app):
+        """
+        Zaznamenává dotazy každé žádosti aplikace Flask a hlásí opakované dotazy.
+
+        Args:
+            app (Flask): Aplikace.
+        """
+        def start():
+            label = f'{request.method} {request.full_path.rstrip("?")}'
+            request.environ['insurance.queries'] = self.start(label)
+
+        def finish(exception):
+            started = request.environ.pop('insurance.queries', None)
+            if started is not None:
+                self.finish(*started)
+
+        app.before_request(start)
+        app.teardown_request(finish)
+
+
+def assert_max_queries(client, path, max_queries, method='GET', allow_repeated=False, **kwargs):
+    """
+    Kontrola trasy: provede žádost testovacím klientem a ověří počet dotazů do databáze.
+
+    Aplikace musí mít zapnutý detektor (wsgi.create_app({'QUERY_DETECTOR': True})).
+
+    Example:
+        client = create_app({'QUERY_DETECTOR': True, 'CACHE_SIZE': 0}).test_client()
+        assert_max_queries(client, '/persons?page=2', 3)
+
+    Args:
+        client (FlaskClient): Testovací klient aplikace.
+        path (str): Cesta žádosti.
+        max_queries (int): Největší povolený počet dotazů.
+        method (str): Metoda HTTP.
+        allow_repeated (bool): Nehlásit opakované dotazy (N+1), jen kontrolovat počet.
+        kwargs: Další argumenty pro client.open (data, json, headers, ...).
+
+    Returns:
+        TestResponse: Odpověď.
+
+    Raises:
+        AssertionError: Překročený počet dotazů nebo opakovaný dotaz.
+    """
+    detector = client.application.extensions['insurance'].my_db.query_detector
+    if detector is None:
+        raise ValueError("Query detector is not enabled, create the app with QUERY_DETECTOR.")
+    with detector.max_queries(max_queries, f'{method} {path}', allow_repeated):
+        response = client.open(path, method=method, **kwargs)
+    return response
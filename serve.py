@@ -0,0 +1,114 @@
+"""
+Provozní server aplikace: více pracovních procesů a vláken nad wsgi.create_app.
+
+Použije gunicorn, pokud je nainstalovaný. Jinak spustí vestavěný server: naslouchající
+socket se otevře jednou a pracovní procesy (fork) nad ním obsluhují žádosti serverem werkzeug
+(při THREADS > 1 každou žádost ve vlastním vlákně). Bez os.fork (Windows) běží jeden proces.
+
+Použití:
+    python serve.py --workers 4 --threads 4 --bind 127.0.0.1:8000 --db insurance.db
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+
+from werkzeug.serving import make_server
+
+from wsgi import DEFAULT_CONFIG, create_app
+
+
+def serve_gunicorn(config):
+    """Spustí aplikaci serverem gunicorn."""
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', config['BIND'])
+            self.cfg.set('workers', config['WORKERS'])
+            self.cfg.set('threads', config['THREADS'])
+            self.cfg.set('preload_app', config['PRELOAD'])
+
+        def load(self):
+            return create_app(config)
+
+    Application().run()
+
+
+def serve_builtin(config, access_log=False):
+    """Spustí aplikaci vestavěným serverem s předem vytvořenými pracovními procesy."""
+    host, port = config['BIND'].rsplit(':', 1)
+    threaded = config['THREADS'] > 1
+    if not access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    if not hasattr(os, 'fork') or config['WORKERS'] <= 1:
+        make_server(host, int(port), create_app({**config, 'WORKERS': 1}), threaded=threaded).serve_forever()
+        return
+
+    listener = socket.create_server((host, int(port)), backlog=1024)
+    app = create_app(config) if config['PRELOAD'] else None
+
+    workers = []
+    for _ in range(config['WORKERS']):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            server = make_server(host, int(port), app or create_app(config), threaded=threaded, fd=listener.fileno())
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        workers.append(pid)
+
+    def stop(signum, frame):
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Naslouchá na http://{config['BIND']}, pracovních procesů: {len(workers)}", flush=True)
+    for pid in workers:
+        os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DEFAULT_CONFIG['DATABASE'], help="cesta k databázi")
+    parser.add_argument('--bind', default=DEFAULT_CONFIG['BIND'], help="adresa a port")
+    parser.add_argument('--workers', type=int, default=DEFAULT_CONFIG['WORKERS'], help="počet pracovních procesů")
+    parser.add_argument('--threads', type=int, default=DEFAULT_CONFIG['THREADS'], help="počet vláken v procesu")
+    parser.add_argument('--no-preload', action='store_true', help="vytvořit aplikaci až v každém pracovním procesu")
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'builtin'), default='auto')
+    parser.add_argument('--access-log', action='store_true', help="vestavěný server: vypisovat žádosti")
+    parser.add_argument('--no-metrics', action='store_true', help="neměřit dotazy a žádosti (Server-Timing, /metrics)")
+    parser.add_argument('--slow-query-ms', type=float, help="zapisovat dotazy delší než zadaný počet ms")
+    parser.add_argument('--slow-request-ms', type=float, help="zapisovat žádosti delší než zadaný počet ms")
+    args = parser.parse_args()
+
+    config = {**DEFAULT_CONFIG, 'DATABASE': args.db, 'BIND': args.bind, 'WORKERS': args.workers,
+              'THREADS': args.threads, 'PRELOAD': not args.no_preload, 'METRICS': not args.no_metrics,
+              'SLOW_QUERY_MS': args.slow_query_ms, 'SLOW_REQUEST_MS': args.slow_request_ms}
+    if args.slow_query_ms is not None or args.slow_request_ms is not None:
+        logging.basicConfig(format='%(asctime)s %(process)d %(name)s: %(message)s')
+
+    server = args.server
+    if server == 'auto':
+        try:
+            import gunicorn
+            server = 'gunicorn'
+        except ImportError:
+            server = 'builtin'
+    if server == 'gunicorn':
+        serve_gunicorn(config)
+    else:
+        serve_builtin(config, args.access_log)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
+
+from insured_person import InsuredPerson
+from policy import InsurancePolicy
+
+# Sloupec s nejvýše tolika různými hodnotami drží slovník jako seznam (internovaných) řetězců,
+# jinak se hodnoty slovníku ukládají za sebou do jednoho bloku bajtů UTF-8
+_MAX_LIST_DICTIONARY = 4096
+
+# Počet řádků databáze zpracovaných najednou při sestavení snímku
+_CHUNK_SIZE = 10000
+
+
+def _int_array(values, maximum=None):
+    """Pole celých čísel s nejmenším typem, do kterého se vejdou nezáporné hodnoty (nejvýše maximum)."""
+    if not isinstance(values, (array, list)):
+        values = list(values)
+    if maximum is None:
+        maximum = max(values, default=0)
+    for typecode in ('B', 'H', 'I', 'Q'):
+        if maximum < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, values)
+    raise OverflowError(f"Value {maximum} does not fit into an array.")
+
+
+def _sizeof(obj):
+    """Velikost pole, bloku bajtů nebo seznamu včetně jeho prvků (bez sdílených malých objektů)."""
+    if isinstance(obj, list):
+        return sys.getsizeof(obj) + sum(sys.getsizeof(item) for item in obj)
+    return sys.getsizeof(obj) if obj is not None else 0
+
+
+class _StringColumn:
+    """
+    Sloupec textových hodnot kódovaný slovníkem.
+
+    Řádek obsahuje kód hodnoty ve slovníku různých hodnot (pole s nejmenším možným typem).
+    Pokud jsou všechny hodnoty různé, kódy se neukládají. Malý slovník je seznam internovaných
+    řetězců, velký se uloží jako jeden blok bajtů UTF-8 s polem posunů (bez objektu na hodnotu).
+    """
+
+    # _index (hodnota -> kód) je potřeba jen při sestavení, finish() ho uvolní
+    __slots__ = ('_codes', '_values', '_data', '_offsets', '_length', '_index')
+
+    def __init__(self):
+        self._codes = array('I')
+        self._values = []
+        self._data = None
+        self._offsets = None
+        self._length = 0
+        self._index = {}
+
+    def extend(self, values):
+        index, dictionary, codes = self._index, self._values, self._codes
+        for value in values:
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(dictionary)
+                dictionary.append(value)
+            codes.append(code)
+        self._length = len(codes)
+
+    def finish(self):
+        """Dokončí sestavení: zmenší pole kódů a případně zabalí slovník do bloku bajtů."""
+        self._index = None
+        if len(self._values) == self._length:
+            self._codes = None
+        else:
+            self._codes = _int_array(self._codes, len(self._values) - 1)
+        if len(self._values) <= _MAX_LIST_DICTIONARY or not all(isinstance(value, str) for value in self._values):
+            self._values = [sys.intern(value) if isinstance(value, str) else value for value in self._values]
+            return
+        encoded = [value.encode() for value in self._values]
+        self._values = None
+        self._data = b''.join(encoded)
+        self._offsets = _int_array(accumulate((len(value) for value in encoded), initial=0), len(self._data))
+
+    def __getitem__(self, row):
+        code = self._codes[row] if self._codes is not None else row
+        if self._data is None:
+            return self._values[code]
+        return self._data[self._offsets[code]:self._offsets[code + 1]].decode()
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        """Paměť sloupce v bajtech."""
+        return _sizeof(self._codes) + _sizeof(self._values) + _sizeof(self._data) + _sizeof(self._offsets)
+
+
+class SnapshotPersons:
+    """
+    Kompaktní snímek kolekce pojištěnců jen pro čtení, uložený po sloupcích.
+
+    Místo objektu na pojištěnce a na každý vztah k pojištění drží:
+        - identifikátory pojištěnců a pojištění v polích seřazených podle ID (vyhledání půlením),
+        - textové údaje ve sloupcích kódovaných slovníkem (viz _StringColumn),
+        - částky pojištění v poli čísel s plovoucí čárkou,
+        - vztahy pojištěnec -> pojištění ve formátu CSR: pro řádek pojištěnce i jsou pojištění
+          (indexy řádků pojištění) v _link_policies[_link_offsets[i]:_link_offsets[i + 1]].
+
+    Čtecí rozhraní odpovídá kolekci Persons (__getitem__, __iter__, __contains__, len, ids, holders,
+    summary). Pojištěnec se vytvoří až při přístupu jako nový objekt s novou kolekcí pojištění; objekty
+    pojištění se vytvoří při prvním použití a sdílí je všichni pojištěnci. Změny vrácených objektů
+    se do snímku nepromítnou. Údaje snímku se po sestavení nemění, lze ho tedy bez zámků číst z více vláken.
+    """
+
+    def __init__(self):
+        """Konstruktor třídy SnapshotPersons. Vytvoří prázdný snímek (viz from_rows)."""
+        self._person_ids = array('Q')
+        self._person_columns = tuple(_StringColumn() for _ in range(7))
+        self._policy_ids = array('Q')
+        self._policy_titles = _StringColumn()
+        self._policy_amounts = array('d')
+        self._policy_objects = _StringColumn()
+        self._policy_start_dates = _StringColumn()
+        self._policy_end_dates = _StringColumn()
+        self._policy_cache = []
+        self._link_offsets = array('B', [0])
+        self._link_policies = array('B')
+
+    @classmethod
+    def from_rows(cls, policies, persons, links):
+        """
+        Sestaví snímek z řádků databáze (ve tvaru metod DatabaseInsurances.iter_all_*).
+
+        Vztahy bez existujícího pojištěnce nebo pojištění se přeskočí (jako v load_persons).
+
+        Args:
+            policies (Iterable[tuple]): (id, title, insured_amount, insured_object, start_date, end_date).
+            persons (Iterable[tuple]): (id, first_name, last_name, email, phone, street, city, postal_code).
+            links (Iterable[tuple]): Dvojice (person_id, policy_id).
+
+        Returns:
+            SnapshotPersons: Snímek pojištěnců.
+        """
+        snapshot = cls()
+        policies = sorted(policies)
+        ids, titles, amounts, objects, start_dates, end_dates = zip(*policies) if policies else ((),) * 6
+        snapshot._policy_ids.extend(ids)
+        snapshot._policy_titles.extend(titles)
+        # Částky, které nejsou čísla, se ponechají v seznamu (InsurancePolicy je převede stejně jako z databáze)
+        if all(isinstance(amount, (int, float)) for amount in amounts):
+            snapshot._policy_amounts = array('d', amounts)
+        else:
+            snapshot._policy_amounts = list(amounts)
+        snapshot._policy_objects.extend(objects)
+        snapshot._policy_start_dates.extend(start_dates)
+        snapshot._policy_end_dates.extend(end_dates)
+        snapshot._policy_cache = [None] * len(snapshot._policy_ids)
+
+        # Řádky se zpracují po dávkách převedených na sloupce
+        persons = iter(persons)
+        while chunk := list(islice(persons, _CHUNK_SIZE)):
+            ids, *columns = zip(*chunk)
+            if (snapshot._person_ids and ids[0] <= snapshot._person_ids[-1]) or any(
+                    previous >= _id for previous, _id in zip(ids, ids[1:])):
+                raise ValueError("Persons must be ordered by ID.")
+            snapshot._person_ids.extend(ids)
+            for column, values in zip(snapshot._person_columns, columns):
+                column.extend(values)
+
+        for column in (*snapshot._person_columns, snapshot._policy_titles, snapshot._policy_objects,
+                       snapshot._policy_start_dates, snapshot._policy_end_dates):
+            column.finish()
+        snapshot._build_links(links)
+        return snapshot
+
+    def _build_links(self, links):
+        """Sestaví pole vztahů CSR (stabilně seřazené podle řádku pojištěnce, pořadí vztahů se zachová)."""
+        policy_rows = {policy_id: row for row, policy_id in enumerate(self._policy_ids)}
+        person_ids = self._person_ids
+        link_persons = array('I')
+        link_policies = array('I')
+        # Vztahy z databáze jsou seřazené podle pojištěnce: řádek pojištěnce se hledá posunem od předchozího,
+        # půlením jen při návratu zpět
+        person_row = 0
+        for person_id, policy_id in links:
+            if person_row >= len(person_ids) or person_ids[person_row] != person_id:
+                if person_row < len(person_ids) and person_ids[person_row] > person_id:
+                    person_row = bisect_left(person_ids, person_id)
+                else:
+                    while person_row < len(person_ids) and person_ids[person_row] < person_id:
+                        person_row += 1
+                if person_row >= len(person_ids) or person_ids[person_row] != person_id:
+                    continue
+            policy_row = policy_rows.get(policy_id)
+            if policy_row is not None:
+                link_persons.append(person_row)
+                link_policies.append(policy_row)
+
+        counts = array('I', bytes(4 * (len(self._person_ids) + 1)))
+        for person_row in link_persons:
+            counts[person_row + 1] += 1
+        offsets = array('Q', accumulate(counts))
+        positions = array('Q', offsets)
+        ordered = array('I', bytes(4 * len(link_policies)))
+        for person_row, policy_row in zip(link_persons, link_policies):
+            ordered[positions[person_row]] = policy_row
+            positions[person_row] += 1
+        self._link_offsets = _int_array(offsets, len(link_policies))
+        self._link_policies = _int_array(ordered, max(len(self._policy_ids) - 1, 0))
+
+    def _row(self, _id):
+        """Řádek pojištěnce podle identifikátoru nebo None."""
+        try:
+            row = bisect_left(self._person_ids, _id)
+        except TypeError:
+            return None
+        if row < len(self._person_ids) and self._person_ids[row] == _id:
+            return row
+        return None
+
+    def _policy(self, row):
+        """
+        Objekt pojištění z řádku pojištění.
+
+        Pojištění je málo, vytvoří se jen jednou a sdílí ho všichni pojištěnci (jako v load_persons).
+        """
+        policy = self._policy_cache[row]
+        if policy is None:
+            policy = self._policy_cache[row] = InsurancePolicy(
+                self._policy_titles[row], self._policy_amounts[row], self._policy_objects[row],
+                self._policy_start_dates[row], self._policy_end_dates[row])
+        return policy
+
+    def _person(self, row):
+        """Nový objekt pojištěnce i s pojištěními z řádku pojištěnce."""
+        person = InsuredPerson(*(column[row] for column in self._person_columns))
+        for policy_row in self._link_policies[self._link_offsets[row]:self._link_offsets[row + 1]]:
+            person.policies[self._policy_ids[policy_row]] = self._policy(policy_row)
+        return person
+
+    # Získání pojištěnce podle identifikátoru _id (vytvoří se nový objekt)
+    def __getitem__(self, _id):
+        row = self._row(_id)
+        return self._person(row) if row is not None else None
+
+    # Kontrola přítomnosti pojištěnce podle identifikátoru _id
+    def __contains__(self, _id):
+        _id = int(_id)
+        return self._row(_id) is not None
+
+    # Magická metoda pro získání množství
+    def __len__(self):
+        return len(self._person_ids)
+
+    # Magická metoda pro iteraci (pojištěnci se postupně vytvářejí)
+    def __iter__(self):
+        for row, _id in enumerate(self._person_ids):
+            yield _id, self._person(row)
+
+    def ids(self):
+        """
+        Snímek identifikátorů pojištěnců.
+
+        Returns:
+            list[int]: Identifikátory pojištěnců seřazené podle ID.
+        """
+        return self._person_ids.tolist()
+
+    def holders(self, policy_id):
+        """
+        Pojištěnci, kteří mají sjednané dané pojištění (projde všechny vztahy).
+
+        Args:
+            policy_id (int): Identifikátor pojištění.
+
+        Returns:
+            set[int]: Identifikátory pojištěnců.
+        """
+        policy_id = int(policy_id)
+        policy_row = bisect_left(self._policy_ids, policy_id)
+        if policy_row == len(self._policy_ids) or self._policy_ids[policy_row] != policy_id:
+            return set()
+        holders = set()
+        for position, row in enumerate(self._link_policies):
+            if row == policy_row:
+                holders.add(self._person_ids[bisect_right(self._link_offsets, position) - 1])
+        return holders
+
+    def summary(self, sample_size=None):
+        """
+        Souhrn velikosti snímku.
+
+        Paměť se na rozdíl od Persons.summary neodhaduje ze vzorku, ale sečte ze všech polí a sloupců
+        (sample_size je jen kvůli shodnému rozhraní).
+
+        Returns:
+            dict: Počet pojištěnců, vztahů a různých sjednaných pojištění a paměť v bajtech.
+        """
+        columns = (*self._person_columns, self._policy_titles, self._policy_objects, self._policy_start_dates,
+                   self._policy_end_dates)
+        arrays = (self._person_ids, self._policy_ids, self._policy_amounts, self._link_offsets, self._link_policies)
+        return {
+            'persons': len(self._person_ids),
+            'links': len(self._link_policies),
+            'policies': len(set(self._link_policies)),
+            'estimated_bytes': sum(column.nbytes for column in columns) + sum(_sizeof(item) for item in arrays),
+        }
@@ -1,5 +1,3 @@
-from database import DatabaseInsurances
-
 class Pagination:
     """Obsahuje statické metody pro výpočet stránek tabulky"""
 
@@ -15,8 +13,7 @@ class Pagination:
             int: Aktuální stránka.
         """        
         page = int(page)
-        db = DatabaseInsurances(my_db.db_name)
-        total_policies = db.insurance_policies_count()[0]
+        total_policies = my_db.insurance_policies_count()
         total_pages = (total_policies + 2) // 3
         return page if page<=total_pages else total_pages
 
@@ -32,53 +29,93 @@ class Pagination:
             int: Aktuální stránka.
         """        
         page = int(page)
-        db = DatabaseInsurances(my_db.db_name)
-        total_persons = db.insured_persons_count()[0]
+        total_persons = my_db.insured_persons_count()
         total_pages = (total_persons + 2) // 3
         return page if page<=total_pages else total_pages
 
     @staticmethod
-    def calculate_table_pages(my_db, table_name, per_page, page):
+    def calculate_table_pages(my_db, table_name, per_page, page, after_id=None, filters=None):
         """
         Výpočet aktuální stránky tabulky k zobrazení.
 
+        Z databáze se načítá jen požadovaná stránka a celkový počet řádků (jedním dotazem).
+
         Args:
             table_name (str): Název tabulky (policies nebo persons).
             per_page (int): Počet řádků v tabulce.
             page (int): Aktuální stránka.
+            after_id (int): Identifikátor posledního záznamu předchozí stránky nebo None.
+            filters (dict): Filtry pojištění (viz DatabaseInterface.get_insurance_policies_filtered_page) nebo None.
 
         Returns:
             tuple: řez kolekce pro zobrazení, číslo stránky, celkem stránek.
-        """        
+        """
         to_show=[]
+        total_items = 0
 
         if table_name=='persons':
-            insured_persons = my_db.get_all_insured_persons()
+            insured_persons, total_items = my_db.get_insured_persons_page(page, per_page, after_id)
             for id, next_person in insured_persons.items():
                 to_show.append((f"{next_person.first_name} {next_person.last_name}",f"{next_person.street}, {next_person.city}", id))
 
         elif table_name=='policies':
-            policies = my_db.get_all_insurance_policies()
+            if filters:
+                policies, total_items = my_db.get_insurance_policies_filtered_page(page, per_page, **filters)
+            else:
+                policies, total_items = my_db.get_insurance_policies_page(page, per_page, after_id)
             for id, policy_info in policies.items():
                 policy=policy_info[0]
                 persons=policy_info[1]
                 to_show.append((str(id), policy.title, policy.insured_amount, persons))
 
-        total_pages = (len(to_show) + per_page - 1) // per_page
-        start = (page - 1) * per_page
-        end = start + per_page
-
-        to_show_slice = to_show[start:end]
-
-        if table_name=='persons':
-            page = Pagination.chek_persons_page(my_db, page)
-        elif table_name=='policies':
-            page = Pagination.chek_policies_page(my_db, page)
+        total_pages = (total_items + per_page - 1) // per_page
+        page = page if page<=total_pages else total_pages
 
         if page==total_pages==0:
             page=total_pages=1
 
-        return (to_show_slice, page, total_pages)
+        return (to_show, page, total_pages)
+
+    @staticmethod
+    def page_window(page, total_pages, radius=5):
+        """
+        Čísla stránek pro ovládání stránkování: první, poslední a radius stránek kolem aktuální.
+
+        Počet tlačítek tak nezávisí na počtu stránek tabulky.
+
+        Args:
+            page (int): Aktuální stránka.
+            total_pages (int): Celkem stránek.
+            radius (int): Počet stránek zobrazených před a za aktuální stránkou.
+
+        Returns:
+            list: Čísla stránek vzestupně, None na místě vynechaných stránek.
+        """
+        pages = sorted({1, total_pages, *range(max(page - radius, 1), min(page + radius, total_pages) + 1)})
+        window = []
+        for number in pages:
+            if window and number - window[-1] > 1:
+                window.append(None)
+            window.append(number)
+        return window
+
+    @staticmethod
+    def last_row_id(to_show, table_name):
+        """
+        Vrátí identifikátor posledního řádku stránky (kurzor pro další stránku).
+
+        Args:
+            to_show (list): Řádky stránky vrácené metodou calculate_table_pages.
+            table_name (str): Název tabulky (policies nebo persons).
+
+        Returns:
+            int: Identifikátor posledního záznamu nebo None.
+        """
+        if not to_show:
+            return None
+        if table_name=='persons':
+            return to_show[-1][2]
+        return int(to_show[-1][0])
 
     @staticmethod
     def total_table_pages(my_db, table_name, per_page):
@@ -92,10 +129,9 @@ class Pagination:
         Returns:
             int: Počet stránek.
         """        
-        db = DatabaseInsurances(my_db.db_name)
         if table_name == 'policies':
-            total_items = db.insurance_policies_count()[0]
+            total_items = my_db.insurance_policies_count()
         elif table_name == 'persons':
-            total_items = db.insured_persons_count()[0]
+            total_items = my_db.insured_persons_count()
         return (total_items + 2) // per_page  # Výpočet počtu stránek
 
@@ -0,0 +1,41 @@
+"""
+Společné přípravky testů.
+
+Moduly aplikace leží v kořeni repozitáře, testy se spouštějí příkazem python -m pytest.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate import generate_database  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def portfolio_db(tmp_path_factory):
+    """Cesta k vygenerované databázi (1000 pojištěnců, 100 pojištění), společná pro testy jen pro čtení."""
+    db_name = str(tmp_path_factory.mktemp('portfolio') / 'portfolio.db')
+    generate_database(db_name, 1000, 100)
+    return db_name
+
+
+@pytest.fixture
+def db_name(tmp_path):
+    """Cesta k prázdné databázi, kterou si test může libovolně měnit."""
+    return str(tmp_path / 'test.db')
+
+
+@pytest.fixture(scope='session')
+def app(portfolio_db):
+    """Aplikace nad společnou databází (jeden proces, bez cache, aby žádosti četly z databáze)."""
+    from wsgi import create_app
+    app = create_app({'DATABASE': portfolio_db, 'WORKERS': 1, 'CACHE_SIZE': 0})
+    yield app
+    app.extensions['insurance'].my_db.close()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
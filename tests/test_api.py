@@ -0,0 +1,30 @@
+import pytest
+
+HUGE = '9' * 23
+
+
+@pytest.mark.parametrize('query', ['limit=abc', 'limit=', 'limit=1.5', 'limit=²', 'limit=0', 'limit=1001',
+                                   f'cursor={HUGE}', f'cursor={2 ** 63}', 'cursor=-1', 'cursor=²'])
+@pytest.mark.parametrize('collection', ['persons', 'policies'])
+def test_list_rejects_invalid_page_args(client, collection, query):
+    response = client.get(f'/api/v1/{collection}?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('collection', ['persons', 'policies'])
+def test_list_accepts_largest_cursor(client, collection):
+    response = client.get(f'/api/v1/{collection}?limit=5&cursor={2 ** 63 - 1}')
+    assert response.status_code == 200
+    assert response.get_json()['items'] == []
+
+
+@pytest.mark.parametrize('path', [f'/persons/{HUGE}', f'/persons/{HUGE}/policies', f'/policies/{HUGE}',
+                                  f'/policies/{HUGE}/persons'])
+def test_huge_path_id_is_not_found(client, path):
+    assert client.get(f'/api/v1{path}').status_code == 404
+
+
+def test_batch_rejects_huge_id(client):
+    response = client.delete('/api/v1/links/batch', json={'items': [{'person_id': int(HUGE), 'policy_id': 1}]})
+    assert response.status_code == 422
@@ -0,0 +1,29 @@
+import asyncio
+import threading
+
+
+def test_request_thread_loop_is_closed_when_thread_ends(client, monkeypatch):
+    loops = []
+    new_event_loop = asyncio.new_event_loop
+
+    def recording_new_event_loop():
+        loop = new_event_loop()
+        loops.append(loop)
+        return loop
+
+    monkeypatch.setattr(asyncio, 'new_event_loop', recording_new_event_loop)
+    statuses = []
+
+    def requests():
+        # Obě žádosti vlákna používají stejnou smyčku
+        statuses.extend(client.get('/person/1').status_code for _ in range(2))
+
+    threads = [threading.Thread(target=requests) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 10
+    assert len(loops) == 5
+    assert all(loop.is_closed() for loop in loops)
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from benchmarks.generate import generate_database
+from cache import CachedDatabaseInterface
+from insured_person import InsuredPerson
+
+
+def make_person(number):
+    return InsuredPerson('Jan', 'Novák', f'cache{number}@example.cz', '777123456', 'Hlavní 1', 'Praha', '11000')
+
+
+def in_thread(function):
+    """Výsledek funkce zavolané v jiném vlákně (mimo transakci tohoto vlákna)."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+@pytest.fixture
+def my_db(db_name):
+    generate_database(db_name, 50, 5)
+    my_db = CachedDatabaseInterface(db_name)
+    yield my_db
+    my_db.close()
+
+
+def test_read_during_unit_of_work_does_not_outlive_commit(my_db):
+    with my_db.unit_of_work():
+        person_id = my_db.add_insured_person_to_db(make_person(1))
+        assert my_db.insured_persons_count() == 51
+        assert in_thread(my_db.insured_persons_count) == 50
+        assert in_thread(lambda: my_db.find_insured_person_by_id(person_id)) is None
+    assert my_db.insured_persons_count() == 51
+    assert in_thread(my_db.insured_persons_count) == 51
+    assert my_db.find_insured_person_by_id(person_id).email == 'cache1@example.cz'
+
+
+def test_rollback_leaves_no_uncommitted_data_in_cache(my_db):
+    original = my_db.find_insured_person_by_id(1)
+    with pytest.raises(RuntimeError):
+        with my_db.unit_of_work():
+            my_db.update_insured_person_in_db(1, make_person(2))
+            assert my_db.find_insured_person_by_id(1).email == 'cache2@example.cz'
+            assert in_thread(lambda: my_db.find_insured_person_by_id(1)).email == original.email
+            raise RuntimeError
+    assert my_db.find_insured_person_by_id(1).email == original.email
+    assert my_db.insured_persons_count() == 50
+
+
+def test_nested_unit_of_work_applies_changes_after_outer_commit(my_db):
+    assert my_db.insured_persons_count() == 50
+    with my_db.unit_of_work():
+        with my_db.unit_of_work():
+            my_db.add_insured_person_to_db(make_person(3))
+        assert in_thread(my_db.insured_persons_count) == 50
+    assert in_thread(my_db.insured_persons_count) == 51
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import flask_interface
+from wsgi import create_app
+
+
+class FrozenDatetime(datetime):
+    """datetime, jehož now() vrací nastavený čas."""
+    current = datetime(2024, 6, 1, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def writable_client(db_name):
+    app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0})
+    yield app.test_client()
+    app.extensions['insurance'].my_db.close()
+
+
+def test_policies_without_time_filter_sends_last_modified(client):
+    response = client.get('/policies')
+    assert response.status_code == 200
+    assert response.last_modified is not None
+    assert client.get('/policies', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_expiring_days_etag_changes_with_current_minute(client, monkeypatch):
+    monkeypatch.setattr(flask_interface, 'datetime', FrozenDatetime)
+    monkeypatch.setattr(FrozenDatetime, 'current', datetime(2024, 6, 1, 10, 0, 5))
+    response = client.get('/policies?expiring_days=30')
+    assert response.status_code == 200
+    assert response.last_modified is None
+    etag = response.headers['ETag']
+    assert etag != client.get('/policies').headers['ETag']
+
+    monkeypatch.setattr(FrozenDatetime, 'current', datetime(2024, 6, 1, 10, 0, 50))
+    assert client.get('/policies?expiring_days=30', headers={'If-None-Match': etag}).status_code == 304
+    monkeypatch.setattr(FrozenDatetime, 'current', datetime(2024, 6, 1, 10, 1))
+    assert client.get('/policies?expiring_days=30', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_if_modified_since_requires_later_second(client):
+    last_modified = client.get('/persons').last_modified
+    same_second = {'If-Modified-Since': last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')}
+    next_second = {'If-Modified-Since': (last_modified + timedelta(seconds=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')}
+    assert client.get('/persons', headers=same_second).status_code == 200
+    assert client.get('/persons', headers=next_second).status_code == 304
+
+
+def test_write_in_same_second_is_not_hidden_by_if_modified_since(writable_client):
+    person = {'first_name': 'Jan', 'last_name': 'Novák', 'email': 'jan@example.com', 'phone': '123456789',
+              'street': 'Dlouhá 1', 'city': 'Praha', 'postal_code': '11000'}
+    assert writable_client.post('/api/v1/persons', json=person).status_code == 201
+    response = writable_client.get('/persons')
+    second = {**person, 'last_name': 'Dvořák', 'email': 'dvorak@example.com'}
+    assert writable_client.post('/api/v1/persons', json=second).status_code == 201
+    headers = {'If-Modified-Since': response.headers['Last-Modified']}
+    assert writable_client.get('/persons', headers=headers).status_code == 200
@@ -0,0 +1,40 @@
+import pytest
+
+from database import DatabaseInsurances, MIGRATIONS
+
+from benchmarks.check_query_plans import HOT_QUERIES, query_plan_violations
+
+
+@pytest.fixture(scope='module')
+def portfolio(portfolio_db):
+    db = DatabaseInsurances(portfolio_db)
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize('method, args, allowed_scans', HOT_QUERIES,
+                         ids=[f'{method}{args}' for method, args, _ in HOT_QUERIES])
+def test_hot_queries_use_indexes(portfolio, method, args, allowed_scans):
+    assert query_plan_violations(portfolio, method, args, allowed_scans) == []
+
+
+def test_migrations_reach_latest_version(portfolio):
+    assert portfolio.schema_version() == len(MIGRATIONS)
+
+
+def test_migration_renames_duplicate_titles_without_conflicts(db_name, monkeypatch):
+    # Databáze ze starší verze: tabulky bez migrací a duplicitní názvy pojištění
+    with monkeypatch.context() as patch:
+        patch.setattr(DatabaseInsurances, 'migrate', lambda self: 0)
+        with DatabaseInsurances(db_name) as db:
+            db.create_tables()
+            db.connection.executemany(
+                'INSERT INTO InsurancePolicies (id, title, insured_amount, insured_object, start_date, end_date) '
+                "VALUES (?, ?, 1000, 'Byt', '2024-01-01T00:00', '2025-01-01T00:00')",
+                [(1, 'Byt'), (2, 'Byt (3)'), (3, 'Byt'), (4, 'Byt'), (5, 'Auto')])
+            db.connection.commit()
+
+    with DatabaseInsurances(db_name) as db:
+        assert db.migrate() == len(MIGRATIONS)
+        titles = dict(db.connection.execute('SELECT id, title FROM InsurancePolicies'))
+    assert titles == {1: 'Byt', 2: 'Byt (3)', 3: 'Byt (3-2)', 4: 'Byt (4)', 5: 'Auto'}
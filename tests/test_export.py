@@ -0,0 +1,34 @@
+import pytest
+
+from database import DatabaseInsurances
+from interface_to_db import DatabaseInterface
+
+
+@pytest.fixture
+def my_db(portfolio_db):
+    my_db = DatabaseInterface(portfolio_db, pool_size=1)
+    yield my_db
+    my_db.close()
+
+
+@pytest.mark.parametrize('export, query', [
+    ('export_insured_persons', 'iter_all_insured_persons'),
+    ('export_insurance_policies', 'iter_all_insurance_policies'),
+    ('export_person_policies', 'iter_all_person_insurance_policies'),
+])
+def test_export_returns_all_rows(my_db, portfolio_db, export, query):
+    with DatabaseInsurances(portfolio_db) as db:
+        expected = sorted(getattr(db, query)())
+    rows = list(getattr(my_db, export)(batch_size=7))
+    assert rows == sorted(rows)
+    assert rows == expected
+
+
+def test_export_releases_connection_between_batches(my_db):
+    rows = my_db.export_person_policies(batch_size=10)
+    first = [next(rows) for _ in range(15)]
+    # Rozečtený export nedrží spojení: jediné spojení fondu je volné pro jiné dotazy
+    stats = my_db.pool_stats()
+    assert stats['idle_connections'] == stats['open_connections'] == 1
+    assert my_db.insured_persons_count() == 1000
+    assert len(first + list(rows)) == len(list(my_db.export_person_policies()))
@@ -0,0 +1,35 @@
+import pytest
+
+from interface_to_db import DatabaseInterface
+
+
+def person_data(person):
+    return (str(person), sorted((policy_id, str(policy)) for policy_id, policy in person.policies))
+
+
+@pytest.fixture
+def my_db(portfolio_db):
+    my_db = DatabaseInterface(portfolio_db)
+    yield my_db
+    my_db.close()
+
+
+def test_load_persons_by_ids_matches_load_person(my_db):
+    ids = [1, 2, 500, 999, 10 ** 6]
+    persons = my_db.load_persons_by_ids(ids)
+    assert sorted(persons) == [1, 2, 500, 999]
+    for person_id, person in persons.items():
+        assert person_data(person) == person_data(my_db.load_person(person_id))
+    assert my_db.load_persons_by_ids([]) == {}
+
+
+# Bez známých ID se i neexistující ID hledá v databázi (načtení se počítá jako v LazyPersons._load)
+@pytest.mark.parametrize('preload_ids, faults', [(True, 3), (False, 4)])
+def test_preload_loads_missing_persons_once(my_db, preload_ids, faults):
+    persons = my_db.load_persons_lazy(max_loaded=100, preload_ids=preload_ids)
+    persons[3]
+    persons.preload([1, 2, 3, 10 ** 6])
+    assert persons.loaded_ids() == [3, 1, 2]
+    assert persons.summary()['faults'] == faults
+    assert person_data(persons[2]) == person_data(my_db.load_person(2))
+    assert persons.check_policy_index()
@@ -0,0 +1,13 @@
+def test_person_page_does_not_change_persons_collection(app, client):
+    insured = app.extensions['insurance'].insured
+    insured.unload()
+    loaded = insured[3]
+    faults = insured.summary()['faults']
+
+    for person_id in (5, 3):
+        response = client.get(f'/person/{person_id}')
+        assert response.status_code == 200
+
+    assert insured.loaded_ids() == [3]
+    assert insured[3] is loaded
+    assert insured.summary()['faults'] == faults
@@ -0,0 +1,91 @@
+import pytest
+
+from insured_person import InsuredPerson
+from persons import Persons, _deep_sizeof
+from policies import Policies
+from policy import InsurancePolicy
+
+
+def make_person(number):
+    return InsuredPerson('Jan', 'Novák', f'osoba{number}@example.cz', '777123456', 'Hlavní 1', 'Praha', '11000')
+
+
+def make_policy(number):
+    return InsurancePolicy(f'Pojištění {number}', 1000 * number, 'Byt', '2024-01-01T00:00', '2025-01-01T00:00')
+
+
+@pytest.fixture
+def persons():
+    persons = Persons()
+    for person_id in range(1, 6):
+        person = make_person(person_id)
+        for policy_id in range(1, person_id + 1):
+            person.policies[policy_id] = make_policy(policy_id)
+        persons[person_id] = person
+    assert persons.check_policy_index()
+    return persons
+
+
+def test_holders(persons):
+    assert persons.holders(1) == {1, 2, 3, 4, 5}
+    assert persons.holders(5) == {5}
+    assert persons.holders(6) == set()
+
+
+def test_link_and_unlink(persons):
+    persons[1].policies[5] = make_policy(5)
+    del persons[5].policies[5]
+    assert persons.holders(5) == {1}
+    assert persons.check_policy_index()
+
+
+def test_replace_policy(persons):
+    policy = make_policy(10)
+    persons.replace_policy(3, policy)
+    assert persons.holders(3) == {3, 4, 5}
+    assert all(persons[person_id].policies[3] is policy for person_id in (3, 4, 5))
+    assert persons.check_policy_index()
+
+
+def test_delete_policy(persons):
+    persons.delete_policy(2)
+    assert persons.holders(2) == set()
+    assert all(2 not in persons[person_id].policies for person_id in range(1, 6))
+    assert persons.check_policy_index()
+
+
+def test_delete_and_replace_person(persons):
+    removed = persons[4]
+    del persons[4]
+    assert persons.holders(4) == {5}
+    # Odebraný pojištěnec už index nemění
+    removed.policies[1] = make_policy(1)
+    del removed.policies[2]
+    persons[5] = make_person(6)
+    assert persons.holders(1) == {1, 2, 3}
+    assert persons.check_policy_index()
+
+
+def test_replace_and_delete_policies_collection(persons):
+    policies = Policies()
+    policies[7] = make_policy(7)
+    persons[2].policies = policies
+    assert persons.holders(7) == {2}
+    assert persons.holders(1) == {1, 3, 4, 5}
+    del persons[3].policies
+    assert persons.holders(3) == {4, 5}
+    assert persons.check_policy_index()
+
+
+def test_summary_counts_index_once():
+    persons = Persons()
+    policies = [make_policy(number) for number in range(1, 51)]
+    for person_id in range(1, 201):
+        person = make_person(person_id)
+        for policy_id in range(1, 51):
+            person.policies[policy_id] = policies[policy_id - 1]
+        persons[person_id] = person
+    summary = persons.summary(sample_size=10)
+    assert (summary['persons'], summary['links'], summary['policies']) == (200, 10000, 50)
+    # Každý pojištěnec odkazuje na index pojištění, odhad ze vzorku ho nesmí přepočítat na celou kolekci
+    assert summary['estimated_bytes'] < 1.5 * _deep_sizeof(persons)
@@ -0,0 +1,40 @@
+import pytest
+
+POLICY = {'title': 'Velké pojištění', 'insured_object': 'Byt', 'start_date': '2024-01-01T00:00',
+          'end_date': '2025-01-01T00:00'}
+
+
+@pytest.mark.parametrize('amount', ['1e30', 1e30, '1' * 27])
+def test_api_rejects_too_large_amount(client, amount):
+    response = client.post('/api/v1/policies', json={**POLICY, 'insured_amount': amount})
+    assert response.status_code == 422
+    assert response.get_json()['errors'][0]['messages'] == ['Neplatná hodnota: Částka']
+
+
+def test_form_rejects_too_large_amount(client):
+    response = client.post('/new2', data={**POLICY, 'insured_amount': '1e30'})
+    assert response.status_code == 200
+    assert 'Neplatná hodnota: Částka' in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('name, label', [('amount_min', 'Částka od'), ('amount_max', 'Částka do')])
+def test_policies_filter_reports_too_large_amount(client, name, label):
+    response = client.get(f'/policies?{name}=1e30')
+    assert response.status_code == 200
+    assert f'Neplatná hodnota: {label}' in response.get_data(as_text=True)
+
+
+def test_import_reports_too_large_amount_and_continues(db_name):
+    from importer import BulkImporter
+    from interface_to_db import DatabaseInterface
+
+    my_db = DatabaseInterface(db_name)
+    my_db.create_tables()
+    errors = []
+    importer = BulkImporter(my_db, on_error=lambda row_number, message: errors.append((row_number, message)))
+    records = [(2, {**POLICY, 'insured_amount': '1e30'}),
+               (3, {**POLICY, 'title': 'Běžné pojištění', 'insured_amount': '1000'})]
+    result = importer.import_policies(records)
+    my_db.close()
+    assert result == {'rows': 2, 'inserted': 1, 'duplicates': 0, 'invalid': 1}
+    assert errors == [(2, 'Neplatná hodnota: Částka')]
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import DatabaseInsurances
+from wsgi import create_app
+
+NOW = datetime.now().replace(second=0, microsecond=0)
+
+POLICIES = [
+    ('Začíná odpoledne', 1000, 'Byt', '2024-06-01T14:00', '2025-05-31T00:00'),
+    ('Končí ten den', 1000, 'Byt', '2023-06-01T00:00', '2024-06-01T00:00'),
+    ('Skončilo den předem', 1000, 'Byt', '2023-06-01T00:00', '2024-05-31T00:00'),
+    ('Začíná den poté', 1000, 'Byt', '2024-06-02T00:00', '2025-06-01T00:00'),
+    ('Končí za týden', 1000, 'Byt', '2024-01-01T00:00', (NOW + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M')),
+]
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    db_name = str(tmp_path_factory.mktemp('filters') / 'filters.db')
+    with DatabaseInsurances(db_name) as db:
+        db.create_tables()
+        db.insert_insurance_policies(POLICIES)
+    app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0})
+    yield app.test_client()
+    app.extensions['insurance'].my_db.close()
+
+
+def titles(response):
+    body = response.get_data(as_text=True)
+    return {title for title, *_ in POLICIES if title in body}
+
+
+def test_active_on_date_covers_whole_day(client):
+    response = client.get('/policies?active_on=2024-06-01')
+    assert response.status_code == 200
+    assert titles(response) == {'Začíná odpoledne', 'Končí ten den', 'Končí za týden'}
+
+
+def test_active_on_date_and_time_is_instant(client):
+    response = client.get('/policies?active_on=2024-06-01T12:00')
+    assert titles(response) == {'Končí za týden'}
+
+
+def test_expiring_days(client):
+    assert titles(client.get('/policies?expiring_days=10')) == {'Končí za týden'}
+    assert 'Končí za týden' in titles(client.get('/policies?expiring_days=36500'))
+
+
+@pytest.mark.parametrize('days', ['36501', '99999999999', '-1', 'abc'])
+def test_expiring_days_out_of_range(client, days):
+    response = client.get(f'/policies?expiring_days={days}')
+    assert response.status_code == 200
+    assert 'Neplatná hodnota: Končí do (dní)' in response.get_data(as_text=True)
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.check_query_counts import API_PREFIX, ROUTE_BUDGETS, person_json
+from benchmarks.generate import generate_database
+from query_detector import assert_max_queries
+from wsgi import create_app
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """Aplikace se zapnutým detektorem dotazů nad vlastní databází (test dávky do ní zapisuje)."""
+    db_name = str(tmp_path_factory.mktemp('budgets') / 'budgets.db')
+    generate_database(db_name, 1000, 100)
+    app = create_app({'DATABASE': db_name, 'WORKERS': 1, 'CACHE_SIZE': 0, 'QUERY_DETECTOR': True})
+    yield app
+    app.extensions['insurance'].my_db.close()
+
+
+@pytest.mark.parametrize('path, max_queries', ROUTE_BUDGETS)
+def test_route_query_budget(client, path, max_queries):
+    assert assert_max_queries(client, path, max_queries).status_code == 200
+
+
+def test_show_persons_loads_page_in_bulk(app, client):
+    app.extensions['insurance'].insured.unload()
+    response = assert_max_queries(client, '/show_persons?page=3&per_page=50', 2)
+    assert response.get_data(as_text=True).count('<h4>') == 50
+
+
+def test_batch_create_query_budget(client):
+    items = [person_json(number) for number in range(200)]
+    response = assert_max_queries(client, f'{API_PREFIX}/persons/batch', 4, method='POST', json={'items': items})
+    assert response.status_code == 201
+
+
+def test_load_persons_query_budget(app):
+    my_db = app.extensions['insurance'].my_db
+    with my_db.query_detector.max_queries(3, 'DatabaseInterface.load_persons'):
+        persons = my_db.load_persons()
+    assert len(persons) >= 1000
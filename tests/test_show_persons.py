@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize('query', ['page=0', 'page=-1', 'per_page=0', 'page=1&per_page=-5'])
+def test_rejects_page_below_one(client, query):
+    assert client.get(f'/show_persons?{query}').status_code == 400
+
+
+def test_summary_follows_streamed_persons(client):
+    response = client.get('/show_persons?page=2&per_page=5')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert body.count('<h4>') == 5
+    assert '<h4>6. ' in body
+    assert body.index('<h4>') < body.index('Pojištěnců: 1000')
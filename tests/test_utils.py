@@ -0,0 +1,35 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from policy import InsurancePolicy
+from utils import parse_amount, parse_date
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1000', Decimal('1000.00')),
+    ('12,5', Decimal('12.50')),
+    (' 0.005 ', Decimal('0.01')),
+    (2500.1, Decimal('2500.10')),
+    (7, Decimal('7.00')),
+])
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+@pytest.mark.parametrize('value', ['abc', '', 'nan', 'inf', float('inf'), '1e30', 1e30, '1' * 27, '-1e40'])
+def test_parse_amount_returns_unconvertible_value(value):
+    assert parse_amount(value) is value
+
+
+def test_parse_date():
+    assert parse_date('2024-01-31T08:00:59') == datetime(2024, 1, 31, 8, 0)
+    assert parse_date('2024-01-31') == datetime(2024, 1, 31)
+    assert parse_date('31. 1. 2024') == '31. 1. 2024'
+
+
+@pytest.mark.parametrize('amount', ['1e30', 1e30, '1' * 27])
+def test_policy_with_too_large_amount_fails_validation(amount):
+    policy = InsurancePolicy('Pojištění', amount, 'Byt', '2024-01-01T00:00', '2025-01-01T00:00')
+    assert policy.check_valid_data() == InsurancePolicy.error_message('insured_amount')
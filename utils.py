@@ -1,4 +1,73 @@
 import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from itertools import compress
+from functools import partial
+from operator import attrgetter, not_
+
+# Předkompilované regulární výrazy (kompilují se jen jednou při importu modulu)
+_EMAIL = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+.[a-zA-Z]{2,}$")
+
+# Sloučené šablony telefonního čísla:
+# 1. Jen čísla
+# 2. Jen čísla a vnitřní znaky "-"
+# 3. Čísla, nejvýše jedna mezera mezi čísly a pak čísla a vnitřní znaky "-"
+_PHONE = re.compile(r"^\d+(?:\s?\d+)?(?:-\d+)*$")
+
+_POSTAL_CODE = re.compile(r"^[A-Za-z\d][A-Za-z\d\s-]*$")
+
+# Kanonický tvar data a času pojištění (řaditelný jako text, stejný jako hodnota <input type="datetime-local">)
+DATE_FORMAT = '%Y-%m-%dT%H:%M'
+
+# Částky se ukládají zaokrouhlené na haléře
+AMOUNT_QUANTUM = Decimal('0.01')
+
+
+def parse_date(value):
+    """
+    Převede datum a čas v ISO tvaru (např. 2024-01-31T08:00, 2024-01-31 08:00:00, 2024-01-31) na datetime.
+
+    Sekundy se zanedbávají (kanonický tvar DATE_FORMAT je s přesností na minuty).
+
+    Returns:
+        datetime: Datum a čas, nebo původní hodnota, pokud ji nelze převést.
+    """
+    if isinstance(value, datetime):
+        return value.replace(second=0, microsecond=0, tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value).strip()).replace(second=0, microsecond=0, tzinfo=None)
+    except ValueError:
+        return value
+
+
+def format_date(value):
+    """
+    Datum a čas v kanonickém tvaru DATE_FORMAT.
+
+    Returns:
+        str: Text data, nebo původní hodnota převedená na text, pokud nejde o datetime.
+    """
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
+
+
+def parse_amount(value):
+    """
+    Převede částku na Decimal zaokrouhlený na haléře (desetinná čárka je povolena).
+
+    Returns:
+        Decimal: Částka, nebo původní hodnota, pokud ji nelze převést na konečné číslo
+            zaokrouhlitelné na haléře (nejvýše 28 platných číslic, viz přesnost Decimal).
+    """
+    text = repr(value) if isinstance(value, float) else str(value)
+    try:
+        amount = Decimal(text.strip().replace(',', '.'))
+        if not amount.is_finite():
+            return value
+        return amount.quantize(AMOUNT_QUANTUM, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return value
 
 class Check:
     """Obsahuje statické metody pro kontrolu hodnot atributů"""
@@ -13,11 +82,7 @@ class Check:
         Returns:
             bool: True, pokud e-mailová adresa odpovídá šabloně, jinak False.
         '''
-        regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+.[a-zA-Z]{2,}$"
-
-        if re.match(regex, text):
-            return True
-        return False
+        return _EMAIL.match(text) is not None
 
     @staticmethod
     def phone(text):
@@ -29,22 +94,7 @@ class Check:
         Returns:
             bool: True, pokud telefonní číslo odpovídá šabloně, jinak False.
         """
-
-        # 1. Jen čísla
-        regex_digits_only = r"^\d+$"
-
-        # 2. Jen čísla a vnitřní znaky "-"
-        regex_digits_and_hyphens = r"^\d+(-\d+)*$"
-
-        # 3. "("" pak jen čísla, pak "")"" pak jen čísla a uvnitř znaky "-" s mezerou
-        regex_with_parentheses = r"^(\d+)\s?\d+(-\d+)*$"
-
-        if (re.match(regex_digits_only, text)
-            or re.match(regex_digits_and_hyphens, text)
-            or re.match(regex_with_parentheses, text)):
-            return True
-        else:
-            return False
+        return _PHONE.match(text) is not None
 
     @staticmethod
     def postal_code(text):
@@ -56,11 +106,7 @@ class Check:
         Returns:
             bool: True, pokud poštovní směrovací číslo odpovídá šabloně, jinak False.
         """
-
-        regex_postal_code = r"^[A-Za-z\d][A-Za-z\d\s-]*$"
-        if re.match(regex_postal_code, text):
-            return True
-        return False
+        return _POSTAL_CODE.match(text) is not None
 
     @staticmethod
     def positive_number(value):
@@ -78,4 +124,126 @@ class Check:
             return value > 0
         except:
             return False
-        
+
+    @staticmethod
+    def amount(value):
+        """kontroluje, zda je hodnota převedená částka (Decimal, viz parse_amount) větší než nula
+
+        Returns:
+            bool: True, pokud je částka kladná, jinak False.
+        """
+        return isinstance(value, Decimal) and value > 0
+
+    @staticmethod
+    def date(value):
+        """kontroluje, zda je hodnota převedené datum a čas (datetime, viz parse_date)
+
+        Returns:
+            bool: True, pokud je hodnota datetime, jinak False.
+        """
+        return isinstance(value, datetime)
+
+    @staticmethod
+    def filled(text):
+        """kontroluje, zda text obsahuje jiné znaky než mezery
+
+        Args:
+            text (str): Kontrolovaný text
+
+        Returns:
+            bool: True, pokud je text vyplněn, jinak False.
+        """
+        return len(text.strip()) != 0
+
+    @staticmethod
+    def ordered(first, second):
+        """kontroluje, zda první hodnota není větší než druhá (např. Platnost od a Platnost do)
+
+        Neporovnatelné hodnoty (chybný formát, který hlásí jiná kontrola) se neposuzují.
+
+        Returns:
+            bool: True, pokud first <= second nebo hodnoty nelze porovnat, jinak False.
+        """
+        try:
+            return first <= second
+        except TypeError:
+            return True
+
+    @staticmethod
+    def compile(checks):
+        """připraví kontroly atributů objektu pro opakované použití (viz Check.errors)
+
+        Args:
+            checks (Iterable[tuple]): Kontroly (kód chyby, názvy atributů, funkce kontroly, text chyby).
+
+        Returns:
+            tuple: Kontroly (text chyby, funkce vracející hodnoty atributů, rychlá funkce kontroly).
+        """
+        compiled = []
+        for code, attributes, check, message in checks:
+            check = _COLUMN_CHECKS.get(check, check)
+            if len(attributes) > 1:
+                check = partial(_star, check)
+            compiled.append((message, attrgetter(*attributes), check))
+        return tuple(compiled)
+
+    @staticmethod
+    def errors(item, compiled, all_errors=False):
+        """kontroluje atributy objektu předkompilovanými kontrolami (viz Check.compile)
+
+        Args:
+            item: Kontrolovaný objekt.
+            compiled (tuple): Kontroly vrácené metodou Check.compile.
+            all_errors (bool): Vrátit seznam všech chyb, ne jen první.
+
+        Returns:
+            str: Text první chyby nebo prázdný řádek. V režimu all_errors seznam textů všech chyb.
+        """
+        errors = []
+        for message, values, check in compiled:
+            if not check(values(item)):
+                if not all_errors:
+                    return message
+                errors.append(message)
+        return errors if all_errors else ""
+
+    @staticmethod
+    def batch(columns, checks, all_errors=False):
+        """kontroluje celé sloupce hodnot najednou
+
+        Každá kontrola se provede jedním průchodem přes své sloupce. Výsledkem je kód chyby
+        pro každý řádek; v režimu all_errors n-tice kódů všech chyb řádku.
+
+        Args:
+            columns (dict[str: list]): Sloupce hodnot podle názvu atributu (stejně dlouhé).
+            checks (Iterable[tuple]): Kontroly (kód chyby, názvy atributů, funkce kontroly) v pořadí
+                hlášení chyb. Funkce dostane hodnoty uvedených atributů a vrací True, pokud jsou správné.
+            all_errors (bool): Vracet všechny chyby řádku, ne jen první.
+
+        Returns:
+            list: Pro každý řádek None (bez chyby), kód první chyby nebo n-tice kódů (all_errors).
+        """
+        size = len(next(iter(columns.values()), ()))
+        codes = [None] * size
+        for code, attributes, check in checks:
+            # Výsledky kontroly pro celý sloupec a výběr chybných řádků bez cyklu v Pythonu
+            results = map(_COLUMN_CHECKS.get(check, check), *(columns[name] for name in attributes))
+            for row in compress(range(size), map(not_, results)):
+                if all_errors:
+                    codes[row] = codes[row] + (code,) if codes[row] else (code,)
+                elif codes[row] is None:
+                    codes[row] = code
+        return codes
+
+
+# Rychlé varianty kontrol pro celé sloupce (volají se přímo funkce v C, výsledek se vyhodnotí jako bool)
+_COLUMN_CHECKS = {
+    Check.email: _EMAIL.match,
+    Check.phone: _PHONE.match,
+    Check.postal_code: _POSTAL_CODE.match,
+    Check.filled: str.strip,
+}
+
+
+def _star(check, values):
+    return check(*values)
@@ -0,0 +1,95 @@
+"""
+Vstupní bod aplikace pro server WSGI (tovární funkce create_app).
+
+Příklad pro gunicorn (viz také serve.py):
+    gunicorn --workers 4 --threads 4 --preload 'wsgi:create_app()'
+"""
+import os
+
+from cache import CachedDatabaseInterface
+from metrics import Metrics
+from query_detector import QueryDetector
+from lazy_persons import LazyPersons
+from flask_interface import AsyncFlask, FlaskInterface
+
+# Výchozí konfigurace aplikace a serveru (create_app, serve.py)
+DEFAULT_CONFIG = {
+    # Cesta k databázi a profil úložiště SQLite (viz database.STORAGE_PROFILES)
+    'DATABASE': 'insurance.db',
+    'STORAGE_PROFILE': 'wal',
+    # Maximální počet spojení s databází v jednom procesu
+    'POOL_SIZE': 5,
+    # Počet vláken pro souběžné dotazy asynchronních pohledů (None = POOL_SIZE, 0 = dotazy postupně ve vlákně žádosti)
+    'DB_EXECUTOR_WORKERS': None,
+    # Maximální počet záznamů v cache pro čtení z databáze (v každém procesu zvlášť)
+    'CACHE_SIZE': 10000,
+    # Měření dotazů a žádostí (hlavička Server-Timing, /metrics ve formátu Prometheus)
+    'METRICS': True,
+    # Hranice v ms pro zápis pomalých dotazů a žádostí do záznamu 'insurance.slow' (None = nezapisovat)
+    'SLOW_QUERY_MS': None,
+    'SLOW_REQUEST_MS': None,
+    # Detektor N+1 dotazů: hlásí dotazy stejného tvaru opakované v žádosti víc než THRESHOLD krát (vývoj, kontroly)
+    'QUERY_DETECTOR': False,
+    'QUERY_DETECTOR_THRESHOLD': 5,
+    # Načítání pojištěnců: 'eager' (všichni do paměti) nebo 'lazy' (až při prvním přístupu, viz LazyPersons)
+    'PERSONS_LOADING': 'lazy',
+    'LAZY_MAX_LOADED': 10000,
+    'LAZY_PRELOAD_IDS': True,
+    # Server: adresa, počet pracovních procesů a vláken v procesu
+    'BIND': '127.0.0.1:8000',
+    'WORKERS': os.cpu_count() or 1,
+    'THREADS': 4,
+    # Vytvořit aplikaci jednou před rozvětvením pracovních procesů (kratší start, sdílené stránky paměti)
+    'PRELOAD': True,
+}
+
+
+def create_app(config=None):
+    """
+    Vytvoří aplikaci Flask s vlastním rozhraním do databáze a kolekcí pojištěnců.
+
+    Každé volání vytvoří novou aplikaci (trasy se neregistrují do sdíleného flask_interface.app).
+    Spojení s databází se po rozvětvení procesu otevírají v každém procesu znovu (ConnectionPool),
+    cache a kolekce pojištěnců jsou v každém procesu vlastní. Při více pracovních procesech
+    se na začátku každé žádosti porovná verze dat v databázi a po zápisu jiného procesu
+    se cache a načtení pojištěnci zahodí.
+
+    Args:
+        config (dict): Změny výchozí konfigurace DEFAULT_CONFIG.
+
+    Returns:
+        Flask: Aplikace WSGI; rozhraní FlaskInterface je v app.extensions['insurance'].
+
+    Raises:
+        ValueError: Neplatná konfigurace.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    multi_process = config['WORKERS'] > 1
+    if config['PERSONS_LOADING'] not in ('eager', 'lazy'):
+        raise ValueError(f"Unknown persons loading: {config['PERSONS_LOADING']}")
+    if multi_process and config['PERSONS_LOADING'] == 'eager':
+        raise ValueError("Persons loading 'eager' cannot be kept consistent across workers, use 'lazy'.")
+
+    metrics = Metrics(config['SLOW_QUERY_MS'], config['SLOW_REQUEST_MS']) if config['METRICS'] else None
+    query_detector = QueryDetector(config['QUERY_DETECTOR_THRESHOLD']) if config['QUERY_DETECTOR'] else None
+    my_db = CachedDatabaseInterface(config['DATABASE'], pool_size=config['POOL_SIZE'], cache_size=config['CACHE_SIZE'],
+                                    storage_profile=config['STORAGE_PROFILE'], metrics=metrics,
+                                    query_detector=query_detector)
+    my_db.create_tables()
+    if config['PERSONS_LOADING'] == 'lazy':
+        # Ve více procesech by identifikátory v paměti zastaraly, existence se ověřuje v databázi
+        persons = my_db.load_persons_lazy(config['LAZY_MAX_LOADED'], config['LAZY_PRELOAD_IDS'] and not multi_process)
+    else:
+        persons = my_db.load_persons()
+
+    flask_app = AsyncFlask('flask_interface')
+    flask_app.config.update(config)
+    flask_app.extensions['insurance'] = FlaskInterface(my_db, persons, flask_app)
+
+    if multi_process:
+        @flask_app.before_request
+        def sync_data_versions():
+            if my_db.sync_data_versions() and isinstance(persons, LazyPersons):
+                persons.unload()
+
+    return flask_app